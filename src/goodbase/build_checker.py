@@ -1,15 +1,67 @@
 """Criteria for checking an evergreen build."""
 import re
-from typing import List, Optional, Set
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 
 import structlog
 from pydantic import BaseModel
 
-from goodbase.models.build_status import BuildStatus
+from goodbase.models.build_status import TASK_NAMES, BuildStatus
+
+DEFAULT_REGEX_FLAGS = re.compile("").flags
 
 LOGGER = structlog.get_logger(__name__)
 
 
+class PatternSet:
+    """
+    A set of regexes that names are matched against.
+
+    The regexes are combined into a single one when that cannot change what they match, and the
+    result for each name is remembered, since the same build variants are seen in every version.
+    """
+
+    def __init__(self, patterns: Tuple[str, ...]) -> None:
+        """
+        Initialize the set.
+
+        :param patterns: Regexes to match names against.
+        """
+        regexes = [re.compile(pattern) for pattern in patterns]
+        if len(regexes) > 1 and all(
+            regex.groups == 0 and regex.flags == DEFAULT_REGEX_FLAGS for regex in regexes
+        ):
+            regexes = [re.compile("|".join(f"(?:{pattern})" for pattern in patterns))]
+        self._regexes = regexes
+        self._matches: Dict[str, bool] = {}
+
+    def matches(self, name: str) -> bool:
+        """
+        Check if the start of the given name matches any of the regexes.
+
+        :param name: Name to check.
+        :return: True if any of the regexes match.
+        """
+        if not self._regexes:
+            return False
+        matched = self._matches.get(name)
+        if matched is None:
+            matched = any(regex.match(name) for regex in self._regexes)
+            self._matches[name] = matched
+        return matched
+
+
+@lru_cache(maxsize=None)
+def compile_patterns(patterns: Tuple[str, ...]) -> PatternSet:
+    """
+    Compile the given regexes, reusing the set previously compiled for the same regexes.
+
+    :param patterns: Regexes to compile.
+    :return: Set of compiled regexes.
+    """
+    return PatternSet(patterns)
+
+
 class BuildChecks(BaseModel):
     """
     Set of checks to perform to check build criteria.
@@ -39,9 +91,54 @@ class BuildChecks(BaseModel):
         :param display_name: Display name of build variant to check.
         :return: True if these checks apply to the given build variant.
         """
-        return any(
-            re.match(bv_regex, build_variant) for bv_regex in self.build_variant_regex
-        ) or any(re.match(dn_regex, display_name) for dn_regex in self.display_name_regex)
+        build_variant_patterns = compile_patterns(tuple(self.build_variant_regex))
+        display_name_patterns = compile_patterns(tuple(self.display_name_regex))
+        return build_variant_patterns.matches(build_variant) or display_name_patterns.matches(
+            display_name
+        )
+
+    def should_apply_to_build_variant(self, build_variant: str) -> Optional[bool]:
+        """
+        Check if these checks apply to the given build variant without knowing its display name.
+
+        :param build_variant: Name of build variant to check.
+        :return: Whether these checks apply or None if it depends on the display name.
+        """
+        if compile_patterns(tuple(self.build_variant_regex)).matches(build_variant):
+            return True
+        if not self.display_name_regex:
+            return False
+        return None
+
+    def requires_task_details(self) -> bool:
+        """Check if these checks need the state of individual tasks rather than just task counts."""
+        return bool(self.successful_tasks) or bool(self.active_tasks)
+
+    def thresholds_depend_on_successful_count(
+        self, min_successful: int, max_successful: int, n_tasks: int
+    ) -> bool:
+        """
+        Check if the thresholds could be met or not depending on how many tasks are successful.
+
+        :param min_successful: Lowest number of tasks that could be successful.
+        :param max_successful: Highest number of tasks that could be successful.
+        :param n_tasks: Number of tasks in the build.
+        :return: True if the thresholds are met for some successful counts in the range only.
+        """
+        if n_tasks == 0:
+            return False
+
+        if self.success_threshold and (min_successful / n_tasks < self.success_threshold) != (
+            max_successful / n_tasks < self.success_threshold
+        ):
+            return True
+
+        if self.failure_threshold and (1.0 - min_successful / n_tasks < self.failure_threshold) != (
+            1.0 - max_successful / n_tasks < self.failure_threshold
+        ):
+            return True
+
+        return False
 
     def check(self, build_status: BuildStatus) -> bool:
         """
@@ -81,10 +178,8 @@ class BuildChecks(BaseModel):
             return False
 
         if self.successful_tasks:
-            if any(
-                task in build_status.all_tasks and task not in build_status.successful_tasks
-                for task in self.successful_tasks
-            ):
+            unsuccessful_mask = build_status.all_mask & ~build_status.successful_mask
+            if TASK_NAMES.mask(self.successful_tasks) & unsuccessful_mask:
                 LOGGER.debug(
                     "Unmet criteria, successful_tasks",
                     build=build_status.build_name,
@@ -93,10 +188,8 @@ class BuildChecks(BaseModel):
                 return False
 
         if self.active_tasks:
-            if any(
-                task in build_status.all_tasks and task in build_status.inactive_tasks
-                for task in self.active_tasks
-            ):
+            inactive_mask = build_status.all_mask & build_status.inactive_mask
+            if TASK_NAMES.mask(self.active_tasks) & inactive_mask:
                 LOGGER.debug(
                     "Unmet criteria, active_tasks",
                     build=build_status.build_name,
@@ -105,3 +198,101 @@ class BuildChecks(BaseModel):
                 return False
 
         return True
+
+
+class CriteriaPlan:
+    """
+    Build criteria prepared to be checked against the builds of many versions.
+
+    Which checks apply to a build only depends on its build variant and display name, so it is
+    worked out the first time a build variant is seen and reused for every later version.
+    """
+
+    def __init__(self, build_checks: List[BuildChecks]) -> None:
+        """
+        Initialize the plan.
+
+        :param build_checks: Build criteria to check.
+        """
+        self.build_checks = build_checks
+        self._checks_by_build: Dict[Tuple[str, str], List[BuildChecks]] = {}
+        self._checks_by_build_variant: Dict[str, Optional[List[BuildChecks]]] = {}
+        self._task_names: Optional[Set[str]] = None
+        self._task_names_found = False
+
+    def task_names(self) -> Optional[Set[str]]:
+        """
+        Get the names of the only tasks of a build these checks need to know the state of.
+
+        :return: Set of task names or None if the checks need every task of a build.
+        """
+        if not self._task_names_found:
+            self._task_names = self._find_task_names()
+            self._task_names_found = True
+        return self._task_names
+
+    def checks_for(self, build_variant: str, display_name: str) -> List[BuildChecks]:
+        """
+        Get the checks that apply to the given build.
+
+        :param build_variant: Name of build variant of the build.
+        :param display_name: Display name of the build.
+        :return: List of checks that apply.
+        """
+        key = (build_variant, display_name)
+        checks = self._checks_by_build.get(key)
+        if checks is None:
+            checks = [
+                bc for bc in self.build_checks if bc.should_apply(build_variant, display_name)
+            ]
+            self._checks_by_build[key] = checks
+        return checks
+
+    def checks_for_build_variant(self, build_variant: str) -> Optional[List[BuildChecks]]:
+        """
+        Get the checks that apply to the given build variant without knowing its display name.
+
+        :param build_variant: Name of build variant to check.
+        :return: List of checks that apply or None if it depends on the display name.
+        """
+        if build_variant not in self._checks_by_build_variant:
+            self._checks_by_build_variant[build_variant] = self._find_checks_for_build_variant(
+                build_variant
+            )
+        return self._checks_by_build_variant[build_variant]
+
+    def _find_task_names(self) -> Optional[Set[str]]:
+        """
+        Find the names of the only tasks of a build these checks need to know the state of.
+
+        Thresholds depend on the state of every task in a build, so only checks that name the
+        tasks they need can be evaluated without the others.
+
+        :return: Set of task names or None if the checks need every task of a build.
+        """
+        task_names: Set[str] = set()
+        for bc in self.build_checks:
+            if any(
+                threshold is not None
+                for threshold in [bc.success_threshold, bc.failure_threshold, bc.run_threshold]
+            ):
+                return None
+            task_names.update(bc.successful_tasks or set())
+            task_names.update(bc.active_tasks or set())
+        return task_names or None
+
+    def _find_checks_for_build_variant(self, build_variant: str) -> Optional[List[BuildChecks]]:
+        """
+        Find the checks that apply to the given build variant without knowing its display name.
+
+        :param build_variant: Name of build variant to check.
+        :return: List of checks that apply or None if it depends on the display name.
+        """
+        checks = []
+        for bc in self.build_checks:
+            should_apply = bc.should_apply_to_build_variant(build_variant)
+            if should_apply is None:
+                return None
+            if should_apply:
+                checks.append(bc)
+        return checks
@@ -0,0 +1,87 @@
+"""Asyncio based client for fetching data from Evergreen."""
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from typing import Any, Callable, Iterator, List, Optional, TypeVar
+
+from evergreen import Build, EvergreenApi, Version
+
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
+from goodbase.worker_pool import WorkerPool
+
+T = TypeVar("T")
+
+
+class AsyncEvergreenClient:
+    """
+    An asyncio wrapper around the Evergreen API client.
+
+    The Evergreen API client makes blocking HTTP requests, so each request is run on the shared
+    worker pool, while a semaphore keeps requests that do not fit in the pool waiting in the event
+    loop where they can still be cancelled. Instances must be created from within a running event
+    loop.
+    """
+
+    def __init__(
+        self,
+        evg_api: EvergreenApi,
+        worker_pool: WorkerPool,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> None:
+        """
+        Initialize the client.
+
+        :param evg_api: Evergreen API client.
+        :param worker_pool: Pool of workers to run requests on.
+        :param limiter: Adaptive limit on the number of requests in flight.
+        """
+        self.evg_api = evg_api
+        self.worker_pool = worker_pool
+        self.limiter = limiter
+        self._semaphore = asyncio.Semaphore(worker_pool.max_workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run the given blocking function once there is room for another request.
+
+        :param fn: Function to run.
+        :param args: Arguments to pass to function.
+        :return: Result of the function.
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.worker_pool.executor, partial(fn, *args))
+
+    async def request(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Make the given blocking request to Evergreen, within the adaptive limit if there is one.
+
+        Functions that already limit the requests they make should be given to `run` instead,
+        since waiting on the limit from inside the limit could wait forever.
+
+        :param fn: Function making the request.
+        :param args: Arguments to pass to function.
+        :return: Result of the function.
+        """
+        if self.limiter is None:
+            return await self.run(fn, *args)
+        return await self.run(self.limiter.call, fn, *args)
+
+    async def next_item(self, iterator: Iterator[T]) -> Optional[T]:
+        """
+        Get the next item of a lazily paginated iterator.
+
+        :param iterator: Iterator to get item from.
+        :return: Next item of the iterator or None if it is exhausted.
+        """
+        return await self.request(next, iterator, None)
+
+    async def builds_for_version(self, evg_version: Version) -> List[Build]:
+        """
+        Get all the builds of the given version.
+
+        :param evg_version: Version to query.
+        :return: List of builds in the version.
+        """
+        return await self.request(evg_version.get_builds)
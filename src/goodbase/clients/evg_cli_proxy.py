@@ -2,26 +2,33 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Optional
 
+import inject
 from plumbum import local
-from plumbum.machines.local import LocalCommand
+from plumbum.commands.base import BaseCommand
+
+from goodbase.tracing import Tracer
 
 
 class EvgCliProxy:
     """A proxy for interacting with the Evergreen CLI."""
 
-    def __init__(self, evg_cli: LocalCommand) -> None:
+    def __init__(self, evg_cli: Optional[BaseCommand], tracer: Tracer) -> None:
         """
         Initialize the service.
 
-        :param evg_cli: Object for executing cli command.
+        :param evg_cli: Object for executing cli command, if None the evergreen CLI is looked up
+            the first time it is needed.
+        :param tracer: Tracer to record spans of cli commands with.
         """
         self.evg_cli = evg_cli
+        self.tracer = tracer
 
     @classmethod
     def create(cls) -> EvgCliProxy:
         """Create evergreen CLI service instance."""
-        return cls(local.cmd.evergreen)
+        return cls(None, inject.instance(Tracer))
 
     def evaluate(self, project_config_location: Path) -> str:
         """
@@ -31,4 +38,8 @@ class EvgCliProxy:
         :return: Evaluated project configuration.
         """
         args = ["evaluate", "--path", project_config_location]
-        return self.evg_cli[args]()
+        with self.tracer.span("evergreen evaluate", "subprocess", path=project_config_location):
+            evg_cli = self.evg_cli
+            if evg_cli is None:
+                evg_cli = self.evg_cli = local.cmd.evergreen
+            return evg_cli[args]()
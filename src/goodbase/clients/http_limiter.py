@@ -0,0 +1,88 @@
+"""Tell the concurrency limiter about requests the HTTP client had to retry."""
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional, Sequence, Tuple, Union
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+
+from goodbase.clients.http_recording import SCHEMES, Timeout
+from goodbase.concurrency_limiter import THROTTLE_STATUS_CODES, AdaptiveConcurrencyLimiter
+
+
+def overload_reason(retry_history: Sequence[Any]) -> Optional[str]:
+    """
+    Find the first sign of the server being overloaded in the retries of a request.
+
+    :param retry_history: History of the attempts that were retried, as recorded by urllib3.
+    :return: Description of why the request was retried or None if it was not overloaded.
+    """
+    for attempt in retry_history:
+        status_code = attempt.status
+        if status_code is not None and (status_code in THROTTLE_STATUS_CODES or status_code >= 500):
+            return f"HTTP {status_code} retried"
+        if attempt.error is not None:
+            return f"request retried after {type(attempt.error).__name__}"
+    return None
+
+
+class LimiterAdapter(BaseAdapter):
+    """
+    A transport adapter that reports requests that were throttled or failed before succeeding.
+
+    The HTTP client of the Evergreen API retries throttled and failed requests before returning a
+    response, so without this the limiter would only see a request that failed every retry.
+    """
+
+    def __init__(self, adapter: BaseAdapter, limiter: AdaptiveConcurrencyLimiter) -> None:
+        """
+        Initialize the adapter.
+
+        :param adapter: Adapter to send requests with.
+        :param limiter: Limiter to report signs of overload to.
+        """
+        super().__init__()
+        self.adapter = adapter
+        self.limiter = limiter
+
+    @classmethod
+    def install(cls, session: Session, limiter: AdaptiveConcurrencyLimiter) -> None:
+        """
+        Report the retries of all requests sent with the given session to the limiter.
+
+        :param session: Session to report on.
+        :param limiter: Limiter to report signs of overload to.
+        """
+        for scheme in SCHEMES:
+            session.mount(scheme, cls(session.get_adapter(scheme), limiter))
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, bytes, str, Tuple[Union[bytes, str], Union[bytes, str]]] = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """
+        Send the given request and report any retries caused by overload to the limiter.
+
+        :param request: Request to send.
+        :param stream: Whether to stream the response content.
+        :param timeout: How long to wait for the server.
+        :param verify: Whether to verify the TLS certificate of the server.
+        :param cert: Client certificate to send.
+        :param proxies: Proxies to send the request through.
+        :return: Response to request.
+        """
+        response = self.adapter.send(request, stream, timeout, verify, cert, proxies)
+        retries = getattr(response.raw, "retries", None)
+        reason = overload_reason(retries.history) if retries is not None else None
+        if reason is not None:
+            self.limiter.report_overload(reason)
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.adapter.close()
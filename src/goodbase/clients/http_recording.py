@@ -0,0 +1,207 @@
+"""Record and replay the HTTP traffic of the Evergreen API client."""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import structlog
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+LOGGER = structlog.get_logger(__name__)
+
+SCHEMES = ["http://", "https://"]
+RECORDED_HEADERS = {"content-type", "link"}
+
+Timeout = Union[None, float, Tuple[float, float], Tuple[float, None]]
+
+
+def request_key(request: PreparedRequest) -> str:
+    """
+    Get the key a request is recorded under.
+
+    The server is left out of the key, so recordings can be replayed against any server.
+
+    :param request: Request to get key of.
+    :return: Key identifying the request.
+    """
+    url = urlsplit(request.url or "")
+    path = f"{url.path}?{url.query}" if url.query else url.path
+    return f"{request.method} {path}"
+
+
+def recording_file(directory: Path, key: str) -> Path:
+    """
+    Get the file the responses to a request are recorded in.
+
+    :param directory: Directory containing recordings.
+    :param key: Key identifying the request.
+    :return: Path to recording file.
+    """
+    return directory / f"{hashlib.sha256(key.encode()).hexdigest()[:24]}.json"
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    A transport adapter that records every response it receives.
+
+    Each distinct request is recorded in its own file, along with every response received for
+    it in order, so requests made more than once can be replayed faithfully.
+    """
+
+    def __init__(self, adapter: BaseAdapter, record_dir: Path) -> None:
+        """
+        Initialize the adapter.
+
+        :param adapter: Adapter to send requests with.
+        :param record_dir: Directory to record responses to.
+        """
+        super().__init__()
+        self.adapter = adapter
+        self.record_dir = record_dir
+        self._lock = Lock()
+        self._responses: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+    @classmethod
+    def install(cls, session: Session, record_dir: Path) -> None:
+        """
+        Record the responses to all requests sent with the given session.
+
+        :param session: Session to record.
+        :param record_dir: Directory to record responses to.
+        """
+        record_dir.mkdir(parents=True, exist_ok=True)
+        for scheme in SCHEMES:
+            session.mount(scheme, cls(session.get_adapter(scheme), record_dir))
+        LOGGER.debug("Recording Evergreen traffic", record_dir=str(record_dir))
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, bytes, str, Tuple[Union[bytes, str], Union[bytes, str]]] = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """
+        Send the given request and record its response.
+
+        :param request: Request to send.
+        :param stream: Whether to stream the response content.
+        :param timeout: How long to wait for the server.
+        :param verify: Whether to verify the TLS certificate of the server.
+        :param cert: Client certificate to send.
+        :param proxies: Proxies to send the request through.
+        :return: Response to request.
+        """
+        response = self.adapter.send(request, stream, timeout, verify, cert, proxies)
+        key = request_key(request)
+        recorded = {
+            "status_code": response.status_code,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() in RECORDED_HEADERS
+            },
+            "body": response.content.decode("utf-8", errors="replace"),
+        }
+        with self._lock:
+            responses = self._responses[key]
+            responses.append(recorded)
+            contents = json.dumps({"request": key, "responses": responses}, indent=2)
+            recording_file(self.record_dir, key).write_text(contents)
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A transport adapter that answers requests from previously recorded responses.
+
+    Responses to a request are replayed in the order they were recorded, the last one is repeated
+    if the request is made more often than it was recorded. Requests that were never recorded get
+    a 404 response.
+    """
+
+    def __init__(self, replay_dir: Path) -> None:
+        """
+        Initialize the adapter.
+
+        :param replay_dir: Directory containing recorded responses.
+        """
+        super().__init__()
+        self.replay_dir = replay_dir
+        self._lock = Lock()
+        self._n_replayed: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def install(cls, session: Session, replay_dir: Path) -> None:
+        """
+        Answer all requests sent with the given session from recorded responses.
+
+        :param session: Session to replay for.
+        :param replay_dir: Directory containing recorded responses.
+        """
+        adapter = cls(replay_dir)
+        for scheme in SCHEMES:
+            session.mount(scheme, adapter)
+        LOGGER.debug("Replaying Evergreen traffic", replay_dir=str(replay_dir))
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, bytes, str, Tuple[Union[bytes, str], Union[bytes, str]]] = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """
+        Answer the given request with its recorded response.
+
+        :param request: Request to answer.
+        :param stream: Ignored when replaying.
+        :param timeout: Ignored when replaying.
+        :param verify: Ignored when replaying.
+        :param cert: Ignored when replaying.
+        :param proxies: Ignored when replaying.
+        :return: Recorded response to request.
+        """
+        key = request_key(request)
+        replay_file = recording_file(self.replay_dir, key)
+        recorded: Dict[str, Any]
+        if not replay_file.exists():
+            LOGGER.warning("No recorded response for request", request=key)
+            recorded = {
+                "status_code": 404,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"error": f"No recorded response for '{key}'"}),
+            }
+        else:
+            responses = json.loads(replay_file.read_text())["responses"]
+            with self._lock:
+                index = min(self._n_replayed[key], len(responses) - 1)
+                self._n_replayed[key] += 1
+            recorded = responses[index]
+
+        response = Response()
+        response.status_code = recorded["status_code"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = recorded["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        """Nothing to close when replaying."""
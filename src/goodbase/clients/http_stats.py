@@ -0,0 +1,113 @@
+"""Collect statistics about the HTTP traffic of the Evergreen API client."""
+from __future__ import annotations
+
+import re
+from time import perf_counter
+from typing import List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+
+from goodbase.clients.http_recording import SCHEMES, Timeout
+from goodbase.search_stats import SearchStats
+
+ENDPOINTS: List[Tuple[str, "re.Pattern[str]"]] = [
+    (name, re.compile(f"{pattern}$"))
+    for name, pattern in [
+        ("projects", r"/rest/v2/projects"),
+        ("versions", r"/rest/v2/projects/[^/]+/versions"),
+        ("version", r"/rest/v2/versions/[^/]+"),
+        ("version_builds", r"/rest/v2/versions/[^/]+/builds"),
+        ("version_annotations", r"/rest/v2/versions/[^/]+/annotations"),
+        ("build", r"/rest/v2/builds/[^/]+"),
+        ("build_tasks", r"/rest/v2/builds/[^/]+/tasks"),
+        ("task", r"/rest/v2/tasks/[^/]+"),
+        ("task_annotations", r"/rest/v2/tasks/[^/]+/annotations"),
+        ("manifest", r"/plugin/manifest/get/[^/]+/[^/]+"),
+    ]
+]
+OTHER_ENDPOINT = "other"
+
+
+def endpoint_name(request: PreparedRequest) -> str:
+    """
+    Get the name of the endpoint the given request is for.
+
+    :param request: Request to get endpoint of.
+    :return: Name of endpoint.
+    """
+    path = urlsplit(request.url or "").path.rstrip("/")
+    for name, pattern in ENDPOINTS:
+        if pattern.search(path):
+            return name
+    return OTHER_ENDPOINT
+
+
+class StatsAdapter(BaseAdapter):
+    """A transport adapter that records statistics about every request it sends."""
+
+    def __init__(self, adapter: BaseAdapter, stats: SearchStats) -> None:
+        """
+        Initialize the adapter.
+
+        :param adapter: Adapter to send requests with.
+        :param stats: Statistics to record requests in.
+        """
+        super().__init__()
+        self.adapter = adapter
+        self.stats = stats
+
+    @classmethod
+    def install(cls, session: Session, stats: SearchStats) -> None:
+        """
+        Record statistics about all requests sent with the given session.
+
+        :param session: Session to record.
+        :param stats: Statistics to record requests in.
+        """
+        for scheme in SCHEMES:
+            session.mount(scheme, cls(session.get_adapter(scheme), stats))
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, bytes, str, Tuple[Union[bytes, str], Union[bytes, str]]] = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """
+        Send the given request and record statistics about it.
+
+        Unless the response is streamed, its content is read before the request is recorded, so
+        the latency covers receiving the complete response.
+
+        :param request: Request to send.
+        :param stream: Whether to stream the response content.
+        :param timeout: How long to wait for the server.
+        :param verify: Whether to verify the TLS certificate of the server.
+        :param cert: Client certificate to send.
+        :param proxies: Proxies to send the request through.
+        :return: Response to request.
+        """
+        start_time = perf_counter()
+        response = self.adapter.send(request, stream, timeout, verify, cert, proxies)
+        if stream:
+            n_bytes = int(response.headers.get("Content-Length", 0))
+        else:
+            n_bytes = len(response.content)
+        retries = getattr(response.raw, "retries", None)
+        self.stats.record_request(
+            endpoint_name(request),
+            perf_counter() - start_time,
+            n_bytes,
+            len(retries.history) if retries is not None else 0,
+            failed=response.status_code >= 400,
+        )
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.adapter.close()
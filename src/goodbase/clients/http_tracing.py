@@ -0,0 +1,72 @@
+"""Trace the HTTP traffic of the Evergreen API client."""
+from __future__ import annotations
+
+from typing import Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+
+from goodbase.clients.http_recording import SCHEMES, Timeout
+from goodbase.clients.http_stats import endpoint_name
+from goodbase.tracing import Tracer
+
+
+class TracingAdapter(BaseAdapter):
+    """A transport adapter that records a span for every request it sends."""
+
+    def __init__(self, adapter: BaseAdapter, tracer: Tracer) -> None:
+        """
+        Initialize the adapter.
+
+        :param adapter: Adapter to send requests with.
+        :param tracer: Tracer to record spans with.
+        """
+        super().__init__()
+        self.adapter = adapter
+        self.tracer = tracer
+
+    @classmethod
+    def install(cls, session: Session, tracer: Tracer) -> None:
+        """
+        Record a span for all requests sent with the given session.
+
+        :param session: Session to trace.
+        :param tracer: Tracer to record spans with.
+        """
+        for scheme in SCHEMES:
+            session.mount(scheme, cls(session.get_adapter(scheme), tracer))
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, bytes, str, Tuple[Union[bytes, str], Union[bytes, str]]] = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """
+        Send the given request and record a span covering it.
+
+        Unless the response is streamed, its content is read within the span, so the span covers
+        receiving the complete response.
+
+        :param request: Request to send.
+        :param stream: Whether to stream the response content.
+        :param timeout: How long to wait for the server.
+        :param verify: Whether to verify the TLS certificate of the server.
+        :param cert: Client certificate to send.
+        :param proxies: Proxies to send the request through.
+        :return: Response to request.
+        """
+        url = urlsplit(request.url or "")
+        with self.tracer.span(endpoint_name(request), "http", method=request.method, path=url.path):
+            response = self.adapter.send(request, stream, timeout, verify, cert, proxies)
+            if not stream:
+                response.content
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.adapter.close()
@@ -0,0 +1,129 @@
+"""An adaptive limit on the number of requests in flight."""
+from threading import Condition, local
+from time import perf_counter
+from typing import Any, Callable, Optional, TypeVar
+
+import structlog
+from requests.exceptions import HTTPError, Timeout
+
+MIN_LIMIT = 1
+BACKOFF_RATIO = 0.5
+THROTTLE_STATUS_CODES = {429}
+
+LOGGER = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit the number of requests in flight, adapting the limit to how the server responds.
+
+    The limit is adjusted with additive-increase/multiplicative-decrease. Each request that
+    completes normally raises the limit by a fraction, so the limit grows by about one for every
+    full round of requests. The limit is only cut on signs that the server is overloaded: when it
+    throttles a request, fails with a server error or a request times out. The HTTP client
+    retries those responses itself, so a request that only succeeded after being retried is
+    reported with `report_overload` and counts as a sign of overload too. Latency alone is not
+    used, since requests to the same endpoint can take very different but steady amounts of time
+    depending on what they return. Only one cut is made for requests that started before the
+    previous cut, so a burst of failures from the same round only backs off once.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        initial_limit: Optional[int] = None,
+        min_limit: int = MIN_LIMIT,
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        :param max_limit: Maximum number of requests to allow in flight.
+        :param initial_limit: Number of requests to allow in flight at first, defaults to the
+            maximum.
+        :param min_limit: Minimum number of requests to allow in flight.
+        """
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        if initial_limit is None:
+            initial_limit = max_limit
+        self._limit = float(max(self.min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._last_backoff = perf_counter()
+        self._condition = Condition()
+        self._current = local()
+
+    @property
+    def limit(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    def call(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Call the given function once there is room for another request.
+
+        :param fn: Function making the request.
+        :param args: Arguments to pass to function.
+        :return: Result of the function.
+        """
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+        start_time = perf_counter()
+        self._current.backoff_reason = ""
+        try:
+            result = fn(*args)
+        except HTTPError as err:
+            status_code = err.response.status_code if err.response is not None else None
+            if status_code in THROTTLE_STATUS_CODES or (status_code or 0) >= 500:
+                self._release(start_time, backoff_reason=f"HTTP {status_code}")
+            else:
+                self._release(start_time, backoff_reason=self._current.backoff_reason)
+            raise
+        except Timeout:
+            self._release(start_time, backoff_reason="request timed out")
+            raise
+        except BaseException:
+            self._release(start_time, backoff_reason=self._current.backoff_reason)
+            raise
+
+        self._release(start_time, backoff_reason=self._current.backoff_reason)
+        return result
+
+    def report_overload(self, reason: str) -> None:
+        """
+        Report that the server showed signs of overload while the current request was being made.
+
+        The limit is cut once the request made by `call` on the current thread finishes.
+
+        :param reason: Description of what the server did.
+        """
+        self._current.backoff_reason = reason
+
+    def _release(self, start_time: float, backoff_reason: str = "") -> None:
+        """
+        Release the slot of a finished request and adjust the limit.
+
+        :param start_time: Time the request started.
+        :param backoff_reason: Reason to cut the limit, if any.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            previous_limit = self.limit
+            if not backoff_reason:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                if self.limit != previous_limit:
+                    LOGGER.debug("Increased concurrency limit", limit=self.limit)
+            elif start_time > self._last_backoff:
+                self._limit = max(self.min_limit, self._limit * BACKOFF_RATIO)
+                self._last_backoff = perf_counter()
+                LOGGER.debug(
+                    "Backing off concurrency limit",
+                    reason=backoff_reason,
+                    previous_limit=previous_limit,
+                    limit=self.limit,
+                )
+            self._condition.notify_all()
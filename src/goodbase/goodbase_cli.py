@@ -4,8 +4,10 @@ import logging
 import os.path
 import re
 import sys
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, List, NamedTuple, Optional
+from threading import Event
+from typing import Any, Dict, List, NamedTuple, Optional
 
 import click
 import inject
@@ -20,11 +22,21 @@ from structlog.stdlib import LoggerFactory
 
 from goodbase.build_checker import BuildChecks
 from goodbase.clients.evg_cli_proxy import EvgCliProxy
+from goodbase.clients.http_limiter import LimiterAdapter
+from goodbase.clients.http_recording import RecordingAdapter, ReplayAdapter
+from goodbase.clients.http_stats import StatsAdapter
+from goodbase.clients.http_tracing import TracingAdapter
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
 from goodbase.goodbase_options import GoodBaseOptions, OutputFormat
+from goodbase.profiling import RunProfiler
+from goodbase.search_stats import SearchStats
+from goodbase.services.build_cache_service import BuildCacheService
 from goodbase.services.criteria_service import CriteriaService
 from goodbase.services.evg_service import EvergreenService
 from goodbase.services.git_service import GitAction, GitService
 from goodbase.services.search_service import SearchService
+from goodbase.tracing import Tracer
+from goodbase.worker_pool import DEFAULT_MAX_CONCURRENCY, WorkerPool
 
 LOGGER = structlog.get_logger(__name__)
 
@@ -33,6 +45,8 @@ DEFAULT_EVG_PROJECT = "mongodb-mongo-master"
 DEFAULT_EVG_PROJECT_CONFIG = "etc/evergreen.yml"
 MAX_LOOKBACK = 50
 DEFAULT_THRESHOLD = 0.95
+DEFAULT_CRITERIA_GROUP = "default"
+BASE_REPOSITORY = "BASE"
 EXTERNAL_LOGGERS = [
     "evergreen",
     "inject",
@@ -55,6 +69,18 @@ class RevisionInformation(NamedTuple):
     errors: Optional[Dict[str, str]] = None
 
 
+class BackgroundFetch(NamedTuple):
+    """
+    Details about the fetches started in the background while searching.
+
+    module_directories: Dictionary of modules checked out locally and their directories.
+    fetch_jobs: Dictionary of repositories and the job fetching each of them.
+    """
+
+    module_directories: Dict[str, Path]
+    fetch_jobs: Dict[str, "Future[Optional[str]]"]
+
+
 class GoodBaseOrchestrator:
     """Orchestrator for checking base commits."""
 
@@ -67,6 +93,8 @@ class GoodBaseOrchestrator:
         search_service: SearchService,
         options: GoodBaseOptions,
         console: Console,
+        worker_pool: WorkerPool,
+        stats: SearchStats,
     ) -> None:
         """
         Initialize the orchestrator.
@@ -77,6 +105,8 @@ class GoodBaseOrchestrator:
         :param search_service: Service to search revisions.
         :param options: Options for execution.
         :param console: Rich console to print to.
+        :param worker_pool: Pool of workers to run blocking operations on.
+        :param stats: Statistics about the work done.
         """
         self.evg_service = evg_service
         self.git_service = git_service
@@ -84,6 +114,8 @@ class GoodBaseOrchestrator:
         self.search_service = search_service
         self.options = options
         self.console = console
+        self.worker_pool = worker_pool
+        self.stats = stats
 
     def attempt_git_operation(
         self, operation: GitAction, revision: str, directory: Optional[Path] = None
@@ -91,47 +123,177 @@ class GoodBaseOrchestrator:
         """
         Attempt to perform the specified git operation.
 
+        The revision is fetched from origin first if it is not available locally.
+
         :param operation: Git operation to perform.
         :param revision: Git revision to perform operation on.
         :param directory: Directory of git repository.
         :return: Error message if an error was encountered.
         """
+        if operation == GitAction.NONE:
+            return None
+
+        errmsg = self.attempt_git_fetch([revision], directory)
+        if errmsg:
+            return errmsg
+
         try:
-            self.git_service.perform_action(
-                operation, revision, directory, self.options.branch_name
-            )
+            with self.stats.timer(f"git {GitAction(operation).value}"):
+                self.git_service.perform_action(
+                    operation, revision, directory, self.options.branch_name
+                )
         except ProcessExecutionError:
             LOGGER.warning("Error encountered during git operation", exc_info=True)
             return f"Encountered error performing '{operation}' on '{revision}'"
         return None
 
+    def attempt_git_fetch(
+        self, revisions: List[str], directory: Optional[Path] = None
+    ) -> Optional[str]:
+        """
+        Attempt to fetch any of the given revisions that are not available locally from origin.
+
+        :param revisions: Git revisions that need to be available locally.
+        :param directory: Directory of git repository.
+        :return: Error message if an error was encountered.
+        """
+        try:
+            with self.stats.timer("git fetch"):
+                self.git_service.fetch_missing(revisions, directory)
+        except ProcessExecutionError:
+            LOGGER.warning("Error encountered during git fetch", exc_info=True)
+            return f"Encountered error fetching from origin in '{directory or Path.cwd()}'"
+        return None
+
+    def module_directories(self, evg_project: str) -> Dict[str, Path]:
+        """
+        Get the directories of the modules of the given project that are checked out locally.
+
+        :param evg_project: Evergreen project of modules.
+        :return: Dictionary of module names and their directories.
+        """
+        module_locations = self.evg_service.get_module_locations(evg_project)
+        module_directories = {
+            module: Path(location) / module for module, location in module_locations.items()
+        }
+        return {
+            module: directory
+            for module, directory in module_directories.items()
+            if directory.exists()
+        }
+
+    def fetch_unless_cancelled(
+        self, cancelled: Event, revisions: List[str], directory: Optional[Path] = None
+    ) -> Optional[str]:
+        """
+        Fetch any of the given revisions that are missing locally, unless the fetch was cancelled.
+
+        :param cancelled: Event set once the fetch is no longer needed.
+        :param revisions: Git revisions that need to be available locally.
+        :param directory: Directory of git repository.
+        :return: Error message if an error was encountered.
+        """
+        if cancelled.is_set():
+            return None
+        return self.attempt_git_fetch(revisions, directory)
+
+    def fetch_newest_revisions(
+        self, evg_project: str, version_override: Optional[str], cancelled: Event
+    ) -> BackgroundFetch:
+        """
+        Start fetching the newest revision a search could find into the repository and its modules.
+
+        Any revision found by the search is an ancestor of the newest one, so once the newest
+        revisions are available locally, the revisions found will be too. Each repository is
+        fetched by its own job in the worker pool, and nothing is fetched for repositories that
+        already have the revision. The modules checked out locally are looked up here too, so
+        that lookup also overlaps the search. Once the given event is set, no more fetches are
+        started.
+
+        :param evg_project: Evergreen project being searched.
+        :param version_override: A specific version being searched instead of the project.
+        :param cancelled: Event set once the fetches are no longer needed.
+        :return: Modules checked out locally and the jobs fetching each repository.
+        """
+        fetch_jobs: Dict[str, "Future[Optional[str]]"] = {}
+        revision = self.search_service.newest_revision(evg_project, version_override)
+        if revision is not None and not cancelled.is_set():
+            fetch_jobs[BASE_REPOSITORY] = self.worker_pool.submit(
+                self.fetch_unless_cancelled, cancelled, [revision]
+            )
+
+        module_directories = self.module_directories(evg_project)
+        if revision is not None and module_directories and not cancelled.is_set():
+            module_revisions = self.evg_service.get_modules_revisions(evg_project, revision)
+            for module, directory in module_directories.items():
+                if module in module_revisions and not cancelled.is_set():
+                    fetch_jobs[module] = self.worker_pool.submit(
+                        self.fetch_unless_cancelled,
+                        cancelled,
+                        [module_revisions[module]],
+                        directory,
+                    )
+        return BackgroundFetch(module_directories, fetch_jobs)
+
+    @staticmethod
+    def wait_for_fetch(fetch_job: Optional[Future]) -> None:
+        """
+        Wait for a background fetch to finish.
+
+        Errors are only logged, since any revision still missing afterwards is fetched again
+        before it is used.
+
+        :param fetch_job: Background fetch to wait for, if any.
+        """
+        if fetch_job is None:
+            return
+        try:
+            fetch_job.result()
+        except Exception:
+            LOGGER.warning("Error encountered during background fetch", exc_info=True)
+
     def checkout_modules(
-        self, evg_project: str, module_revisions: Dict[str, str]
+        self,
+        module_revisions: Dict[str, str],
+        module_directories: Dict[str, Path],
+        fetch_jobs: Optional[Dict[str, "Future[Optional[str]]"]] = None,
     ) -> Dict[str, str]:
         """
         Checkout existing modules to the specified revisions.
 
-        :param evg_project: Evergreen project of modules.
+        The git operations of the modules run concurrently on the worker pool. Each one only
+        starts once the background fetch of its module has finished, and since work in the pool
+        must not wait on other work in the pool, the fetches are waited for before submitting.
+
         :param module_revisions: Dictionary of module names and git revisions to check out.
+        :param module_directories: Dictionary of modules checked out locally and their directories.
+        :param fetch_jobs: Dictionary of modules and the job fetching each in the background.
         :return: Dictionary of error encountered.
         """
         if self.options.operation == GitAction.NONE:
             return {}
 
-        module_locations = self.evg_service.get_module_locations(evg_project)
         LOGGER.debug(
             "Checking out modules",
-            module_locations=module_locations,
+            module_directories=module_directories,
             module_revisions=module_revisions,
         )
-        errors_encountered = {}
-        for module, module_rev in module_revisions.items():
-            directory = Path(module_locations[module]) / module
-            if directory.exists():
-                errmsg = self.attempt_git_operation(self.options.operation, module_rev, directory)
-                if errmsg:
-                    errors_encountered[module] = errmsg
+        fetch_jobs = fetch_jobs or {}
+        jobs = {}
+        for module, revision in module_revisions.items():
+            directory = module_directories.get(module)
+            if directory is None:
+                continue
+            self.wait_for_fetch(fetch_jobs.get(module))
+            jobs[module] = self.worker_pool.submit(
+                self.attempt_git_operation, self.options.operation, revision, directory
+            )
 
+        errors_encountered = {}
+        for module, job in jobs.items():
+            errmsg = job.result()
+            if errmsg:
+                errors_encountered[module] = errmsg
         return errors_encountered
 
     def checkout_good_base(
@@ -144,25 +306,95 @@ class GoodBaseOrchestrator:
         """
         Find the latest git revision that matches the criteria and check it out in git.
 
+        When a git operation is to be performed, the newest revision the search could find is
+        fetched from origin in the background while the search runs, if it is not already
+        available locally. The fetch of each repository is finished before any git operation
+        starts in it. If no revision is found, any fetches that have not started are skipped.
+
         :param evg_project: Evergreen project to check.
         :param build_checks: Criteria to enforce.
         :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param version_override: A specific version to check.
         :return: Revision that was checked out, if it exists.
         """
+        cancelled = Event()
+        fetch_job = None
+        if self.options.operation != GitAction.NONE:
+            fetch_job = self.worker_pool.submit(
+                self.fetch_newest_revisions, evg_project, version_override, cancelled
+            )
+
         revision = self.search_service.find_revision(
             evg_project, build_checks, version_override, allow_known_failures
         )
-        if revision:
-            module_revisions = self.evg_service.get_modules_revisions(evg_project, revision)
-            errmsg = self.attempt_git_operation(self.options.operation, revision)
-            errors_encountered = self.checkout_modules(evg_project, module_revisions)
-            if errmsg:
-                errors_encountered["BASE"] = errmsg
+        if not revision:
+            cancelled.set()
+            if fetch_job is not None:
+                fetch_job.cancel()
+            return None
+
+        module_revisions_job = self.worker_pool.submit(
+            self.evg_service.get_modules_revisions, evg_project, revision
+        )
+        background_fetch = BackgroundFetch({}, {})
+        if fetch_job is not None:
+            try:
+                background_fetch = fetch_job.result()
+            except Exception:
+                LOGGER.warning("Could not start background fetch", exc_info=True)
+                background_fetch = BackgroundFetch(self.module_directories(evg_project), {})
+        self.wait_for_fetch(background_fetch.fetch_jobs.get(BASE_REPOSITORY))
+        errmsg = self.attempt_git_operation(self.options.operation, revision)
+        module_revisions = module_revisions_job.result()
+        errors_encountered = self.checkout_modules(
+            module_revisions, background_fetch.module_directories, background_fetch.fetch_jobs
+        )
+        if errmsg:
+            errors_encountered[BASE_REPOSITORY] = errmsg
+
+        return RevisionInformation(
+            revision=revision, module_revisions=module_revisions, errors=errors_encountered
+        )
 
-            return RevisionInformation(
-                revision=revision, module_revisions=module_revisions, errors=errors_encountered
+    def find_good_bases(
+        self,
+        evg_project: str,
+        criteria_groups: Dict[str, List[BuildChecks]],
+        allow_known_failures: bool = False,
+        version_override: Optional[str] = None,
+        max_results: int = 1,
+    ) -> Dict[str, List[RevisionInformation]]:
+        """
+        Find the latest git revisions that match each of the given groups of criteria.
+
+        No git operations are performed on the revisions found.
+
+        :param evg_project: Evergreen project to check.
+        :param criteria_groups: Dictionary of group names and the criteria of each group.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param version_override: A specific version to check.
+        :param max_results: Number of revisions to find for each group.
+        :return: Dictionary of group names and the revisions found for each group, newest first.
+        """
+        revisions = self.search_service.find_revisions(
+            evg_project, criteria_groups, version_override, allow_known_failures, max_results
+        )
+        module_revisions_jobs = {
+            revision: self.worker_pool.submit(
+                self.evg_service.get_modules_revisions, evg_project, revision
             )
-        return None
+            for group_revisions in revisions.values()
+            for revision in group_revisions
+        }
+        return {
+            name: [
+                RevisionInformation(
+                    revision=revision, module_revisions=module_revisions_jobs[revision].result()
+                )
+                for revision in group_revisions
+            ]
+            for name, group_revisions in revisions.items()
+        }
 
     def save_criteria(self, name: str, build_checks: BuildChecks) -> None:
         """
@@ -223,6 +455,84 @@ class GoodBaseOrchestrator:
             self.console.print(table)
 
 
+def revision_to_dict(revision: RevisionInformation) -> Dict[str, str]:
+    """
+    Convert the given revision information to a dictionary for output.
+
+    :param revision: Revision information to convert.
+    :return: Dictionary of module names and revisions, along with the stable revision.
+    """
+    revision_dict = {
+        module_name: module_revision
+        for module_name, module_revision in revision.module_revisions.items()
+    }
+    revision_dict["stable_revision"] = revision.revision
+    return revision_dict
+
+
+def display_revision(revision: RevisionInformation) -> None:
+    """
+    Display the given revision information as plaintext.
+
+    :param revision: Revision information to display.
+    """
+    click.echo(click.style(f"Found revision: {revision.revision}", fg="green"))
+    for module_name, module_revision in revision.module_revisions.items():
+        click.echo(click.style(f"\t{module_name}: {module_revision}", fg="green"))
+
+
+def display_stats(report: Dict[str, Any], output_format: OutputFormat) -> None:
+    """
+    Display a report of the work done to stderr.
+
+    :param report: Report to display.
+    :param output_format: Format to display report in.
+    """
+    if output_format == OutputFormat.YAML:
+        click.echo(yaml.dump({"stats": report}, sort_keys=False), err=True)
+        return
+    if output_format == OutputFormat.JSON:
+        click.echo(json.dumps({"stats": report}), err=True)
+        return
+
+    console = Console(stderr=True)
+    requests = report["requests"]
+    console.print(
+        f"Finished in {report['elapsed_secs']:.2f}s: {requests['count']} requests, "
+        f"{requests['bytes_received']} bytes received, {requests['retries']} retries"
+    )
+
+    counters = Table(title="Counters")
+    counters.add_column("Counter")
+    counters.add_column("Count", justify="right")
+    for name, count in report["counters"].items():
+        counters.add_row(name, str(count))
+    console.print(counters)
+
+    latencies = Table(title="Latency")
+    latencies.add_column("Request / Operation")
+    latencies.add_column("Count", justify="right")
+    latencies.add_column("Bytes", justify="right")
+    latencies.add_column("Retries", justify="right")
+    latencies.add_column("Total (s)", justify="right")
+    latencies.add_column("p50 (s)", justify="right")
+    latencies.add_column("p95 (s)", justify="right")
+    latencies.add_column("p99 (s)", justify="right")
+    rows = list(requests["endpoints"].items()) + list(report["operations"].items())
+    for name, entry in rows:
+        latencies.add_row(
+            name,
+            str(entry["count"]),
+            str(entry.get("bytes", "")),
+            str(entry.get("retries", "")),
+            f"{entry['total_secs']:.3f}",
+            f"{entry['p50_secs']:.3f}",
+            f"{entry['p95_secs']:.3f}",
+            f"{entry['p99_secs']:.3f}",
+        )
+    console.print(latencies)
+
+
 def configure_logging(verbose: bool) -> None:
     """
     Configure logging.
@@ -307,6 +617,31 @@ def configure_logging(verbose: bool) -> None:
     type=str,
     help="Oldest commit to check before giving up.",
 )
+@click.option(
+    "--search-window",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of versions to evaluate concurrently while searching.",
+)
+@click.option(
+    "--max-concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_CONCURRENCY,
+    help="Maximum number of requests to Evergreen to make at once.",
+)
+@click.option(
+    "--async-fetch",
+    is_flag=True,
+    default=False,
+    help="Fetch data from Evergreen using a single asyncio event loop.",
+)
+@click.option(
+    "--max-results",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of matching revisions to report, newest first. When more than one, no git "
+    "operations are performed.",
+)
 @click.option(
     "--git-operation",
     type=click.Choice([a.value for a in GitAction]),
@@ -323,7 +658,13 @@ def configure_logging(verbose: bool) -> None:
     type=str,
     help="Save the specified criteria rules under the specified name for future use.",
 )
-@click.option("--use-criteria", type=str, help="Use previously save criteria rules.")
+@click.option(
+    "--use-criteria",
+    type=str,
+    multiple=True,
+    help="Use previously save criteria rules. When specified multiple times, the latest revision "
+    "matching each of them is reported without performing any git operations.",
+)
 @click.option("--list-criteria", is_flag=True, help="Display saved criteria.")
 @click.option(
     "--override",
@@ -344,6 +685,40 @@ def configure_logging(verbose: bool) -> None:
     default=OutputFormat.PLAINTEXT.value,
     help="Format of the command output.",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Do not use or update the local cache of build results.",
+)
+@click.option(
+    "--record",
+    type=click.Path(file_okay=False),
+    help="Record all responses from Evergreen to the given directory.",
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, file_okay=False),
+    help="Answer requests to Evergreen from responses previously recorded with `--record`.",
+)
+@click.option(
+    "--stats",
+    "show_stats",
+    is_flag=True,
+    default=False,
+    help="Display statistics about the requests made and the time spent on them.",
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False),
+    help="Write a trace of the search to the given file in the Chrome trace event format.",
+)
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False),
+    help="Profile the run and write the pstats dump to the given file, along with a summary of "
+    "the top memory allocations.",
+)
 @click.option("--verbose", is_flag=True, default=False, help="Enable debug logging.")
 def main(
     ctx: click.Context,
@@ -359,16 +734,26 @@ def main(
     commit_lookback: int,
     commit_limit: Optional[str],
     timeout_secs: Optional[int],
+    search_window: int,
+    max_concurrency: int,
+    async_fetch: bool,
+    max_results: int,
     git_operation: GitAction,
     branch: Optional[str],
     save_criteria: Optional[str],
-    use_criteria: Optional[str],
+    use_criteria: List[str],
     list_criteria: bool,
     export_criteria: List[str],
     export_file: str,
     import_criteria: Optional[str],
     output_format: OutputFormat,
     override: bool,
+    no_cache: bool,
+    record: Optional[str],
+    replay: Optional[str],
+    show_stats: bool,
+    trace_file: Optional[str],
+    profile: Optional[str],
     verbose: bool,
     allow_known_failures: bool,
     version_override: Optional[str],
@@ -423,9 +808,31 @@ def main(
     """
     configure_logging(verbose)
 
+    if profile:
+        profiler = RunProfiler(Path(profile))
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
+
     evg_config_file = os.path.expanduser(evg_config_file)
     evg_api = RetryingEvergreenApi.get_api(config_file=evg_config_file)
 
+    if record and replay:
+        click.echo(click.style("Can only specify `--record` or `--replay`, not both", fg="red"))
+        sys.exit(1)
+
+    if record:
+        RecordingAdapter.install(evg_api.session, Path(record))
+    elif replay:
+        ReplayAdapter.install(evg_api.session, Path(replay))
+
+    stats = SearchStats()
+    if show_stats:
+        StatsAdapter.install(evg_api.session, stats)
+
+    tracer = Tracer(enabled=trace_file is not None)
+    if tracer.enabled:
+        TracingAdapter.install(evg_api.session, tracer)
+
     if build_variant and display_variant_name:
         click.echo(
             click.style(
@@ -461,6 +868,9 @@ def main(
         timeout_secs=timeout_secs,
         branch_name=branch,
         output_format=output_format,
+        search_window=search_window,
+        max_concurrency=max_concurrency,
+        async_fetch=async_fetch,
     )
 
     display_variant_name_checks = display_variant_name
@@ -505,10 +915,22 @@ def main(
     if not any([pass_threshold, fail_threshold, run_threshold, passing_task, run_task]):
         build_checks.success_threshold = DEFAULT_THRESHOLD
 
+    worker_pool = WorkerPool(options.max_concurrency)
+    ctx.call_on_close(worker_pool.shutdown)
+    limiter = AdaptiveConcurrencyLimiter(max_limit=options.max_concurrency)
+    LimiterAdapter.install(evg_api.session, limiter)
+
     def dependencies(binder: inject.Binder) -> None:
         binder.bind(EvergreenApi, evg_api)
         binder.bind(GoodBaseOptions, options)
+        binder.bind(SearchStats, stats)
+        binder.bind(Tracer, tracer)
         binder.bind_to_provider(EvgCliProxy, EvgCliProxy.create)
+        # Cached results would hide requests from a recording or replay.
+        use_cache = not (no_cache or record or replay)
+        binder.bind(BuildCacheService, BuildCacheService.create(enabled=use_cache))
+        binder.bind(WorkerPool, worker_pool)
+        binder.bind(AdaptiveConcurrencyLimiter, limiter)
 
     inject.configure(dependencies)
 
@@ -541,11 +963,77 @@ def main(
             click.echo(click.style(str(err), fg="red"))
             sys.exit(1)
 
+    elif len(use_criteria) > 1 or max_results > 1:
+        if git_operation != GitAction.NONE:
+            click.echo(
+                click.style(
+                    "Git operations cannot be performed when searching for more than one "
+                    "revision with `--use-criteria` or `--max-results`",
+                    fg="red",
+                )
+            )
+            sys.exit(1)
+
+        if async_fetch:
+            click.echo(
+                click.style(
+                    "`--async-fetch` cannot be used when searching for more than one revision "
+                    "with `--use-criteria` or `--max-results`",
+                    fg="red",
+                )
+            )
+            sys.exit(1)
+
+        criteria_groups = {DEFAULT_CRITERIA_GROUP: [build_checks]}
+        if use_criteria:
+            criteria_groups = {}
+            for name in use_criteria:
+                try:
+                    criteria_groups[name] = orchestrator.lookup_criteria(name)
+                except ValueError as err:
+                    click.echo(click.style(f"Could not use: {name}", fg="red"))
+                    click.echo(click.style(str(err), fg="red"))
+                    sys.exit(1)
+
+        try:
+            revisions = orchestrator.find_good_bases(
+                evg_project, criteria_groups, allow_known_failures, version_override, max_results
+            )
+        finally:
+            if trace_file:
+                tracer.write(Path(trace_file))
+
+        if show_stats:
+            display_stats(stats.report(), output_format)
+
+        output: Any = {
+            name: [revision_to_dict(group_revision) for group_revision in group_revisions]
+            for name, group_revisions in revisions.items()
+        }
+        if len(criteria_groups) == 1:
+            [output] = output.values()
+
+        if output_format == OutputFormat.YAML:
+            print(yaml.dump(output, sort_keys=False))
+        elif output_format == OutputFormat.JSON:
+            print(json.dumps(output))
+        else:  # "plaintext"
+            for name, group_revisions in revisions.items():
+                if len(criteria_groups) > 1:
+                    click.echo(click.style(f"{name}:", bold=True))
+                for group_revision in group_revisions:
+                    display_revision(group_revision)
+                if not group_revisions:
+                    click.echo(click.style("No revision found", fg="red"))
+
+        if not any(revisions.values()):
+            sys.exit(1)
+
     else:
         criteria = [build_checks]
         if use_criteria:
             try:
-                criteria = orchestrator.lookup_criteria(use_criteria)
+                criteria = orchestrator.lookup_criteria(use_criteria[0])
             except ValueError as err:
                 click.echo(click.style(f"Could not use: {save_criteria}", fg="red"))
                 click.echo(click.style(str(err), fg="red"))
@@ -561,25 +1049,26 @@ def main(
             )
             return
 
-        revision = orchestrator.checkout_good_base(
-            evg_project, criteria, allow_known_failures, version_override
-        )
+        try:
+            revision = orchestrator.checkout_good_base(
+                evg_project, criteria, allow_known_failures, version_override
+            )
+        finally:
+            if trace_file:
+                tracer.write(Path(trace_file))
+
+        if show_stats:
+            display_stats(stats.report(), output_format)
 
         if revision:
-            revision_dict = {
-                module_name: module_revision
-                for module_name, module_revision in revision.module_revisions.items()
-            }
-            revision_dict["stable_revision"] = revision.revision
+            revision_dict = revision_to_dict(revision)
 
             if output_format == OutputFormat.YAML:
                 print(yaml.dump(revision_dict, sort_keys=False))
             elif output_format == OutputFormat.JSON:
                 print(json.dumps(revision_dict))
             else:  # "plaintext"
-                click.echo(click.style(f"Found revision: {revision.revision}", fg="green"))
-                for module_name, module_revision in revision.module_revisions.items():
-                    click.echo(click.style(f"\t{module_name}: {module_revision}", fg="green"))
+                display_revision(revision)
 
             if revision.errors:
                 click.echo(
@@ -5,6 +5,7 @@ from typing import NamedTuple, Optional
 import structlog
 
 from goodbase.services.git_service import GitAction
+from goodbase.worker_pool import DEFAULT_MAX_CONCURRENCY
 
 LOGGER = structlog.get_logger(__name__)
 
@@ -28,6 +29,9 @@ class GoodBaseOptions(NamedTuple):
     * timeouts_secs: Number of seconds to scan before timing out.
     * branch_name: Name of branch to create on checkout.
     * output_format: Format to display output in.
+    * search_window: Number of versions to evaluate concurrently while searching.
+    * max_concurrency: Maximum number of requests to make at once.
+    * async_fetch: Fetch data from Evergreen with the asyncio based client.
     """
 
     max_lookback: int
@@ -37,6 +41,9 @@ class GoodBaseOptions(NamedTuple):
     timeout_secs: Optional[int] = None
     branch_name: Optional[str] = None
     output_format: OutputFormat = OutputFormat.PLAINTEXT
+    search_window: int = 1
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    async_fetch: bool = False
 
     def lookback_limit_hit(self, index: int, revision: str, elapsed_seconds: float) -> bool:
         """
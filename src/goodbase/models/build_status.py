@@ -1,34 +1,218 @@
 """Model for evergreen build status."""
-from dataclasses import dataclass
-from typing import Set
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Set
+
+
+class TaskNameTable:
+    """
+    A table giving each task name seen during a run its own bit.
+
+    The builds of every version run mostly the same tasks, so storing the tasks of a build as the
+    bits of an integer avoids keeping a set of the same names around for every build.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the table."""
+        self._lock = Lock()
+        self._bits: Dict[str, int] = {}
+        self._names: List[str] = []
+
+    def mask(self, names: Iterable[str]) -> int:
+        """
+        Get the bitset of the given task names, adding any names not seen before to the table.
+
+        :param names: Task names to get bitset of.
+        :return: Integer with the bit of each of the given task names set.
+        """
+        mask = 0
+        for name in names:
+            bit = self._bits.get(name)
+            if bit is None:
+                bit = self._add(name)
+            mask |= bit
+        return mask
+
+    def names(self, mask: int) -> Set[str]:
+        """
+        Get the task names in the given bitset.
+
+        :param mask: Bitset of task names.
+        :return: Set of task names.
+        """
+        names = set()
+        while mask:
+            bit = mask & -mask
+            names.add(self._names[bit.bit_length() - 1])
+            mask ^= bit
+        return names
+
+    def _add(self, name: str) -> int:
+        """
+        Add the given task name to the table.
+
+        :param name: Task name to add.
+        :return: Bit of task name.
+        """
+        with self._lock:
+            if name not in self._bits:
+                # Names are looked up without the lock, so a bit is only published once its name
+                # can be found by `names`.
+                self._names.append(name)
+                self._bits[name] = 1 << (len(self._names) - 1)
+            return self._bits[name]
+
+
+TASK_NAMES = TaskNameTable()
+
+
+def count_tasks(mask: int) -> int:
+    """
+    Count the task names in the given bitset.
+
+    :param mask: Bitset of task names.
+    :return: Number of task names.
+    """
+    return bin(mask).count("1")
 
 
-@dataclass
 class BuildStatus:
     """
     A summary of the results of an evergreen build.
 
+    The tasks of the build are stored as bitsets of the names in `TASK_NAMES`.
+
     build_name: Name of build results are for.
     build_variant: Name of build variant results are for.
     successful_task: Set of tasks that were successful.
     inactive_tasks: Set of tasks that have not be run.
     all_tasks: Set of all tasks in the build.
+    has_task_details: False if only the number of tasks in each state is known.
+    n_successful_tasks: Number of tasks that were successful.
+    n_inactive_tasks: Number of tasks that have not be run.
+    n_tasks: Number of tasks in the build.
     """
 
-    build_name: str
-    build_variant: str
-    successful_tasks: Set[str]
-    inactive_tasks: Set[str]
-    all_tasks: Set[str]
+    __slots__ = (
+        "build_name",
+        "build_variant",
+        "successful_mask",
+        "inactive_mask",
+        "all_mask",
+        "has_task_details",
+        "n_successful_tasks",
+        "n_inactive_tasks",
+        "n_tasks",
+    )
+
+    def __init__(
+        self,
+        build_name: str,
+        build_variant: str,
+        successful_tasks: Iterable[str],
+        inactive_tasks: Iterable[str],
+        all_tasks: Iterable[str],
+        has_task_details: bool = True,
+        n_successful_tasks: int = 0,
+        n_inactive_tasks: int = 0,
+        n_tasks: int = 0,
+    ) -> None:
+        """
+        Initialize the build status, counting the tasks in each state when their details are known.
+
+        :param build_name: Name of build results are for.
+        :param build_variant: Name of build variant results are for.
+        :param successful_tasks: Tasks that were successful.
+        :param inactive_tasks: Tasks that have not be run.
+        :param all_tasks: All tasks in the build.
+        :param has_task_details: False if only the number of tasks in each state is known.
+        :param n_successful_tasks: Number of tasks that were successful.
+        :param n_inactive_tasks: Number of tasks that have not be run.
+        :param n_tasks: Number of tasks in the build.
+        """
+        self.build_name = build_name
+        self.build_variant = build_variant
+        self.successful_mask = TASK_NAMES.mask(successful_tasks)
+        self.inactive_mask = TASK_NAMES.mask(inactive_tasks)
+        self.all_mask = TASK_NAMES.mask(all_tasks)
+        self.has_task_details = has_task_details
+        self.n_successful_tasks = n_successful_tasks
+        self.n_inactive_tasks = n_inactive_tasks
+        self.n_tasks = n_tasks
+        if has_task_details:
+            self.n_successful_tasks = count_tasks(self.successful_mask)
+            self.n_inactive_tasks = count_tasks(self.inactive_mask)
+            self.n_tasks = count_tasks(self.all_mask)
+
+    @classmethod
+    def from_task_counts(
+        cls,
+        build_name: str,
+        build_variant: str,
+        n_successful_tasks: int,
+        n_inactive_tasks: int,
+        n_tasks: int,
+    ) -> BuildStatus:
+        """
+        Create a build status that only knows the number of tasks in each state.
+
+        :param build_name: Name of build results are for.
+        :param build_variant: Name of build variant results are for.
+        :param n_successful_tasks: Number of tasks that were successful.
+        :param n_inactive_tasks: Number of tasks that have not be run.
+        :param n_tasks: Number of tasks in the build.
+        :return: Build status without task details.
+        """
+        return cls(
+            build_name=build_name,
+            build_variant=build_variant,
+            successful_tasks=(),
+            inactive_tasks=(),
+            all_tasks=(),
+            has_task_details=False,
+            n_successful_tasks=n_successful_tasks,
+            n_inactive_tasks=n_inactive_tasks,
+            n_tasks=n_tasks,
+        )
+
+    @property
+    def successful_tasks(self) -> Set[str]:
+        """Set of tasks that were successful."""
+        return TASK_NAMES.names(self.successful_mask)
+
+    @property
+    def inactive_tasks(self) -> Set[str]:
+        """Set of tasks that have not be run."""
+        return TASK_NAMES.names(self.inactive_mask)
+
+    @property
+    def all_tasks(self) -> Set[str]:
+        """Set of all tasks in the build."""
+        return TASK_NAMES.names(self.all_mask)
 
     def success_pct(self) -> float:
         """Percentage of tasks that were successful."""
-        return len(self.successful_tasks) / len(self.all_tasks)
+        return self.n_successful_tasks / self.n_tasks
 
     def failure_pct(self) -> float:
         """Percentage of tasks that were failed."""
-        return 1.0 - len(self.successful_tasks) / len(self.all_tasks)
+        return 1.0 - self.n_successful_tasks / self.n_tasks
 
     def active_pct(self) -> float:
         """Percent of tasks that were activated."""
-        return 1.0 - len(self.inactive_tasks) / len(self.all_tasks)
+        return 1.0 - self.n_inactive_tasks / self.n_tasks
+
+    def __eq__(self, other: Any) -> bool:
+        """Check if the given build status is the same as this one."""
+        if not isinstance(other, BuildStatus):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        """Describe the build status."""
+        return (
+            f"BuildStatus(build_name={self.build_name!r}, build_variant={self.build_variant!r}, "
+            f"n_successful_tasks={self.n_successful_tasks}, "
+            f"n_inactive_tasks={self.n_inactive_tasks}, n_tasks={self.n_tasks})"
+        )
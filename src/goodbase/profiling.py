@@ -0,0 +1,121 @@
+"""Profile the CPU time and memory used during a run."""
+import cProfile
+import pstats
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from threading import Lock
+from types import FrameType
+from typing import Any, List, Optional
+
+import structlog
+
+N_TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+# Since Python 3.12, cProfile profiles every thread, but only one profiler can be enabled at once.
+PROFILER_COVERS_ALL_THREADS = sys.version_info >= (3, 12)
+
+LOGGER = structlog.get_logger(__name__)
+
+
+class RunProfiler:
+    """
+    Profile the CPU time and memory used by every thread during a run.
+
+    Before Python 3.12, cProfile only profiles the thread it is enabled on, so a profiler is
+    enabled on each thread started while profiling, and the results of all of them are combined
+    when profiling stops.
+    """
+
+    def __init__(self, profile_file: Path) -> None:
+        """
+        Initialize the profiler.
+
+        :param profile_file: File to write the pstats dump to, the allocation summary is written
+            next to it.
+        """
+        self.profile_file = profile_file
+        self._lock = Lock()
+        self._profiles: List[cProfile.Profile] = []
+
+    @property
+    def allocations_file(self) -> Path:
+        """File the summary of the top memory allocations is written to."""
+        return self.profile_file.with_name(f"{self.profile_file.name}.allocations.txt")
+
+    def start(self) -> None:
+        """Start profiling the current thread and any thread started from now on."""
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        if not PROFILER_COVERS_ALL_THREADS:
+            threading.setprofile(self._profile_thread)
+        self._profile_thread()
+
+    def stop(self) -> None:
+        """Stop profiling and write the results."""
+        threading.setprofile(None)  # type: ignore[arg-type]
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self._write_allocations(snapshot, current, peak)
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(str(self.profile_file))
+
+        LOGGER.info(
+            "Wrote profile",
+            profile_file=str(self.profile_file),
+            allocations_file=str(self.allocations_file),
+            n_threads=len(profiles),
+        )
+
+    def _profile_thread(self, frame: Optional[FrameType] = None, *args: Any) -> None:
+        """
+        Enable a new profiler on the current thread.
+
+        This is installed as the profile function of new threads, so it replaces itself with the
+        new profiler when the thread starts.
+
+        :param frame: Frame being profiled.
+        :param args: Event being profiled.
+        """
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def _write_allocations(self, snapshot: tracemalloc.Snapshot, current: int, peak: int) -> None:
+        """
+        Write a summary of the top memory allocations.
+
+        :param snapshot: Snapshot of the memory allocated.
+        :param current: Bytes allocated at the end of the run.
+        :param peak: Peak bytes allocated during the run.
+        """
+        snapshot = snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+            ]
+        )
+        lines = [
+            f"Current memory: {current / 1024:.1f} KiB",
+            f"Peak memory: {peak / 1024:.1f} KiB",
+            "",
+            f"Top {N_TOP_ALLOCATIONS} allocations by line:",
+        ]
+        for idx, stat in enumerate(snapshot.statistics("lineno")[:N_TOP_ALLOCATIONS], start=1):
+            frame = stat.traceback[0]
+            lines.append(
+                f"#{idx}: {frame.filename}:{frame.lineno}: "
+                f"{stat.size / 1024:.1f} KiB in {stat.count} blocks"
+            )
+        self.allocations_file.write_text("\n".join(lines) + "\n")
@@ -0,0 +1,172 @@
+"""Read the parts of an Evergreen project configuration needed without evaluating it."""
+from __future__ import annotations
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+import yaml
+from yaml.events import (
+    AliasEvent,
+    Event,
+    MappingEndEvent,
+    MappingStartEvent,
+    ScalarEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+)
+
+# Use the libyaml parser when PyYAML was built with it, it is much faster than the pure python one.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+INCLUDE_FILENAME_RE = re.compile(r"^\s*(?:-\s*)?filename:\s*[\"']?([^\"'\s#]+)", re.MULTILINE)
+MODULES_KEY = "modules"
+INCLUDE_KEY = "include"
+
+LOGGER = structlog.get_logger(__name__)
+
+
+class UnsupportedConfigError(Exception):
+    """The project configuration uses a feature that can only be handled by evaluating it."""
+
+
+def hash_project_config(project_config_location: Path) -> Optional[str]:
+    """
+    Hash the contents of the given project configuration and the files it includes.
+
+    Included files are found by scanning for their `filename` entries rather than parsing the
+    configuration, and those that cannot be found locally only contribute their name to the hash.
+
+    :param project_config_location: Location of project configuration to hash.
+    :return: Hex digest of the configuration or None if it could not be read.
+    """
+    try:
+        contents = project_config_location.read_bytes()
+    except OSError:
+        return None
+
+    config_hash = hashlib.sha256(contents)
+    for match in INCLUDE_FILENAME_RE.finditer(contents.decode(errors="replace")):
+        include = match.group(1)
+        config_hash.update(b"\0" + include.encode())
+        try:
+            config_hash.update(b"\0" + Path(include).read_bytes())
+        except OSError:
+            pass
+    return config_hash.hexdigest()
+
+
+def extract_module_locations(project_config_location: Path) -> Optional[Dict[str, str]]:
+    """
+    Extract the locations of modules from the given project configuration without evaluating it.
+
+    The modules of the configuration and of the local files it includes are combined, the same as
+    when Evergreen merges included files. If the configuration uses anything that could change
+    the modules once evaluated, like aliases or files included from other modules, None is
+    returned so the configuration can be evaluated instead.
+
+    :param project_config_location: Location of project configuration to read.
+    :return: Dictionary of modules and their paths or None if they could not be extracted.
+    """
+    try:
+        modules, includes = _scan_config(project_config_location, need_includes=True)
+        for include in includes:
+            if not isinstance(include, dict) or "module" in include or "filename" not in include:
+                raise UnsupportedConfigError(f"Cannot resolve included file: {include}")
+            included_modules, _ = _scan_config(Path(include["filename"]), need_includes=False)
+            modules.extend(included_modules)
+        return {module["name"]: module["prefix"] for module in modules}
+    except (OSError, yaml.YAMLError, UnsupportedConfigError, KeyError, TypeError):
+        LOGGER.debug(
+            "Could not extract modules from project config",
+            project_config_location=str(project_config_location),
+            exc_info=True,
+        )
+        return None
+
+
+def _scan_config(config_location: Path, need_includes: bool) -> Tuple[List[Any], List[Any]]:
+    """
+    Read the modules and includes of the given configuration file from its stream of parse events.
+
+    The values of all other top level keys are skipped without being constructed, and parsing
+    stops as soon as every key needed has been read.
+
+    :param config_location: Location of configuration file to read.
+    :param need_includes: Whether the includes of the file should be read.
+    :return: Modules and includes found in the file.
+    """
+    wanted = {MODULES_KEY, INCLUDE_KEY} if need_includes else {MODULES_KEY}
+    found: Dict[str, Any] = {}
+    with open(config_location, "rb") as config_file:
+        events = yaml.parse(config_file, Loader=YAML_LOADER)
+        for event in events:
+            if isinstance(event, MappingStartEvent):
+                break
+            if not isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+                return [], []
+
+        for event in events:
+            if isinstance(event, MappingEndEvent):
+                break
+            if not isinstance(event, ScalarEvent):
+                raise UnsupportedConfigError("Top level keys must be scalars")
+            if event.value in wanted:
+                found[event.value] = _construct(events, next(events))
+                if found.keys() == wanted:
+                    break
+            else:
+                _skip(events, next(events))
+
+    if found.get(INCLUDE_KEY) is not None and not need_includes:
+        raise UnsupportedConfigError("Included files cannot include other files")
+    return list(found.get(MODULES_KEY) or []), list(found.get(INCLUDE_KEY) or [])
+
+
+def _construct(events: Iterator[Event], event: Event) -> Any:
+    """
+    Construct the value starting at the given parse event.
+
+    Scalars are left as strings, which is all that is needed for modules and includes.
+
+    :param events: Parse events following the given event.
+    :param event: First event of the value.
+    :return: Value constructed from the events.
+    """
+    if isinstance(event, ScalarEvent):
+        return None if event.value in ("", "~", "null") and event.implicit[0] else event.value
+    if isinstance(event, SequenceStartEvent):
+        items: List[Any] = []
+        for item_event in events:
+            if isinstance(item_event, SequenceEndEvent):
+                return items
+            items.append(_construct(events, item_event))
+    if isinstance(event, MappingStartEvent):
+        mapping: Dict[Any, Any] = {}
+        for key_event in events:
+            if isinstance(key_event, MappingEndEvent):
+                return mapping
+            key = _construct(events, key_event)
+            if key == "<<":
+                raise UnsupportedConfigError("Merge keys are not supported")
+            mapping[key] = _construct(events, next(events))
+    if isinstance(event, AliasEvent):
+        raise UnsupportedConfigError("Aliases are not supported")
+    raise UnsupportedConfigError(f"Unexpected event: {event}")
+
+
+def _skip(events: Iterator[Event], event: Event) -> None:
+    """
+    Skip over the value starting at the given parse event.
+
+    :param events: Parse events following the given event.
+    :param event: First event of the value.
+    """
+    depth = int(isinstance(event, (MappingStartEvent, SequenceStartEvent)))
+    while depth:
+        event = next(events)
+        if isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (MappingEndEvent, SequenceEndEvent)):
+            depth -= 1
@@ -0,0 +1,142 @@
+"""Instrumentation of the work done while searching."""
+import math
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Iterator, List
+
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Get the given percentile of a list of values using the nearest-rank method.
+
+    :param values: Values to get percentile of.
+    :param pct: Percentile to get, between 0 and 100.
+    :return: Smallest value that at least the given percent of values are less than or equal to.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarize a list of latencies.
+
+    :param latencies: Latencies in seconds.
+    :return: Dictionary of total and percentile latencies.
+    """
+    summary = {"total_secs": round(sum(latencies), 6)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_secs"] = round(percentile(latencies, pct), 6)
+    return summary
+
+
+class SearchStats:
+    """
+    Statistics about the work done during a run.
+
+    Counters track how many items of each kind were processed, requests to Evergreen are tracked
+    by endpoint along with their latency, the bytes received and how many times they were retried,
+    and other operations, like git commands, are tracked by their latency.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.start_time = perf_counter()
+        self._lock = Lock()
+        self._counters: Counter = Counter()
+        self._request_counters: Dict[str, Counter] = defaultdict(Counter)
+        self._request_latencies: Dict[str, List[float]] = defaultdict(list)
+        self._operation_latencies: Dict[str, List[float]] = defaultdict(list)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """
+        Increment the given counter.
+
+        :param counter: Name of counter to increment.
+        :param amount: Amount to increment counter by.
+        """
+        with self._lock:
+            self._counters[counter] += amount
+
+    def record_request(
+        self, endpoint: str, latency_secs: float, n_bytes: int, n_retries: int, failed: bool
+    ) -> None:
+        """
+        Record a request made to Evergreen.
+
+        :param endpoint: Name of endpoint requested.
+        :param latency_secs: Seconds taken to receive the complete response.
+        :param n_bytes: Number of bytes in the response.
+        :param n_retries: Number of times the request was retried.
+        :param failed: Whether the request failed.
+        """
+        with self._lock:
+            counters = self._request_counters[endpoint]
+            counters["count"] += 1
+            counters["bytes"] += n_bytes
+            counters["retries"] += n_retries
+            counters["errors"] += int(failed)
+            self._request_latencies[endpoint].append(latency_secs)
+
+    def record_operation(self, operation: str, latency_secs: float) -> None:
+        """
+        Record the latency of an operation.
+
+        :param operation: Name of operation performed.
+        :param latency_secs: Seconds taken by the operation.
+        """
+        with self._lock:
+            self._operation_latencies[operation].append(latency_secs)
+
+    @contextmanager
+    def timer(self, operation: str) -> Iterator[None]:
+        """
+        Record the latency of the operation performed in the context.
+
+        :param operation: Name of operation performed.
+        """
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.record_operation(operation, perf_counter() - start_time)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Create a report of the statistics collected so far.
+
+        :return: Dictionary of statistics.
+        """
+        with self._lock:
+            requests = {
+                endpoint: dict(counters) | summarize_latencies(self._request_latencies[endpoint])
+                for endpoint, counters in sorted(self._request_counters.items())
+            }
+            operations = {
+                operation: {"count": len(latencies)} | summarize_latencies(latencies)
+                for operation, latencies in sorted(self._operation_latencies.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+
+        totals: Counter = Counter()
+        for endpoint_stats in requests.values():
+            totals.update({key: endpoint_stats[key] for key in ["count", "bytes", "retries"]})
+
+        return {
+            "elapsed_secs": round(perf_counter() - self.start_time, 6),
+            "counters": counters,
+            "requests": {
+                "count": totals["count"],
+                "bytes_received": totals["bytes"],
+                "retries": totals["retries"],
+                "endpoints": requests,
+            },
+            "operations": operations,
+        }
@@ -0,0 +1,121 @@
+"""A service for looking up task annotations."""
+from threading import Lock
+from time import time
+from typing import Dict, Optional, Set, Tuple
+
+import inject
+import structlog
+from evergreen import EvergreenApi, Task
+from requests.exceptions import HTTPError
+
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
+from goodbase.search_stats import SearchStats
+from goodbase.services.build_cache_service import BuildCacheService
+
+LOGGER = structlog.get_logger(__name__)
+
+
+class AnnotationService:
+    """
+    A service to determine which tasks are known failures.
+
+    A known failure is a task that has been annotated with an issue. The annotations of every task
+    in a version are fetched with a single request the first time a task of the version is looked
+    up, the results are then reused for the other tasks of the version. Since annotations can be
+    added at any time, results are only reused for a limited time.
+    """
+
+    @inject.autoparams()
+    def __init__(
+        self,
+        evg_api: EvergreenApi,
+        build_cache: BuildCacheService,
+        limiter: AdaptiveConcurrencyLimiter,
+        stats: SearchStats,
+    ) -> None:
+        """
+        Initialize the service.
+
+        :param evg_api: Evergreen API client.
+        :param build_cache: Persistent cache to store known failures in.
+        :param limiter: Limit on the number of requests to Evergreen in flight.
+        :param stats: Statistics about the work done.
+        """
+        self.evg_api = evg_api
+        self.build_cache = build_cache
+        self.limiter = limiter
+        self.stats = stats
+        self._lock = Lock()
+        self._version_locks: Dict[str, Lock] = {}
+        self._known_failures: Dict[str, Tuple[float, Optional[Set[str]]]] = {}
+
+    def is_known_failure(self, task: Task) -> bool:
+        """
+        Check if a task is a known failure.
+
+        :param task: Task to check.
+        :return: True if the task is a known failure.
+        """
+        known_failures = self.get_known_failures(task.version_id)
+        if known_failures is not None:
+            return task.task_id in known_failures
+
+        self.stats.increment("annotation_lookups")
+        annotations = self.limiter.call(self.evg_api.get_task_annotation, task.task_id)
+        return any(annotation.issues for annotation in annotations)
+
+    def get_known_failures(self, version_id: str) -> Optional[Set[str]]:
+        """
+        Get the IDs of tasks annotated as known failures in the given version.
+
+        Concurrent lookups for the same version wait for a single request to Evergreen.
+
+        :param version_id: ID of version to query.
+        :return: Set of task IDs or None if the annotations of the version could not be fetched.
+        """
+        with self._lock:
+            version_lock = self._version_locks.setdefault(version_id, Lock())
+
+        with version_lock:
+            cached = self._known_failures.get(version_id)
+            if cached is not None and time() - cached[0] <= self.build_cache.annotation_ttl_secs:
+                return cached[1]
+
+            known_failures = self.build_cache.get_known_failures(version_id)
+            if known_failures is None:
+                known_failures = self._fetch_known_failures(version_id)
+                if known_failures is not None:
+                    self.build_cache.put_known_failures(version_id, known_failures)
+
+            self._known_failures[version_id] = (time(), known_failures)
+            return known_failures
+
+    def _fetch_known_failures(self, version_id: str) -> Optional[Set[str]]:
+        """
+        Query Evergreen for the annotations of every task in the given version.
+
+        The Evergreen API client does not support this endpoint, so it is queried directly.
+
+        :param version_id: ID of version to query.
+        :return: Set of task IDs or None if the annotations could not be fetched.
+        """
+        self.stats.increment("annotation_lookups")
+        url = self.evg_api._create_url(f"/versions/{version_id}/annotations")
+        try:
+            response = self.limiter.call(self.evg_api._call_api, url)
+        except HTTPError as err:
+            LOGGER.debug(
+                "Could not get annotations for version, looking up tasks individually",
+                status_code=err.response.status_code,
+                version_id=version_id,
+                exc_info=True,
+            )
+            return None
+
+        if response.text.strip() == "null":
+            return set()
+        return {
+            annotation["task_id"]
+            for annotation in response.json()
+            if annotation.get("issues") and annotation.get("task_id")
+        }
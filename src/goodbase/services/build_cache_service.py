@@ -0,0 +1,357 @@
+"""A service for caching build statuses between runs."""
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Dict, Optional, Set
+
+import structlog
+from xdg import xdg_cache_home
+
+from goodbase.models.build_status import BuildStatus
+
+CACHE_FILE_LOCATION = xdg_cache_home() / "git_co_evg_base.db"
+MAX_CACHE_ENTRIES = 10_000
+IN_PROGRESS_TTL_SECS = 5 * 60
+ANNOTATION_TTL_SECS = 10 * 60
+MAX_MODULE_LOCATION_ENTRIES = 100
+ACCESS_REFRESH_SECS = 60 * 60
+EVICTION_FRACTION = 0.1
+
+LOGGER = structlog.get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS build_status (
+    build_id TEXT NOT NULL,
+    allow_known_failures INTEGER NOT NULL,
+    finished INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_accessed REAL NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (build_id, allow_known_failures)
+);
+CREATE INDEX IF NOT EXISTS build_status_last_accessed ON build_status (last_accessed);
+CREATE TABLE IF NOT EXISTS known_failures (
+    version_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    task_ids TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS module_locations (
+    project_id TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    locations TEXT NOT NULL,
+    PRIMARY KEY (project_id, config_hash)
+);
+"""
+
+
+class BuildCacheService:
+    """
+    A persistent cache of build statuses.
+
+    Builds that have finished running will not change, so their statuses are kept until they
+    are evicted for being the least recently used. The time a build was last used is only
+    recorded once it is out of date by more than a refresh interval, so reading statuses does not
+    require writing to the database on every lookup. Statuses of builds that are still running
+    are only kept for a short time. The known failures of each version are cached as well, but
+    since annotations can be added at any time, they are also only kept for a short time. The
+    module locations of projects are cached by the hash of the project configuration they were
+    evaluated from, so they remain valid until the most recent ones push them out.
+    """
+
+    def __init__(
+        self,
+        cache_file: Optional[Path],
+        max_entries: int = MAX_CACHE_ENTRIES,
+        in_progress_ttl_secs: float = IN_PROGRESS_TTL_SECS,
+        annotation_ttl_secs: float = ANNOTATION_TTL_SECS,
+        access_refresh_secs: float = ACCESS_REFRESH_SECS,
+    ) -> None:
+        """
+        Initialize the service.
+
+        :param cache_file: Path to cache database, if None caching is disabled.
+        :param max_entries: Maximum number of builds to keep in the cache.
+        :param in_progress_ttl_secs: Seconds to keep statuses of unfinished builds.
+        :param annotation_ttl_secs: Seconds to keep the known failures of versions.
+        :param access_refresh_secs: Seconds before the last access time of a build is updated.
+        """
+        self.max_entries = max_entries
+        self.in_progress_ttl_secs = in_progress_ttl_secs
+        self.annotation_ttl_secs = annotation_ttl_secs
+        self.access_refresh_secs = access_refresh_secs
+        self._lock = Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._n_entries = 0
+        if cache_file is not None:
+            self._connection = self._connect(cache_file)
+        if self._connection is not None:
+            self._n_entries = self._count_entries(self._connection)
+
+    @classmethod
+    def create(cls, enabled: bool = True) -> BuildCacheService:
+        """
+        Create a build cache service instance.
+
+        :param enabled: Whether build statuses should be cached.
+        :return: Instance of build cache service.
+        """
+        return cls(CACHE_FILE_LOCATION if enabled else None)
+
+    @staticmethod
+    def _connect(cache_file: Path) -> Optional[sqlite3.Connection]:
+        """
+        Open the cache database, creating it if needed.
+
+        :param cache_file: Path to cache database.
+        :return: Connection to the database or None if it could not be opened.
+        """
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(cache_file, check_same_thread=False)
+            connection.executescript(SCHEMA)
+            connection.commit()
+            return connection
+        except (OSError, sqlite3.Error):
+            LOGGER.warning("Could not open build cache, caching disabled", exc_info=True)
+            return None
+
+    @staticmethod
+    def _count_entries(connection: sqlite3.Connection) -> int:
+        """
+        Count the number of builds stored in the cache.
+
+        :param connection: Connection to the cache database.
+        :return: Number of builds stored.
+        """
+        return connection.execute("SELECT COUNT(*) FROM build_status").fetchone()[0]
+
+    def get(self, build_id: str, allow_known_failures: bool) -> Optional[BuildStatus]:
+        """
+        Get the cached status of the given build.
+
+        :param build_id: ID of build to query.
+        :param allow_known_failures: Whether known failures were considered passing.
+        :return: Cached build status if a valid one exists.
+        """
+        if self._connection is None:
+            return None
+
+        now = time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT finished, created_at, last_accessed, status FROM build_status "
+                "WHERE build_id = ? AND allow_known_failures = ?",
+                (build_id, allow_known_failures),
+            ).fetchone()
+            if row is None:
+                return None
+
+            finished, created_at, last_accessed, status = row
+            if not finished and now - created_at > self.in_progress_ttl_secs:
+                return None
+
+            if now - last_accessed >= self.access_refresh_secs:
+                self._connection.execute(
+                    "UPDATE build_status SET last_accessed = ? "
+                    "WHERE build_id = ? AND allow_known_failures = ?",
+                    (now, build_id, allow_known_failures),
+                )
+                self._connection.commit()
+
+        LOGGER.debug("Build status found in cache", build_id=build_id)
+        return self._deserialize(status)
+
+    def put(
+        self,
+        build_id: str,
+        allow_known_failures: bool,
+        build_status: BuildStatus,
+        finished: bool,
+    ) -> None:
+        """
+        Store the status of the given build.
+
+        The least recently used builds are only evicted once the cache holds more than the
+        maximum number of builds, and enough are evicted at once to leave room for a batch of new
+        ones before that happens again.
+
+        :param build_id: ID of build being stored.
+        :param allow_known_failures: Whether known failures were considered passing.
+        :param build_status: Status of build to store.
+        :param finished: Whether the build has finished running.
+        """
+        if self._connection is None:
+            return
+
+        now = time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO build_status VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    build_id,
+                    allow_known_failures,
+                    finished,
+                    now,
+                    now,
+                    self._serialize(build_status),
+                ),
+            )
+            # Replacing a build does not add an entry, so this may overestimate the count.
+            self._n_entries += 1
+            if self._n_entries > self.max_entries:
+                self._n_entries = self._count_entries(self._connection)
+                if self._n_entries > self.max_entries:
+                    n_kept = self.max_entries - int(self.max_entries * EVICTION_FRACTION)
+                    self._connection.execute(
+                        "DELETE FROM build_status WHERE rowid IN ("
+                        "SELECT rowid FROM build_status ORDER BY last_accessed LIMIT ?)",
+                        (self._n_entries - n_kept,),
+                    )
+                    self._n_entries = n_kept
+            self._connection.commit()
+
+    def get_known_failures(self, version_id: str) -> Optional[Set[str]]:
+        """
+        Get the cached IDs of tasks annotated as known failures in the given version.
+
+        :param version_id: ID of version to query.
+        :return: Cached set of task IDs if a valid one exists.
+        """
+        if self._connection is None:
+            return None
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT created_at, task_ids FROM known_failures WHERE version_id = ?",
+                (version_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        created_at, task_ids = row
+        if time() - created_at > self.annotation_ttl_secs:
+            return None
+
+        LOGGER.debug("Known failures found in cache", version_id=version_id)
+        return set(json.loads(task_ids))
+
+    def put_known_failures(self, version_id: str, task_ids: Set[str]) -> None:
+        """
+        Store the IDs of tasks annotated as known failures in the given version.
+
+        :param version_id: ID of version being stored.
+        :param task_ids: IDs of tasks that are known failures.
+        """
+        if self._connection is None:
+            return
+
+        now = time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO known_failures VALUES (?, ?, ?)",
+                (version_id, now, json.dumps(sorted(task_ids))),
+            )
+            self._connection.execute(
+                "DELETE FROM known_failures WHERE created_at < ?",
+                (now - self.annotation_ttl_secs,),
+            )
+            self._connection.commit()
+
+    def get_module_locations(self, project_id: str, config_hash: str) -> Optional[Dict[str, str]]:
+        """
+        Get the cached module locations of the given project configuration.
+
+        :param project_id: ID of project to query.
+        :param config_hash: Hash of the project configuration the locations were evaluated from.
+        :return: Cached dictionary of modules and their paths if one exists.
+        """
+        if self._connection is None:
+            return None
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT locations FROM module_locations WHERE project_id = ? AND config_hash = ?",
+                (project_id, config_hash),
+            ).fetchone()
+        if row is None:
+            return None
+
+        LOGGER.debug("Module locations found in cache", project_id=project_id)
+        return json.loads(row[0])
+
+    def put_module_locations(
+        self, project_id: str, config_hash: str, module_locations: Dict[str, str]
+    ) -> None:
+        """
+        Store the module locations evaluated from the given project configuration.
+
+        :param project_id: ID of project being stored.
+        :param config_hash: Hash of the project configuration the locations were evaluated from.
+        :param module_locations: Dictionary of modules and their paths.
+        """
+        if self._connection is None:
+            return
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO module_locations VALUES (?, ?, ?, ?)",
+                (project_id, config_hash, time(), json.dumps(module_locations)),
+            )
+            self._connection.execute(
+                "DELETE FROM module_locations WHERE rowid IN ("
+                "SELECT rowid FROM module_locations ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (MAX_MODULE_LOCATION_ENTRIES,),
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def _serialize(build_status: BuildStatus) -> str:
+        """
+        Convert the given build status to a string for storage.
+
+        :param build_status: Build status to convert.
+        :return: Serialized build status.
+        """
+        return json.dumps(
+            {
+                "build_name": build_status.build_name,
+                "build_variant": build_status.build_variant,
+                "successful_tasks": sorted(build_status.successful_tasks),
+                "inactive_tasks": sorted(build_status.inactive_tasks),
+                "all_tasks": sorted(build_status.all_tasks),
+                "has_task_details": build_status.has_task_details,
+                "n_successful_tasks": build_status.n_successful_tasks,
+                "n_inactive_tasks": build_status.n_inactive_tasks,
+                "n_tasks": build_status.n_tasks,
+            }
+        )
+
+    @staticmethod
+    def _deserialize(contents: str) -> BuildStatus:
+        """
+        Convert the given stored string back into a build status.
+
+        :param contents: Serialized build status.
+        :return: Build status.
+        """
+        data = json.loads(contents)
+        if not data.get("has_task_details", True):
+            return BuildStatus.from_task_counts(
+                build_name=data["build_name"],
+                build_variant=data["build_variant"],
+                n_successful_tasks=data["n_successful_tasks"],
+                n_inactive_tasks=data["n_inactive_tasks"],
+                n_tasks=data["n_tasks"],
+            )
+        return BuildStatus(
+            build_name=data["build_name"],
+            build_variant=data["build_variant"],
+            successful_tasks=set(data["successful_tasks"]),
+            inactive_tasks=set(data["inactive_tasks"]),
+            all_tasks=set(data["all_tasks"]),
+        )
@@ -1,19 +1,36 @@
 """Service to interact with evergreen."""
-from concurrent.futures import ThreadPoolExecutor as Executor
+import asyncio
+from concurrent.futures import Future, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional
+from threading import Event
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Set, Tuple
 
 import inject
 import structlog
 import yaml
 from evergreen import Build, EvergreenApi, Task, Version
+from evergreen.util import clean_name
 from requests.exceptions import HTTPError
 
-from goodbase.build_checker import BuildChecks
+from goodbase.build_checker import BuildChecks, CriteriaPlan
+from goodbase.clients.async_evg_client import AsyncEvergreenClient
 from goodbase.clients.evg_cli_proxy import EvgCliProxy
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
 from goodbase.models.build_status import BuildStatus
+from goodbase.project_config import extract_module_locations, hash_project_config
+from goodbase.search_stats import SearchStats
+from goodbase.services.annotation_service import AnnotationService
+from goodbase.services.build_cache_service import BuildCacheService
+from goodbase.tracing import Tracer
+from goodbase.worker_pool import WorkerPool
 
-N_THREADS = 16
+MAX_BUILDS_TO_FETCH_INDIVIDUALLY = 16
+
+# A function and the arguments of each call of it to make, like the arguments of
+# `WorkerPool.run_all`.
+Fetch = Tuple[Callable[..., Any], List[Tuple[Any, ...]]]
+# Analysis of a build, yielding the calls it needs and returning the summary of the build.
+BuildAnalysis = Generator[Fetch, List[Any], Optional[BuildStatus]]
 
 LOGGER = structlog.get_logger(__name__)
 
@@ -22,97 +39,792 @@ class EvergreenService:
     """A service to interact with Evergreen."""
 
     @inject.autoparams()
-    def __init__(self, evg_api: EvergreenApi, evg_cli_proxy: EvgCliProxy) -> None:
+    def __init__(
+        self,
+        evg_api: EvergreenApi,
+        evg_cli_proxy: EvgCliProxy,
+        build_cache: BuildCacheService,
+        annotation_service: AnnotationService,
+        worker_pool: WorkerPool,
+        limiter: AdaptiveConcurrencyLimiter,
+        stats: SearchStats,
+        tracer: Tracer,
+    ) -> None:
         """
         Initialize the service.
 
         :param evg_api: Evergreen API client.
         :param evg_cli_proxy: Proxy for evergreen cli.
+        :param build_cache: Cache of previously analyzed builds.
+        :param annotation_service: Service to look up known failures.
+        :param worker_pool: Pool of workers to query Evergreen with.
+        :param limiter: Limit on the number of requests to Evergreen in flight.
+        :param stats: Statistics about the work done.
+        :param tracer: Tracer to record spans of the work done with.
         """
         self.evg_api = evg_api
         self.evg_cli_proxy = evg_cli_proxy
+        self.build_cache = build_cache
+        self.annotation_service = annotation_service
+        self.worker_pool = worker_pool
+        self.limiter = limiter
+        self.stats = stats
+        self.tracer = tracer
+        self._criteria_plans: Dict[Tuple[int, ...], CriteriaPlan] = {}
 
     def analyze_build(
-        self, build: Build, allow_known_failures: bool = False
+        self,
+        build: Build,
+        allow_known_failures: bool = False,
+        build_checks: Optional[List[BuildChecks]] = None,
     ) -> Optional[BuildStatus]:
         """
         Get a summary of results for the given build.
 
+        When the checks that apply to the build are given, only the details needed to evaluate
+        them are queried. Otherwise, a complete summary is created.
+
         :param build: Evergreen build to analyze.
         :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Summary of build.
+        """
+        return self._run_fetches(self._build_analysis(build, allow_known_failures, build_checks))
+
+    async def analyze_build_async(
+        self,
+        build: Build,
+        evg_client: AsyncEvergreenClient,
+        allow_known_failures: bool = False,
+        build_checks: Optional[List[BuildChecks]] = None,
+    ) -> Optional[BuildStatus]:
+        """
+        Get a summary of results for the given build using the asyncio client.
+
+        :param build: Evergreen build to analyze.
+        :param evg_client: Asyncio Evergreen client to fetch with.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Summary of build.
+        """
+        return await self._run_fetches_async(
+            self._build_analysis(build, allow_known_failures, build_checks), evg_client
+        )
+
+    def _run_fetches(self, analysis: BuildAnalysis) -> Optional[BuildStatus]:
+        """
+        Run the given build analysis, making each batch of calls it needs on the worker pool.
+
+        :param analysis: Build analysis to run.
         :return: Summary of build.
         """
         try:
-            tasks = build.get_tasks()
-        except HTTPError as err:
+            fetch = next(analysis)
+            while True:
+                try:
+                    results = self.worker_pool.run_all(*fetch)
+                except Exception as err:
+                    fetch = analysis.throw(err)
+                else:
+                    fetch = analysis.send(results)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            analysis.close()
+
+    async def _run_fetches_async(
+        self, analysis: BuildAnalysis, evg_client: AsyncEvergreenClient
+    ) -> Optional[BuildStatus]:
+        """
+        Run the given build analysis, awaiting each batch of calls it needs on the asyncio client.
+
+        :param analysis: Build analysis to run.
+        :param evg_client: Asyncio Evergreen client to fetch with.
+        :return: Summary of build.
+        """
+        try:
+            fetch = next(analysis)
+            while True:
+                fn, args_list = fetch
+                try:
+                    results = await asyncio.gather(
+                        *[evg_client.run(fn, *args) for args in args_list]
+                    )
+                except Exception as err:
+                    fetch = analysis.throw(err)
+                else:
+                    fetch = analysis.send(list(results))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            analysis.close()
+
+    def _build_analysis(
+        self,
+        build: Build,
+        allow_known_failures: bool,
+        build_checks: Optional[List[BuildChecks]],
+    ) -> BuildAnalysis:
+        """
+        Analyze the given build, leaving the calls that query Evergreen to the caller.
+
+        The analysis is the same whether the calls block or are awaited, so it yields each batch
+        of calls it needs and is sent back their results, or has their error thrown into it.
+
+        :param build: Evergreen build to analyze.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Summary of build.
+        """
+        with self.tracer.span("analyze_build", "evergreen", build_id=build.id):
+            build_status = self._analyze_build_without_tasks(
+                build, allow_known_failures, build_checks
+            )
+            if build_status is not None:
+                return build_status
+
+            tasks = yield from self._named_tasks_analysis(build, build_checks)
+            all_tasks_fetched = tasks is None
+            if tasks is None:
+                try:
+                    (tasks,) = yield self.limiter.call, [(build.get_tasks,)]
+                except HTTPError as err:
+                    self._log_build_fetch_error(err, build.id)
+                    return None
+            self.stats.increment("tasks_downloaded", len(tasks))
+
+            successful_tasks = {task.display_name for task in tasks if task.is_success()}
+            tasks_to_lookup = self._get_known_failure_candidates(
+                tasks, successful_tasks, allow_known_failures, build_checks
+            )
+            known_failures = yield (
+                self.annotation_service.is_known_failure,
+                [(task,) for task in tasks_to_lookup],
+            )
+            successful_tasks.update(
+                task.display_name
+                for task, is_known_failure in zip(tasks_to_lookup, known_failures)
+                if is_known_failure
+            )
+
+            return self._record_build_status(
+                build,
+                tasks,
+                successful_tasks,
+                allow_known_failures,
+                complete=all_tasks_fetched
+                and self._all_known_failures_checked(tasks, tasks_to_lookup, allow_known_failures),
+            )
+
+    def _named_tasks_analysis(
+        self, build: Build, build_checks: Optional[List[BuildChecks]]
+    ) -> Generator[Fetch, List[Any], Optional[List[Task]]]:
+        """
+        Query only the tasks of the given build that the build checks name, if possible.
+
+        The tasks are queried in a single batch, so they can be queried concurrently.
+
+        :param build: Evergreen build being analyzed.
+        :param build_checks: Build criteria that apply to the build.
+        :return: List of tasks named by the checks or None if every task needs to be queried.
+        """
+        named_task_ids = self._named_task_ids(build, build_checks)
+        if named_task_ids is None:
+            return None
+
+        try:
+            tasks = yield (
+                self.limiter.call,
+                [(self.evg_api.task_by_id, task_id) for task_id in named_task_ids],
+            )
+        except HTTPError:
+            LOGGER.debug("Could not get named tasks, querying all tasks", build_id=build.id)
+            return None
+        return self._verify_named_tasks(build, named_task_ids, tasks)
+
+    @staticmethod
+    def _log_build_fetch_error(err: HTTPError, build_id: str) -> None:
+        """
+        Log that the data of a build could not be queried.
+
+        :param err: Error raised querying the build.
+        :param build_id: ID of build being queried.
+        """
+        LOGGER.debug(
+            "Could not get data from Evergreen for a build",
+            status_code=err.response.status_code,
+            build_id=build_id,
+            exc_info=True,
+        )
+
+    def _named_task_ids(
+        self, build: Build, build_checks: Optional[List[BuildChecks]]
+    ) -> Optional[Dict[str, str]]:
+        """
+        Work out the IDs of the tasks of the given build that the build checks name.
+
+        Evergreen builds the ID of a task by adding its name to the ID of its build, in front of
+        the revision, with an extra `display_` in front of the name for display tasks, so the IDs
+        can be worked out and confirmed against the task IDs listed in the build. If the checks
+        depend on the state of every task, or the ID of any named task cannot be confirmed,
+        nothing is returned, since the task could still be part of the build under another ID.
+
+        :param build: Evergreen build being analyzed.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Dictionary of task IDs and task names or None if every task needs to be queried.
+        """
+        if build_checks is None:
+            return None
+        task_names = self._criteria_plan(build_checks).task_names()
+        if task_names is None:
+            return None
+
+        build_id, revision, build_task_ids = build.id, build.git_hash, build.tasks
+        if not (
+            isinstance(build_id, str)
+            and isinstance(revision, str)
+            and isinstance(build_task_ids, list)
+        ):
+            return None
+        split_idx = build_id.rfind(f"_{revision}_")
+        if split_idx < 0:
+            return None
+
+        prefix, suffix = build_id[:split_idx], build_id[split_idx:]
+        existing_task_ids = set(build_task_ids)
+        task_ids = {}
+        for task_name in sorted(task_names):
+            candidate_ids = [
+                f"{prefix}_{clean_name(task_name)}{suffix}",
+                f"{prefix}_display_{clean_name(task_name)}{suffix}",
+            ]
+            task_id = next((_id for _id in candidate_ids if _id in existing_task_ids), None)
+            if task_id is None:
+                return None
+            task_ids[task_id] = task_name
+        return task_ids
+
+    def _verify_named_tasks(
+        self, build: Build, named_task_ids: Dict[str, str], tasks: List[Task]
+    ) -> Optional[List[Task]]:
+        """
+        Check the given tasks queried by ID are the tasks they were expected to be.
+
+        :param build: Evergreen build being analyzed.
+        :param named_task_ids: Dictionary of the task IDs queried and the expected task names.
+        :param tasks: Tasks queried, in the same order as their IDs.
+        :return: List of tasks or None if every task needs to be queried.
+        """
+        if [task.display_name for task in tasks] != list(named_task_ids.values()):
             LOGGER.debug(
-                "Could not get data from Evergreen for a build",
-                status_code=err.response.status_code,
-                build_id=build.id,
-                exc_info=True,
+                "Named tasks did not match task IDs, querying all tasks", build_id=build.id
             )
             return None
+        self.stats.increment("named_task_fetches")
+        return tasks
 
-        successful_tasks = self._get_successful_tasks(tasks, allow_known_failures)
-        inactive_tasks = {task.display_name for task in tasks if task.is_undispatched()}
-        all_tasks = {task.display_name for task in tasks}
+    def _analyze_build_without_tasks(
+        self,
+        build: Build,
+        allow_known_failures: bool,
+        build_checks: Optional[List[BuildChecks]],
+    ) -> Optional[BuildStatus]:
+        """
+        Get a summary of results for the given build without querying its tasks, if possible.
+
+        A cached summary is used if it has enough detail. Otherwise, if the state of individual
+        tasks is not needed, the summary is created from the task counts in the build.
+
+        :param build: Evergreen build to analyze.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Summary of build if it could be created without querying tasks.
+        """
+        need_task_details = self._needs_task_details(build_checks, allow_known_failures)
+        cached_status = self._get_cached_build_status(
+            build.id, allow_known_failures, need_task_details
+        )
+        if cached_status is not None:
+            return cached_status
+
+        if need_task_details:
+            return None
+
+        build_status = self._build_status_from_counts(build)
+        if build_status is not None:
+            self.build_cache.put(build.id, allow_known_failures, build_status, build.is_completed())
+        return build_status
+
+    def _get_cached_build_status(
+        self, build_id: str, allow_known_failures: bool, need_task_details: bool
+    ) -> Optional[BuildStatus]:
+        """
+        Get the cached summary of the given build if it has enough detail.
+
+        :param build_id: ID of build to query.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param need_task_details: Whether the state of individual tasks is needed.
+        :return: Cached summary of build if one is usable.
+        """
+        cached_status = self.build_cache.get(build_id, allow_known_failures)
+        if cached_status is not None and (cached_status.has_task_details or not need_task_details):
+            self.stats.increment("builds_from_cache")
+            return cached_status
+        return None
+
+    def _analyze_build_variant(
+        self,
+        evg_version: Version,
+        build_variant: str,
+        allow_known_failures: bool,
+        build_checks: List[BuildChecks],
+    ) -> Optional[BuildStatus]:
+        """
+        Get a summary of results for the build of a build variant, only querying it if needed.
+
+        :param evg_version: Evergreen version containing build.
+        :param build_variant: Build variant of build to analyze.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Summary of build.
+        """
+        return self._run_fetches(
+            self._build_variant_analysis(
+                evg_version, build_variant, allow_known_failures, build_checks
+            )
+        )
+
+    async def _analyze_build_variant_async(
+        self,
+        evg_version: Version,
+        build_variant: str,
+        evg_client: AsyncEvergreenClient,
+        allow_known_failures: bool,
+        build_checks: List[BuildChecks],
+    ) -> Optional[BuildStatus]:
+        """
+        Get a summary of results for the build of a build variant using the asyncio client.
+
+        :param evg_version: Evergreen version containing build.
+        :param build_variant: Build variant of build to analyze.
+        :param evg_client: Asyncio Evergreen client to fetch with.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Summary of build.
+        """
+        return await self._run_fetches_async(
+            self._build_variant_analysis(
+                evg_version, build_variant, allow_known_failures, build_checks
+            ),
+            evg_client,
+        )
+
+    def _build_variant_analysis(
+        self,
+        evg_version: Version,
+        build_variant: str,
+        allow_known_failures: bool,
+        build_checks: List[BuildChecks],
+    ) -> BuildAnalysis:
+        """
+        Analyze the build of a build variant, leaving the calls that query Evergreen to the caller.
+
+        :param evg_version: Evergreen version containing build.
+        :param build_variant: Build variant of build to analyze.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: Summary of build.
+        """
+        build_id = evg_version.build_variants_map[build_variant]
+        cached_status = self._get_cached_build_status(
+            build_id,
+            allow_known_failures,
+            self._needs_task_details(build_checks, allow_known_failures),
+        )
+        if cached_status is not None:
+            return cached_status
+
+        try:
+            (build,) = yield self.limiter.call, [(evg_version.build_by_variant, build_variant)]
+        except HTTPError as err:
+            self._log_build_fetch_error(err, build_id)
+            return None
+        self.stats.increment("builds_fetched")
+        return (yield from self._build_analysis(build, allow_known_failures, build_checks))
+
+    @staticmethod
+    def _build_status_from_counts(build: Build) -> Optional[BuildStatus]:
+        """
+        Create a summary of the given build from the task status counts in the build.
+
+        Evergreen places every task of a build in exactly one of the succeeded, failed, started,
+        undispatched and inactive counts, so the total is the sum of those. The dispatched count is
+        already included in started and the timed out count in failed, so neither is added.
+
+        :param build: Evergreen build to summarize.
+        :return: Summary of build if task status counts are available.
+        """
+        try:
+            counts = build.status_counts
+        except KeyError:
+            return None
+
+        n_inactive_tasks = (counts.undispatched or 0) + (counts.inactivate or 0)
+        n_tasks = (
+            (counts.succeeded or 0)
+            + (counts.failed or 0)
+            + (counts.started or 0)
+            + n_inactive_tasks
+        )
+        if n_tasks == 0:
+            return None
 
-        return BuildStatus(
+        return BuildStatus.from_task_counts(
             build_name=build.display_name,
             build_variant=build.build_variant,
-            successful_tasks=successful_tasks,
-            inactive_tasks=inactive_tasks,
-            all_tasks=all_tasks,
+            n_successful_tasks=counts.succeeded or 0,
+            n_inactive_tasks=n_inactive_tasks,
+            n_tasks=n_tasks,
         )
 
-    def _get_successful_tasks(self, tasks: List[Task], allow_known_failures: bool) -> set[str]:
+    @staticmethod
+    def _needs_task_details(
+        build_checks: Optional[List[BuildChecks]], allow_known_failures: bool
+    ) -> bool:
+        """
+        Determine if checking a build requires the state of individual tasks.
+
+        :param build_checks: Build criteria that apply to the build.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :return: True if the tasks of the build need to be queried.
+        """
+        if build_checks is None or allow_known_failures:
+            return True
+        return any(bc.requires_task_details() for bc in build_checks)
+
+    @staticmethod
+    def _get_known_failure_candidates(
+        tasks: List[Task],
+        successful_tasks: Set[str],
+        allow_known_failures: bool,
+        build_checks: Optional[List[BuildChecks]],
+    ) -> List[Task]:
         """
-        Get the set of successful tasks from a list of tasks.
+        Get the failed tasks that need to be checked for being known failures.
 
-        If allow_known_failures is True, known failures will be included in the set.
-        Otherwise only passing tasks will be returned.
+        Checking a task requires a query to Evergreen, so tasks are only checked when knowing
+        whether they are known failures could change the result of the build checks. That is
+        when a task is named in the checks or when a threshold could be met with some of the
+        failed tasks and not without them.
 
-        :param tasks: The list of tasks to check.
-        :param allow_known_failures: If true - consider known failures as successful.
-        :return: The set of successful tasks according to the given criteria.
+        :param tasks: Tasks that are part of the build.
+        :param successful_tasks: Names of tasks that were successful.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param build_checks: Build criteria that apply to the build.
+        :return: List of tasks to check.
         """
-        return {
-            task.display_name
-            for task in tasks
-            if task.is_success()
-            or (
-                allow_known_failures and task.is_completed() and self._is_task_a_known_failure(task)
+        if not allow_known_failures:
+            return []
+
+        failed_tasks = [task for task in tasks if not task.is_success() and task.is_completed()]
+        if build_checks is None:
+            return failed_tasks
+
+        n_successful = len(successful_tasks)
+        n_tasks = len({task.display_name for task in tasks})
+        if any(
+            bc.thresholds_depend_on_successful_count(
+                n_successful, n_successful + len(failed_tasks), n_tasks
             )
-        }
+            for bc in build_checks
+        ):
+            return failed_tasks
+
+        named_tasks = {task for bc in build_checks for task in bc.successful_tasks or set()}
+        return [task for task in failed_tasks if task.display_name in named_tasks]
 
-    def _is_task_a_known_failure(self, task: Task) -> bool:
+    @staticmethod
+    def _all_known_failures_checked(
+        tasks: List[Task], checked_tasks: List[Task], allow_known_failures: bool
+    ) -> bool:
         """
-        Check if a task is a known failure. A known failure will be annotated with an issue.
+        Determine if every failed task was checked for being a known failure.
 
-        :param task: the task to check.
-        :return: True if the task is a known failure.
+        :param tasks: Tasks that are part of the build.
+        :param checked_tasks: Tasks that were checked for being known failures.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :return: True if the set of successful tasks is complete.
         """
-        return any(
-            annotation.issues for annotation in self.evg_api.get_task_annotation(task.task_id)
+        if not allow_known_failures:
+            return True
+        n_failed = len([task for task in tasks if not task.is_success() and task.is_completed()])
+        return len(checked_tasks) == n_failed
+
+    def _record_build_status(
+        self,
+        build: Build,
+        tasks: List[Task],
+        successful_tasks: Set[str],
+        allow_known_failures: bool,
+        complete: bool = True,
+    ) -> BuildStatus:
+        """
+        Create the build status for the given build and store it in the build cache.
+
+        A build status is only stored if it is complete, one that skipped checking some failed
+        tasks for being known failures is only valid for the checks it was created for.
+
+        :param build: Evergreen build being analyzed.
+        :param tasks: Tasks that are part of the build.
+        :param successful_tasks: Names of tasks that are considered successful.
+        :param allow_known_failures: Whether known failures were considered passing.
+        :param complete: Whether every failed task was checked for being a known failure.
+        :return: Summary of build.
+        """
+        inactive_tasks = {task.display_name for task in tasks if task.is_undispatched()}
+        all_tasks = {task.display_name for task in tasks}
+
+        build_status = BuildStatus(
+            build_name=build.display_name,
+            build_variant=build.build_variant,
+            successful_tasks=successful_tasks,
+            inactive_tasks=inactive_tasks,
+            all_tasks=all_tasks,
         )
+        if complete:
+            # Annotations can be added to a finished build, so results that depend on them are
+            # treated like the results of a build that is still running.
+            finished = build.is_completed() and not allow_known_failures
+            self.build_cache.put(build.id, allow_known_failures, build_status, finished)
+        return build_status
 
     def check_version(
         self,
         evg_version: Version,
         build_checks: List[BuildChecks],
         allow_known_failures: bool = False,
+        cancelled: Optional[Event] = None,
     ) -> bool:
         """
         Check if the given version meets the specified criteria.
 
+        Builds are checked as they are analyzed. As soon as one build fails a check that every
+        build must pass, the version is rejected and any builds still waiting to be analyzed are
+        abandoned. The same happens if the check is cancelled, since its result is not needed.
+
+        :param evg_version: Evergreen version to check.
+        :param build_checks: Build criteria to use.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param cancelled: Event set once the result of the check is no longer needed.
+        :return: True if the version matches the specified criteria.
+        """
+        with self.tracer.span("check_version", "search", revision=evg_version.revision):
+            if not evg_version.build_variants_status or len(evg_version.build_variants_status) == 0:
+                return self._meets_criteria(evg_version, build_checks, None)
+
+            build_status_list = []
+            build_statuses = self._iter_build_statuses(
+                evg_version, build_checks, allow_known_failures, cancelled
+            )
+            try:
+                for build_status in build_statuses:
+                    if self._rejects_version(evg_version, build_status, build_checks):
+                        return False
+                    build_status_list.append(build_status)
+            finally:
+                build_statuses.close()
+
+            return self._meets_criteria(evg_version, build_checks, build_status_list)
+
+    async def check_version_async(
+        self,
+        evg_version: Version,
+        build_checks: List[BuildChecks],
+        evg_client: AsyncEvergreenClient,
+        allow_known_failures: bool = False,
+    ) -> bool:
+        """
+        Check if the given version meets the specified criteria using the asyncio client.
+
         :param evg_version: Evergreen version to check.
         :param build_checks: Build criteria to use.
+        :param evg_client: Asyncio Evergreen client to fetch with.
         :param allow_known_failures: Whether to allow known failures as passing ones.
         :return: True if the version matches the specified criteria.
         """
-        build_status_list = self.get_build_statuses_for_version(
-            evg_version, build_checks, allow_known_failures
+        with self.tracer.span("check_version", "search", revision=evg_version.revision):
+            if not evg_version.build_variants_status or len(evg_version.build_variants_status) == 0:
+                return self._meets_criteria(evg_version, build_checks, None)
+
+            applicable_variants = self._applicable_build_variants(evg_version, build_checks)
+            if applicable_variants is not None:
+                jobs = [
+                    asyncio.create_task(
+                        self._analyze_build_variant_async(
+                            evg_version,
+                            build_variant,
+                            evg_client,
+                            allow_known_failures,
+                            checks,
+                        )
+                    )
+                    for build_variant, checks in applicable_variants.items()
+                ]
+            else:
+                builds = await evg_client.builds_for_version(evg_version)
+                self.stats.increment("builds_fetched", len(builds))
+                jobs = [
+                    asyncio.create_task(
+                        self.analyze_build_async(
+                            build,
+                            evg_client,
+                            allow_known_failures,
+                            checks,
+                        )
+                    )
+                    for build, checks in self._applicable_builds(builds, build_checks)
+                ]
+
+            build_status_list = []
+            try:
+                for job in asyncio.as_completed(jobs):
+                    build_status = await job
+                    if build_status is None:
+                        continue
+                    if self._rejects_version(evg_version, build_status, build_checks):
+                        return False
+                    build_status_list.append(build_status)
+            finally:
+                for job in jobs:
+                    job.cancel()
+
+            return self._meets_criteria(evg_version, build_checks, build_status_list)
+
+    def check_version_for_groups(
+        self,
+        evg_version: Version,
+        criteria_groups: Dict[str, List[BuildChecks]],
+        allow_known_failures: bool = False,
+        cancelled: Optional[Event] = None,
+    ) -> Set[str]:
+        """
+        Check which of the given groups of criteria the given version meets.
+
+        The builds any of the groups apply to are analyzed once and their statuses are shared by
+        every group. Each group only sees the builds its own checks apply to, so it is evaluated
+        the same way `check_version` would evaluate it. Builds stop being analyzed once every
+        group has been rejected or the check is cancelled.
+
+        :param evg_version: Evergreen version to check.
+        :param criteria_groups: Dictionary of group names and the build criteria of each group.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param cancelled: Event set once the result of the check is no longer needed.
+        :return: Names of the groups whose criteria the version matches.
+        """
+        with self.tracer.span("check_version", "search", revision=evg_version.revision):
+            if not evg_version.build_variants_status:
+                return set()
+
+            remaining_groups = dict(criteria_groups)
+            group_statuses: Dict[str, List[BuildStatus]] = {name: [] for name in criteria_groups}
+            all_checks = [bc for build_checks in criteria_groups.values() for bc in build_checks]
+            build_statuses = self._iter_build_statuses(
+                evg_version, all_checks, allow_known_failures, cancelled
+            )
+            try:
+                for build_status in build_statuses:
+                    for name, build_checks in list(remaining_groups.items()):
+                        plan = self._criteria_plan(build_checks)
+                        if not plan.checks_for(build_status.build_variant, build_status.build_name):
+                            continue
+                        if self._disqualifies_version(build_status, build_checks):
+                            LOGGER.debug(
+                                "Build does not meet criteria of group",
+                                commit=evg_version.revision,
+                                build=build_status.build_name,
+                                group=name,
+                            )
+                            del remaining_groups[name]
+                        else:
+                            group_statuses[name].append(build_status)
+                    if not remaining_groups:
+                        return set()
+            finally:
+                build_statuses.close()
+
+            return {
+                name
+                for name, build_checks in remaining_groups.items()
+                if self._meets_criteria(evg_version, build_checks, group_statuses[name])
+            }
+
+    def _criteria_plan(self, build_checks: List[BuildChecks]) -> CriteriaPlan:
+        """
+        Get the plan for checking the given build criteria, reusing it across versions.
+
+        The plan holds on to the criteria, so the identities of the criteria are enough to tell
+        whether a plan was created for them.
+
+        :param build_checks: Build criteria to get plan for.
+        :return: Plan for checking the build criteria.
+        """
+        key = tuple(id(bc) for bc in build_checks)
+        plan = self._criteria_plans.get(key)
+        if plan is None:
+            plan = CriteriaPlan(build_checks)
+            self._criteria_plans[key] = plan
+        return plan
+
+    def _rejects_version(
+        self, evg_version: Version, build_status: BuildStatus, build_checks: List[BuildChecks]
+    ) -> bool:
+        """
+        Check if the given build status rejects its version, so the remaining builds can be skipped.
+
+        :param evg_version: Evergreen version being checked.
+        :param build_status: Status of build to check.
+        :param build_checks: Build criteria to use.
+        :return: True if the version cannot meet the specified criteria.
+        """
+        if not self._disqualifies_version(build_status, build_checks):
+            return False
+        LOGGER.debug(
+            "Build does not meet criteria, skipping remaining builds",
+            commit=evg_version.revision,
+            build=build_status.build_name,
+        )
+        return True
+
+    @staticmethod
+    def _disqualifies_version(build_status: BuildStatus, build_checks: List[BuildChecks]) -> bool:
+        """
+        Check if the given build status means its version cannot meet the specified criteria.
+
+        Every build needs to pass the checks without a failure threshold, so a single failure is
+        enough to reject the version.
+
+        :param build_status: Status of build to check.
+        :param build_checks: Build criteria to use.
+        :return: True if the version cannot meet the specified criteria.
+        """
+        return not all(
+            bc.check(build_status) for bc in build_checks if bc.failure_threshold is None
         )
+
+    @staticmethod
+    def _meets_criteria(
+        evg_version: Version,
+        build_checks: List[BuildChecks],
+        build_status_list: Optional[List[BuildStatus]],
+    ) -> bool:
+        """
+        Check if the given build statuses of a version meet the specified criteria.
+
+        :param evg_version: Evergreen version being checked.
+        :param build_checks: Build criteria to use.
+        :param build_status_list: Statuses of the builds in the version.
+        :return: True if the version matches the specified criteria.
+        """
         if not build_status_list:
             LOGGER.debug("No build status found for version, skipping", commit=evg_version.revision)
             return False
@@ -148,22 +860,135 @@ class EvergreenService:
         """
         if not evg_version.build_variants_status or len(evg_version.build_variants_status) == 0:
             return None
-        builds = evg_version.get_builds()
-        with Executor(max_workers=N_THREADS) as exe:
-            jobs = [
-                exe.submit(self.analyze_build, build, allow_known_failures)
-                for build in builds
-                if any(
-                    bc.should_apply(build.build_variant, build.display_name) for bc in build_checks
-                )
-            ]
+        return list(self._iter_build_statuses(evg_version, build_checks, allow_known_failures))
 
-        results = []
-        for j in jobs:
-            result = j.result()
-            if result is not None:
-                results.append(result)
-        return results
+    def _iter_build_statuses(
+        self,
+        evg_version: Version,
+        build_checks: List[BuildChecks],
+        allow_known_failures: bool = False,
+        cancelled: Optional[Event] = None,
+    ) -> Generator[BuildStatus, None, None]:
+        """
+        Analyze the builds of the given version that match the predicate.
+
+        Build statuses are yielded as soon as they are available. If the generator is closed
+        before it is exhausted, any builds that have not started being analyzed are cancelled.
+        Once the given event is set, no more builds are submitted, builds waiting in the pool are
+        skipped when they reach a worker and the generator stops.
+
+        :param evg_version: Evergreen version to check.
+        :param build_checks: Build criteria to use.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param cancelled: Event set once the build statuses are no longer needed.
+        :return: Generator of build statuses.
+        """
+        cancelled = cancelled or Event()
+        jobs: List[Future] = []
+        try:
+            applicable_variants = self._applicable_build_variants(evg_version, build_checks)
+            if applicable_variants is not None:
+                for build_variant, checks in applicable_variants.items():
+                    if cancelled.is_set():
+                        return
+                    jobs.append(
+                        self._submit_unless_cancelled(
+                            cancelled,
+                            self._analyze_build_variant,
+                            evg_version,
+                            build_variant,
+                            allow_known_failures,
+                            checks,
+                        )
+                    )
+            else:
+                if cancelled.is_set():
+                    return
+                builds = self.limiter.call(evg_version.get_builds)
+                self.stats.increment("builds_fetched", len(builds))
+                for build, checks in self._applicable_builds(builds, build_checks):
+                    if cancelled.is_set():
+                        return
+                    jobs.append(
+                        self._submit_unless_cancelled(
+                            cancelled, self.analyze_build, build, allow_known_failures, checks
+                        )
+                    )
+            for job in as_completed(jobs):
+                if cancelled.is_set():
+                    return
+                result = job.result()
+                if result is not None:
+                    yield result
+        finally:
+            for job in jobs:
+                job.cancel()
+
+    def _submit_unless_cancelled(
+        self, cancelled: Event, fn: Callable[..., Optional[BuildStatus]], *args: Any
+    ) -> "Future[Optional[BuildStatus]]":
+        """
+        Submit the analysis of a build to the worker pool, skipping it if cancelled before it runs.
+
+        :param cancelled: Event set once the analysis is no longer needed.
+        :param fn: Function analyzing the build.
+        :param args: Arguments to pass to function.
+        :return: Future of the build status, None if the analysis was skipped.
+        """
+
+        def run() -> Optional[BuildStatus]:
+            if cancelled.is_set():
+                self.stats.increment("builds_skipped_after_cancel")
+                return None
+            return fn(*args)
+
+        return self.worker_pool.submit(run)
+
+    def _applicable_build_variants(
+        self, evg_version: Version, build_checks: List[BuildChecks]
+    ) -> Optional[Dict[str, List[BuildChecks]]]:
+        """
+        Determine which build variants of the given version the build checks apply to.
+
+        Only the build variant of each build is listed in the version, so this is not possible
+        when a check depends on the display name of a build. When the checks apply to a lot of
+        builds, it is cheaper to query all the builds of the version at once, so nothing is
+        returned in that case either.
+
+        :param evg_version: Evergreen version to check.
+        :param build_checks: Build criteria to use.
+        :return: Dictionary of build variants and the checks that apply to them if known.
+        """
+        plan = self._criteria_plan(build_checks)
+        applicable_variants = {}
+        for build_variant in evg_version.build_variants_map:
+            checks = plan.checks_for_build_variant(build_variant)
+            if checks is None:
+                return None
+            if checks:
+                applicable_variants[build_variant] = checks
+
+        if len(applicable_variants) > MAX_BUILDS_TO_FETCH_INDIVIDUALLY:
+            return None
+        return applicable_variants
+
+    def _applicable_builds(
+        self, builds: Iterable[Build], build_checks: List[BuildChecks]
+    ) -> List[Tuple[Build, List[BuildChecks]]]:
+        """
+        Filter the given builds down to the ones any of the build checks apply to.
+
+        :param builds: Builds to filter.
+        :param build_checks: Build criteria to use.
+        :return: List of builds the criteria apply to along with the checks that apply.
+        """
+        plan = self._criteria_plan(build_checks)
+        applicable_builds = []
+        for build in builds:
+            checks = plan.checks_for(build.build_variant, build.display_name)
+            if checks:
+                applicable_builds.append((build, checks))
+        return applicable_builds
 
     def get_modules_revisions(self, project_id: str, revision: str) -> Dict[str, str]:
         """
@@ -173,8 +998,9 @@ class EvergreenService:
         :param revision: Commit revision to query.
         :return: Dictionary of modules and revisions associated with specified commit.
         """
+        self.stats.increment("manifest_calls")
         try:
-            manifest = self.evg_api.manifest(project_id, revision)
+            manifest = self.limiter.call(self.evg_api.manifest, project_id, revision)
         except HTTPError as err:
             if err.response.status_code == 404:
                 # If a project does not use modules, the manifest will return 404.
@@ -192,8 +1018,8 @@ class EvergreenService:
         :param project_id: ID of Evergreen project being queried.
         :return: Path to project config file.
         """
-        project_config_list = self.evg_api.all_projects(
-            project_filter_fn=lambda p: p.identifier == project_id
+        project_config_list = self.limiter.call(
+            self.evg_api.all_projects, lambda p: p.identifier == project_id
         )
         if len(project_config_list) != 1:
             raise ValueError(f"Could not find unique project configuration for : '{project_id}'.")
@@ -204,9 +1030,31 @@ class EvergreenService:
         """
         Get the paths that project modules are stored.
 
+        The modules are read directly from the project configuration when possible, falling back
+        to evaluating it with the evergreen CLI, which is slow. Either way, the module locations
+        are cached by the hash of the configuration and only read again when it changes.
+
         :param project_id: ID of project to query.
         :return: Dictionary of modules and their paths.
         """
-        project_config_location = self.get_project_config_location(project_id)
-        project_config = yaml.safe_load(self.evg_cli_proxy.evaluate(Path(project_config_location)))
-        return {module["name"]: module["prefix"] for module in project_config.get("modules", [])}
+        project_config_location = Path(self.get_project_config_location(project_id))
+        config_hash = hash_project_config(project_config_location)
+        if config_hash is not None:
+            cached_locations = self.build_cache.get_module_locations(project_id, config_hash)
+            if cached_locations is not None:
+                self.stats.increment("module_locations_from_cache")
+                return cached_locations
+
+        with self.tracer.span("extract modules", "config", path=project_config_location):
+            extracted_locations = extract_module_locations(project_config_location)
+        if extracted_locations is not None:
+            module_locations = extracted_locations
+        else:
+            self.stats.increment("project_configs_evaluated")
+            project_config = yaml.safe_load(self.evg_cli_proxy.evaluate(project_config_location))
+            module_locations = {
+                module["name"]: module["prefix"] for module in project_config.get("modules", [])
+            }
+        if config_hash is not None:
+            self.build_cache.put_module_locations(project_id, config_hash, module_locations)
+        return module_locations
@@ -1,9 +1,15 @@
 """A service for interacting with git."""
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Sequence
 
-from plumbum import local
+import inject
+import structlog
+from plumbum import ProcessExecutionError, local
+
+from goodbase.tracing import Tracer
+
+LOGGER = structlog.get_logger(__name__)
 
 
 class GitAction(str, Enum):
@@ -25,9 +31,15 @@ class GitAction(str, Enum):
 class GitService:
     """A service for interacting with git."""
 
-    def __init__(self) -> None:
-        """Initialize the service."""
+    @inject.autoparams()
+    def __init__(self, tracer: Tracer) -> None:
+        """
+        Initialize the service.
+
+        :param tracer: Tracer to record spans of git commands with.
+        """
         self.git = local.cmd.git
+        self.tracer = tracer
 
     def perform_action(
         self,
@@ -39,6 +51,8 @@ class GitService:
         """
         Perform the given git operation.
 
+        The revision needs to be available locally, see `fetch_missing`.
+
         :param action: Git operation to perform.
         :param revision: Git revision to perform operation with.
         :param directory: Directory of git repository.
@@ -47,7 +61,6 @@ class GitService:
         if action == GitAction.NONE:
             return
 
-        self.fetch(directory)
         if action == GitAction.CHECKOUT:
             self.checkout(revision, directory, branch_name)
         elif action == GitAction.REBASE:
@@ -69,8 +82,7 @@ class GitService:
         if branch_name is not None:
             args += ["-b", branch_name]
         args.append(revision)
-        with local.cwd(self._determine_directory(directory)):
-            self.git[args]()
+        self._run_git(args, directory)
 
     def fetch(self, directory: Optional[Path] = None) -> None:
         """
@@ -78,8 +90,56 @@ class GitService:
 
         :param directory: Directory to execute command at.
         """
-        with local.cwd(self._determine_directory(directory)):
-            self.git["fetch", "origin"]()
+        self._run_git(("fetch", "origin"), directory)
+
+    def missing_revisions(
+        self, revisions: Sequence[str], directory: Optional[Path] = None
+    ) -> List[str]:
+        """
+        Find which of the given revisions are not available locally.
+
+        All the revisions are looked up with a single `git cat-file --batch-check`.
+
+        :param revisions: Revisions to look up.
+        :param directory: Directory to execute command at.
+        :return: List of revisions that are not commits available locally.
+        """
+        if not revisions:
+            return []
+        stdin = "".join(f"{revision}^{{commit}}\n" for revision in revisions)
+        lines = self._run_git(("cat-file", "--batch-check"), directory, stdin=stdin).splitlines()
+        return [
+            revision
+            for idx, revision in enumerate(revisions)
+            if idx >= len(lines) or lines[idx].split()[1:2] != ["commit"]
+        ]
+
+    def fetch_revisions(self, revisions: Sequence[str], directory: Optional[Path] = None) -> None:
+        """
+        Fetch the given revisions from origin.
+
+        Not every server allows fetching a commit by its hash, so everything is fetched from
+        origin if fetching the revisions alone fails.
+
+        :param revisions: Revisions to fetch.
+        :param directory: Directory to execute command at.
+        """
+        try:
+            self._run_git(("fetch", "origin", *revisions), directory)
+        except ProcessExecutionError:
+            LOGGER.debug("Could not fetch revisions, fetching origin", revisions=revisions)
+            self.fetch(directory)
+
+    def fetch_missing(self, revisions: Sequence[str], directory: Optional[Path] = None) -> None:
+        """
+        Fetch any of the given revisions that are not available locally from origin.
+
+        :param revisions: Revisions that need to be available.
+        :param directory: Directory to execute command at.
+        """
+        missing_revisions = self.missing_revisions(revisions, directory)
+        if missing_revisions:
+            self.fetch_revisions(missing_revisions, directory)
 
     def rebase(self, revision: str, directory: Optional[Path] = None) -> None:
         """
@@ -88,8 +148,7 @@ class GitService:
         :param revision: Revision to rebase on.
         :param directory: Directory to execute command at.
         """
-        with local.cwd(self._determine_directory(directory)):
-            self.git["rebase", revision]()
+        self._run_git(("rebase", revision), directory)
 
     def merge(self, revision: str, directory: Optional[Path] = None) -> None:
         """
@@ -98,8 +157,28 @@ class GitService:
         :param revision: Revision to merge.
         :param directory: Directory to execute command at.
         """
-        with local.cwd(self._determine_directory(directory)):
-            self.git["merge", revision]()
+        self._run_git(("merge", revision), directory)
+
+    def _run_git(
+        self, args: Sequence[str], directory: Optional[Path] = None, stdin: Optional[str] = None
+    ) -> str:
+        """
+        Run a git command.
+
+        The command is run with its own working directory rather than changing the directory of the
+        process, so git commands can run on several threads at once.
+
+        :param args: Arguments to pass to git.
+        :param directory: Directory to execute command at.
+        :param stdin: Input to pass to the command.
+        :return: Output of the command.
+        """
+        working_dir = self._determine_directory(directory)
+        with self.tracer.span(f"git {args[0]}", "git", args=" ".join(args), cwd=working_dir):
+            command = self.git[args].with_cwd(working_dir)
+            if stdin is not None:
+                return (command << stdin)()
+            return command()
 
     @staticmethod
     def _determine_directory(directory: Optional[Path] = None) -> Path:
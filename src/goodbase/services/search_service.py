@@ -1,6 +1,12 @@
 """A service to search for revisions."""
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor as Executor
+from contextlib import contextmanager
+from threading import Event
 from time import perf_counter
-from typing import Iterable, List, Optional
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import click
 import inject
@@ -8,8 +14,13 @@ import structlog
 from evergreen import EvergreenApi, Version
 
 from goodbase.build_checker import BuildChecks
+from goodbase.clients.async_evg_client import AsyncEvergreenClient
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
 from goodbase.goodbase_options import GoodBaseOptions, OutputFormat
+from goodbase.search_stats import SearchStats
 from goodbase.services.evg_service import EvergreenService
+from goodbase.tracing import Tracer
+from goodbase.worker_pool import WorkerPool
 
 LOGGER = structlog.get_logger(__name__)
 
@@ -19,7 +30,14 @@ class SearchService:
 
     @inject.autoparams()
     def __init__(
-        self, evg_api: EvergreenApi, evg_service: EvergreenService, options: GoodBaseOptions
+        self,
+        evg_api: EvergreenApi,
+        evg_service: EvergreenService,
+        options: GoodBaseOptions,
+        worker_pool: WorkerPool,
+        limiter: AdaptiveConcurrencyLimiter,
+        stats: SearchStats,
+        tracer: Tracer,
     ) -> None:
         """
         Initialize the service.
@@ -27,10 +45,18 @@ class SearchService:
         :param evg_api: Client to query evergreen API.
         :param evg_service: Service to work with evergreen.
         :param options: Good Base options for execution.
+        :param worker_pool: Pool of workers to query Evergreen with.
+        :param limiter: Limit on the number of requests to Evergreen in flight.
+        :param stats: Statistics about the work done.
+        :param tracer: Tracer to record spans of the work done with.
         """
         self.evg_api = evg_api
         self.evg_service = evg_service
         self.options = options
+        self.worker_pool = worker_pool
+        self.limiter = limiter
+        self.stats = stats
+        self.tracer = tracer
 
     def find_revision(
         self,
@@ -47,26 +73,79 @@ class SearchService:
         :param allow_known_failures: Whether to allow known failures as passing ones.
         :return: First git revision to match the given criteria if it exists.
         """
+        with self.tracer.span("find_revision", "search", evg_project=evg_project):
+            versions = self._get_versions(evg_project, version_override)
+            with self.stats.timer("search"), self._show_progress(evg_project, versions) as bar:
+                return self._find_stable_revision(bar, build_checks, allow_known_failures)
+
+    def find_revisions(
+        self,
+        evg_project: str,
+        criteria_groups: Dict[str, List[BuildChecks]],
+        version_override: Optional[str],
+        allow_known_failures: bool = False,
+        max_results: int = 1,
+    ) -> Dict[str, List[str]]:
+        """
+        Iterate through revisions until enough are found for each of the given groups of criteria.
+
+        :param evg_project: Evergreen project to check.
+        :param criteria_groups: Dictionary of group names and the criteria of each group.
+        :param version_override: A specific version to check.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param max_results: Number of matching revisions to find for each group.
+        :return: Dictionary of group names and the git revisions matching each group, newest first.
+        """
+        with self.tracer.span("find_revisions", "search", evg_project=evg_project):
+            versions = self._get_versions(evg_project, version_override)
+            with self.stats.timer("search"), self._show_progress(evg_project, versions) as bar:
+                return self._find_stable_revisions(
+                    bar, criteria_groups, allow_known_failures, max_results
+                )
+
+    def newest_revision(self, evg_project: str, version_override: Optional[str]) -> Optional[str]:
+        """
+        Get the newest revision a search of the given project could find.
+
+        :param evg_project: Evergreen project to search.
+        :param version_override: A specific version to search instead of the project.
+        :return: Revision of the newest version that would be searched, if there is one.
+        """
+        evg_version = next(iter(self._get_versions(evg_project, version_override)), None)
+        return evg_version.revision if evg_version is not None else None
+
+    def _get_versions(self, evg_project: str, version_override: Optional[str]) -> Iterable[Version]:
+        """
+        Get the versions to search.
+
+        :param evg_project: Evergreen project to search.
+        :param version_override: A specific version to search instead of the project.
+        :return: Versions to search, newest first.
+        """
         if version_override:
-            versions = iter([self.evg_api.version_by_id(version_override)])
-        else:
-            versions = self.evg_api.versions_by_project(evg_project)
+            return iter([self.evg_api.version_by_id(version_override)])
+        return self.evg_api.versions_by_project(evg_project)
+
+    @contextmanager
+    def _show_progress(
+        self, evg_project: str, versions: Iterable[Version]
+    ) -> Iterator[Iterable[Version]]:
+        """
+        Show the progress of iterating over the given versions when displaying plaintext.
 
+        :param evg_project: Evergreen project being searched.
+        :param versions: Versions to iterate over.
+        :return: Versions to iterate over, tracking the progress.
+        """
         if self.options.output_format in {OutputFormat.YAML, OutputFormat.JSON}:
-            stable_revision = self._find_stable_revision(
-                versions, build_checks, allow_known_failures
-            )
+            yield versions
         else:  # plaintext: show progress bar
             with click.progressbar(
                 versions,
                 length=self.options.max_lookback,
                 label=f"Searching {evg_project} revisions",
             ) as bar:
-                stable_revision = self._find_stable_revision(
-                    bar, build_checks, allow_known_failures
-                )
-
-        return stable_revision
+                yield bar
 
     def _find_stable_revision(
         self,
@@ -82,15 +161,240 @@ class SearchService:
         :param allow_known_failures: Whether to allow known failures as passing ones.
         :return: First git revision to match the given criteria if it exists.
         """
+        if self.options.async_fetch:
+            return asyncio.run(
+                self._find_stable_revision_async(evg_versions, build_checks, allow_known_failures)
+            )
+
+        if self.options.search_window > 1:
+            return self._find_stable_revision_pipelined(
+                evg_versions, build_checks, allow_known_failures
+            )
+
         start_time = perf_counter()
         for idx, evg_version in enumerate(evg_versions):
-            current_time = perf_counter()
-            elapsed_time = current_time - start_time
-            if self.options.lookback_limit_hit(idx, evg_version.revision, elapsed_time):
+            if not self._start_version_check(idx, evg_version, start_time):
                 return None
 
-            LOGGER.debug("Checking version", commit=evg_version.revision)
             if self.evg_service.check_version(evg_version, build_checks, allow_known_failures):
                 return evg_version.revision
 
         return None
+
+    def _start_version_check(self, idx: int, evg_version: Version, start_time: float) -> bool:
+        """
+        Record that the given version is being checked, unless the lookback limit has been hit.
+
+        :param idx: Number of versions checked before the given version.
+        :param evg_version: Evergreen version to check.
+        :param start_time: Time the search started at.
+        :return: True if the version should be checked.
+        """
+        elapsed_time = perf_counter() - start_time
+        if self.options.lookback_limit_hit(idx, evg_version.revision, elapsed_time):
+            return False
+
+        LOGGER.debug("Checking version", commit=evg_version.revision)
+        self.stats.increment("versions_scanned")
+        return True
+
+    def _find_stable_revision_pipelined(
+        self,
+        evg_versions: Iterable[Version],
+        build_checks: List[BuildChecks],
+        allow_known_failures: bool = False,
+    ) -> Optional[str]:
+        """
+        Find the latest matching revision while evaluating a window of versions concurrently.
+
+        Versions are submitted in order and their results consumed in the same order, so the
+        revision returned is the same one a sequential search would find. Once a match is found,
+        any older versions still waiting to be evaluated are cancelled, and the checks already
+        running stop submitting requests for their builds.
+
+        Checking a version only waits on requests running in the shared worker pool, so versions
+        are checked on their own threads to keep them from taking up workers in the pool.
+
+        :param evg_versions: Evergreen versions to iterate over.
+        :param build_checks: Criteria to enforce.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :return: First git revision to match the given criteria if it exists.
+        """
+        window = self.options.search_window
+        start_time = perf_counter()
+        version_iter = enumerate(evg_versions)
+        pending: Deque[Tuple[Version, Future]] = deque()
+        versions_exhausted = False
+        cancelled = Event()
+
+        exe = Executor(max_workers=window)
+        try:
+            while True:
+                while not versions_exhausted and len(pending) < window:
+                    next_version = next(version_iter, None)
+                    if next_version is None:
+                        versions_exhausted = True
+                        break
+
+                    idx, evg_version = next_version
+                    if not self._start_version_check(idx, evg_version, start_time):
+                        versions_exhausted = True
+                        break
+
+                    future = exe.submit(
+                        self.evg_service.check_version,
+                        evg_version,
+                        build_checks,
+                        allow_known_failures,
+                        cancelled,
+                    )
+                    pending.append((evg_version, future))
+
+                if not pending:
+                    return None
+
+                evg_version, future = pending.popleft()
+                if future.result():
+                    return evg_version.revision
+        finally:
+            if pending:
+                LOGGER.debug("Cancelling pending version checks", n_pending=len(pending))
+            cancelled.set()
+            exe.shutdown(wait=False, cancel_futures=True)
+
+    def _find_stable_revisions(
+        self,
+        evg_versions: Iterable[Version],
+        criteria_groups: Dict[str, List[BuildChecks]],
+        allow_known_failures: bool = False,
+        max_results: int = 1,
+    ) -> Dict[str, List[str]]:
+        """
+        Find the latest revisions that match each group of criteria in a single pass.
+
+        Each version is checked against every group that still needs more matches, sharing the
+        builds analyzed between the groups. Versions are evaluated in a window and their results
+        consumed in order, like the pipelined search, so each group gets the same revisions a
+        search for that group alone would find. The search stops once every group has found
+        enough revisions, and any checks still running are cancelled.
+
+        :param evg_versions: Evergreen versions to iterate over.
+        :param criteria_groups: Dictionary of group names and the criteria of each group.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :param max_results: Number of matching revisions to find for each group.
+        :return: Dictionary of group names and the git revisions matching each group, newest first.
+        """
+        revisions: Dict[str, List[str]] = {name: [] for name in criteria_groups}
+        window = self.options.search_window
+        start_time = perf_counter()
+        pending: Deque[Tuple[Version, Future]] = deque()
+        cancelled = Event()
+
+        def needs_more_results(name: str) -> bool:
+            return len(revisions[name]) < max_results
+
+        def consume_oldest_pending() -> None:
+            evg_version, future = pending.popleft()
+            for name in future.result():
+                if needs_more_results(name):
+                    LOGGER.debug(
+                        "Found revision for group", group=name, commit=evg_version.revision
+                    )
+                    revisions[name].append(evg_version.revision)
+
+        exe = Executor(max_workers=window)
+        try:
+            for idx, evg_version in enumerate(evg_versions):
+                remaining_groups = {
+                    name: build_checks
+                    for name, build_checks in criteria_groups.items()
+                    if needs_more_results(name)
+                }
+                if not remaining_groups:
+                    break
+
+                elapsed_time = perf_counter() - start_time
+                if self.options.lookback_limit_hit(idx, evg_version.revision, elapsed_time):
+                    break
+
+                LOGGER.debug(
+                    "Checking version", commit=evg_version.revision, groups=list(remaining_groups)
+                )
+                self.stats.increment("versions_scanned")
+                future = exe.submit(
+                    self.evg_service.check_version_for_groups,
+                    evg_version,
+                    remaining_groups,
+                    allow_known_failures,
+                    cancelled,
+                )
+                pending.append((evg_version, future))
+                if len(pending) >= window:
+                    consume_oldest_pending()
+
+            while pending and any(needs_more_results(name) for name in criteria_groups):
+                consume_oldest_pending()
+        finally:
+            if pending:
+                LOGGER.debug("Cancelling pending version checks", n_pending=len(pending))
+            cancelled.set()
+            exe.shutdown(wait=False, cancel_futures=True)
+
+        return revisions
+
+    async def _find_stable_revision_async(
+        self,
+        evg_versions: Iterable[Version],
+        build_checks: List[BuildChecks],
+        allow_known_failures: bool = False,
+    ) -> Optional[str]:
+        """
+        Find the latest matching revision using the asyncio Evergreen client.
+
+        All requests made during the search share a single event loop and are bounded by the
+        client. Versions are evaluated in a window and consumed in order, like the pipelined search.
+
+        :param evg_versions: Evergreen versions to iterate over.
+        :param build_checks: Criteria to enforce.
+        :param allow_known_failures: Whether to allow known failures as passing ones.
+        :return: First git revision to match the given criteria if it exists.
+        """
+        window = self.options.search_window
+        start_time = perf_counter()
+        version_iter = enumerate(evg_versions)
+        pending: Deque[Tuple[Version, asyncio.Task]] = deque()
+        versions_exhausted = False
+
+        evg_client = AsyncEvergreenClient(self.evg_api, self.worker_pool, self.limiter)
+        try:
+            while True:
+                while not versions_exhausted and len(pending) < window:
+                    next_version = await evg_client.next_item(version_iter)
+                    if next_version is None:
+                        versions_exhausted = True
+                        break
+
+                    idx, evg_version = next_version
+                    if not self._start_version_check(idx, evg_version, start_time):
+                        versions_exhausted = True
+                        break
+
+                    task = asyncio.create_task(
+                        self.evg_service.check_version_async(
+                            evg_version, build_checks, evg_client, allow_known_failures
+                        )
+                    )
+                    pending.append((evg_version, task))
+
+                if not pending:
+                    return None
+
+                evg_version, task = pending.popleft()
+                if await task:
+                    return evg_version.revision
+        finally:
+            if pending:
+                LOGGER.debug("Cancelling pending version checks", n_pending=len(pending))
+            for _, task in pending:
+                task.cancel()
+            await asyncio.gather(*[task for _, task in pending], return_exceptions=True)
@@ -0,0 +1,129 @@
+"""Trace the operations performed during a run."""
+import asyncio
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Hashable, Iterator, List, Tuple
+
+import structlog
+
+LOGGER = structlog.get_logger(__name__)
+
+
+class Tracer:
+    """
+    Record spans of the operations performed during a run in the Chrome trace event format.
+
+    Spans are recorded on the track of the thread they ran on, or of the asyncio task they ran in,
+    so the resulting file shows what was running concurrently when opened in Perfetto or
+    chrome://tracing. A disabled tracer does not record anything.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Initialize the tracer.
+
+        :param enabled: Whether to record spans.
+        """
+        self.enabled = enabled
+        self.start_time = perf_counter()
+        self._pid = os.getpid()
+        self._lock = Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._tracks: Dict[Hashable, int] = {}
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[None]:
+        """
+        Record a span covering the operation performed in the context.
+
+        :param name: Name of the operation.
+        :param category: Category of the operation.
+        :param args: Details of the operation to include in the span.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        track = self._current_track()
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            end_time = perf_counter()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": self._timestamp(start_time),
+                "dur": self._timestamp(end_time) - self._timestamp(start_time),
+                "pid": self._pid,
+                "tid": track,
+                "args": {key: str(value) for key, value in args.items()},
+            }
+            with self._lock:
+                self._events.append(event)
+
+    def write(self, trace_file: Path) -> None:
+        """
+        Write the recorded spans to the given file.
+
+        :param trace_file: File to write trace to.
+        """
+        with self._lock:
+            events = list(self._events)
+        trace_file.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+        LOGGER.debug("Wrote trace", trace_file=str(trace_file), n_events=len(events))
+
+    def _timestamp(self, time: float) -> int:
+        """
+        Convert a time to the microseconds since the tracer was created.
+
+        :param time: Time to convert.
+        :return: Microseconds since the tracer was created.
+        """
+        return int((time - self.start_time) * 1_000_000)
+
+    def _current_track(self) -> int:
+        """
+        Get the ID of the track spans started now belong to, adding it if it is new.
+
+        :return: ID of track.
+        """
+        key, name = self._current_context()
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is None:
+                track = len(self._tracks) + 1
+                self._tracks[key] = track
+                self._events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": self._pid,
+                        "tid": track,
+                        "args": {"name": name},
+                    }
+                )
+        return track
+
+    @staticmethod
+    def _current_context() -> Tuple[Hashable, str]:
+        """
+        Identify the asyncio task or thread currently running.
+
+        :return: Key identifying the task or thread and its name.
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return ("task", id(task)), f"asyncio {task.get_name()}"
+
+        thread = threading.current_thread()
+        return ("thread", thread.ident), thread.name
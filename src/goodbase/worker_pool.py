@@ -0,0 +1,72 @@
+"""A pool of worker threads shared across the application."""
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor as Executor
+from typing import Any, Callable, List, Sequence, Tuple, TypeVar
+
+import structlog
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+LOGGER = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerPool:
+    """
+    A pool of worker threads for running blocking work concurrently.
+
+    A single pool is shared by everything that talks to Evergreen or git, so the number of
+    requests in flight at once is bounded across the whole process. Work running in the pool
+    must not wait on other work submitted to the pool, otherwise every worker could end up
+    waiting on work that has no worker left to run it.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        """
+        Initialize the pool.
+
+        :param max_workers: Maximum number of workers to run at once.
+        """
+        self.max_workers = max_workers
+        self.executor = Executor(max_workers=max_workers, thread_name_prefix="goodbase")
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Schedule the given function to run in the pool.
+
+        :param fn: Function to run.
+        :param args: Arguments to pass to function.
+        :return: Future of the function result.
+        """
+        return self.executor.submit(fn, *args)
+
+    def run_all(self, fn: Callable[..., T], args_list: Sequence[Tuple[Any, ...]]) -> List[T]:
+        """
+        Run the given function for each set of arguments concurrently and wait for the results.
+
+        This can be used by work running in the pool. The calls are submitted to the pool, but
+        any call that has not started on a worker by the time its result is needed is run by the
+        calling thread instead, so the caller only ever waits on work that is already running.
+
+        :param fn: Function to run.
+        :param args_list: Arguments to pass to each call of the function.
+        :return: Results of the calls, in the same order as their arguments.
+        """
+        if not args_list:
+            return []
+
+        futures = [self.executor.submit(fn, *args) for args in args_list[1:]]
+        try:
+            results = [fn(*args_list[0])]
+            for future, args in zip(futures, args_list[1:]):
+                results.append(fn(*args) if future.cancel() else future.result())
+            return results
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the pool, abandoning any work that has not started."""
+        LOGGER.debug("Shutting down worker pool")
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,22 @@
+"""Reporting of benchmark results."""
+from typing import List
+
+import pytest
+
+from tests.benchmarks.harness import BenchmarkResult
+
+RESULTS: List[BenchmarkResult] = []
+
+
+@pytest.fixture()
+def benchmark_results() -> List[BenchmarkResult]:
+    return RESULTS
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not RESULTS:
+        return
+
+    terminalreporter.section("benchmarks")
+    for result in RESULTS:
+        terminalreporter.write_line(result.summary())
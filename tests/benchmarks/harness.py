@@ -0,0 +1,144 @@
+"""Run end to end searches against the mock Evergreen server."""
+import tracemalloc
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, List, Optional
+from unittest.mock import MagicMock
+
+import inject
+from evergreen import EvergreenApi, RetryingEvergreenApi
+
+from goodbase.build_checker import BuildChecks
+from goodbase.clients.evg_cli_proxy import EvgCliProxy
+from goodbase.clients.http_limiter import LimiterAdapter
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
+from goodbase.goodbase_cli import GoodBaseOrchestrator, RevisionInformation, configure_logging
+from goodbase.goodbase_options import GoodBaseOptions, OutputFormat
+from goodbase.search_stats import SearchStats
+from goodbase.services.build_cache_service import BuildCacheService
+from goodbase.services.git_service import GitAction
+from goodbase.tracing import Tracer
+from goodbase.worker_pool import WorkerPool
+from tests.benchmarks.mock_evergreen import MockEvergreenServer, Scenario
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Measurements of a single search.
+
+    scenario: Scenario that was searched.
+    revision_info: Revision that was found, if any.
+    wall_time_secs: Seconds the search took.
+    request_counts: Number of requests made to each endpoint.
+    bytes_received: Number of bytes received from the server.
+    peak_memory_bytes: Peak memory allocated during the search.
+    """
+
+    scenario: Scenario
+    revision_info: Optional[RevisionInformation]
+    wall_time_secs: float
+    request_counts: Dict[str, int] = field(default_factory=dict)
+    bytes_received: int = 0
+    peak_memory_bytes: int = 0
+
+    @property
+    def n_requests(self) -> int:
+        """Total number of requests made to the server."""
+        return sum(self.request_counts.values())
+
+    def summary(self) -> str:
+        """Format the measurements as a single line of the benchmark report."""
+        counts = ", ".join(f"{name}={n}" for name, n in sorted(self.request_counts.items()))
+        return (
+            f"{self.scenario.name:<24} {self.wall_time_secs:7.3f}s "
+            f"{self.n_requests:6d} requests {self.bytes_received / 1024:9.1f} KiB "
+            f"{self.peak_memory_bytes / 1024 / 1024:7.2f} MiB peak ({counts})"
+        )
+
+
+def run_search(
+    scenario: Scenario,
+    build_checks: Optional[List[BuildChecks]] = None,
+    allow_known_failures: bool = False,
+    options: Optional[GoodBaseOptions] = None,
+) -> BenchmarkResult:
+    """
+    Search the history of the given scenario with `GoodBaseOrchestrator.checkout_good_base`.
+
+    :param scenario: Scenario to search.
+    :param build_checks: Criteria to search with, defaults to a 95% pass threshold.
+    :param allow_known_failures: Whether to allow known failures as passing ones.
+    :param options: Options to search with.
+    :return: Measurements of the search.
+    """
+    if build_checks is None:
+        build_checks = [
+            BuildChecks(build_variant_regex=[".*"], display_name_regex=[], success_threshold=0.95)
+        ]
+    if options is None:
+        options = GoodBaseOptions(
+            max_lookback=scenario.n_versions,
+            commit_limit=None,
+            operation=GitAction.NONE,
+            override_criteria=False,
+            output_format=OutputFormat.JSON,
+        )
+
+    configure_logging(verbose=False)
+    with MockEvergreenServer(scenario) as server:
+        start_time = perf_counter()
+        revision_info = _checkout_good_base(server, build_checks, allow_known_failures, options)
+        wall_time = perf_counter() - start_time
+        request_counts = dict(server.request_counts)
+        bytes_received = server.bytes_sent
+
+    # Tracing allocations slows the search down a lot, so memory is measured in a separate run.
+    with MockEvergreenServer(scenario) as server:
+        tracemalloc.start()
+        try:
+            _checkout_good_base(server, build_checks, allow_known_failures, options)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return BenchmarkResult(
+        scenario=scenario,
+        revision_info=revision_info,
+        wall_time_secs=wall_time,
+        request_counts=request_counts,
+        bytes_received=bytes_received,
+        peak_memory_bytes=peak_memory,
+    )
+
+
+def _checkout_good_base(
+    server: MockEvergreenServer,
+    build_checks: List[BuildChecks],
+    allow_known_failures: bool,
+    options: GoodBaseOptions,
+) -> Optional[RevisionInformation]:
+    evg_api = RetryingEvergreenApi(api_server=server.url, use_default_logger_factory=False)
+    worker_pool = WorkerPool(options.max_concurrency)
+    limiter = AdaptiveConcurrencyLimiter(max_limit=options.max_concurrency)
+    LimiterAdapter.install(evg_api.session, limiter)
+
+    def dependencies(binder: inject.Binder) -> None:
+        binder.bind(EvergreenApi, evg_api)
+        binder.bind(GoodBaseOptions, options)
+        binder.bind(EvgCliProxy, MagicMock(spec_set=EvgCliProxy))
+        binder.bind(BuildCacheService, BuildCacheService(None))
+        binder.bind(WorkerPool, worker_pool)
+        binder.bind(SearchStats, SearchStats())
+        binder.bind(Tracer, Tracer())
+        binder.bind(AdaptiveConcurrencyLimiter, limiter)
+
+    inject.clear_and_configure(dependencies)
+    try:
+        orchestrator = GoodBaseOrchestrator()
+        return orchestrator.checkout_good_base(
+            server.data.project_id, build_checks, allow_known_failures
+        )
+    finally:
+        worker_pool.shutdown()
+        inject.clear()
@@ -0,0 +1,284 @@
+"""A local stand-in for the Evergreen REST API."""
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+TASK_STATUS_COUNT_KEYS = {
+    "success": "succeeded",
+    "failed": "failed",
+    "undispatched": "undispatched",
+}
+
+
+@dataclass
+class Scenario:
+    """
+    Description of the Evergreen history to serve.
+
+    name: Name of scenario.
+    n_versions: Number of versions in the project.
+    n_builds: Number of builds in each version.
+    n_tasks: Number of tasks in each build.
+    first_green: Index of the newest version with every task passing, None if there is none.
+    n_failed_tasks: Number of failed tasks in each build of the other versions.
+    known_failures: Annotate the failures of the first green version instead of fixing them.
+    latency_secs: Seconds to wait before answering each request.
+    """
+
+    name: str
+    n_versions: int = 200
+    n_builds: int = 8
+    n_tasks: int = 20
+    first_green: Optional[int] = None
+    n_failed_tasks: int = 3
+    known_failures: bool = False
+    latency_secs: float = 0.0
+
+
+@dataclass
+class EvergreenData:
+    """Synthetic Evergreen documents for a scenario."""
+
+    project_id: str
+    versions: List[Dict[str, Any]] = field(default_factory=list)
+    builds: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    tasks: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    annotations: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario, project_id: str) -> "EvergreenData":
+        """
+        Generate the documents for the given scenario.
+
+        :param scenario: Scenario to generate.
+        :param project_id: ID of project the versions belong to.
+        :return: Generated documents.
+        """
+        data = cls(project_id=project_id)
+        for version_idx in range(scenario.n_versions):
+            version_id = f"{project_id}_{version_idx}"
+            is_green = scenario.first_green is not None and version_idx >= scenario.first_green
+            is_annotated = scenario.known_failures and version_idx == scenario.first_green
+            n_failed = 0 if is_green and not is_annotated else scenario.n_failed_tasks
+            build_variants_status = []
+            for build_idx in range(scenario.n_builds):
+                build_id = f"{version_id}_build_{build_idx}"
+                build_variant = f"variant_{build_idx}"
+                tasks = [
+                    {
+                        "task_id": f"{build_id}_task_{task_idx}",
+                        "display_name": f"task_{task_idx}",
+                        "status": "failed" if task_idx < n_failed else "success",
+                        "build_id": build_id,
+                        "build_variant": build_variant,
+                        "version_id": version_id,
+                        "execution": 0,
+                    }
+                    for task_idx in range(scenario.n_tasks)
+                ]
+                status_counts = Counter(TASK_STATUS_COUNT_KEYS[task["status"]] for task in tasks)
+                data.builds[build_id] = {
+                    "_id": build_id,
+                    "version": version_id,
+                    "build_variant": build_variant,
+                    "display_name": f"Variant {build_idx}",
+                    "status": "failed" if n_failed else "success",
+                    "status_counts": {
+                        key: status_counts.get(key, 0)
+                        for key in ["succeeded", "failed", "started", "undispatched", "inactive"]
+                    }
+                    | {"dispatched": 0, "timed_out": 0},
+                }
+                data.tasks[build_id] = tasks
+                build_variants_status.append({"build_variant": build_variant, "build_id": build_id})
+
+                if is_annotated:
+                    data.annotations.setdefault(version_id, []).extend(
+                        {
+                            "task_id": task["task_id"],
+                            "task_execution": 0,
+                            "issues": [{"issue_key": "BF-1234", "url": "https://jira/BF-1234"}],
+                        }
+                        for task in tasks
+                        if task["status"] == "failed"
+                    )
+
+            data.versions.append(
+                {
+                    "version_id": version_id,
+                    "revision": f"{version_idx:040x}",
+                    "order": scenario.n_versions - version_idx,
+                    "project": project_id,
+                    "requester": "gitter_request",
+                    "build_variants_status": build_variants_status,
+                }
+            )
+        return data
+
+
+Route = Tuple[str, "re.Pattern[str]", Callable[..., Any]]
+
+
+class MockEvergreenServer:
+    """
+    An HTTP server that answers the Evergreen requests made while searching.
+
+    Requests are counted by endpoint, so the cost of a search can be measured.
+    """
+
+    def __init__(self, scenario: Scenario, project_id: str = "mock-project") -> None:
+        """
+        Initialize the server.
+
+        :param scenario: Scenario to serve.
+        :param project_id: ID of Evergreen project to serve.
+        """
+        self.scenario = scenario
+        self.data = EvergreenData.from_scenario(scenario, project_id)
+        self.request_counts: Counter = Counter()
+        self.bytes_sent = 0
+        self._lock = Lock()
+        self._versions_by_id = {version["version_id"]: version for version in self.data.versions}
+        self._routes: List[Route] = [
+            (name, re.compile(f"^{pattern}$"), handler)
+            for name, pattern, handler in [
+                ("projects", r"/rest/v2/projects", self._projects),
+                ("versions", r"/rest/v2/projects/([^/]+)/versions", self._versions),
+                ("version", r"/rest/v2/versions/([^/]+)", self._version),
+                ("version_builds", r"/rest/v2/versions/([^/]+)/builds", self._version_builds),
+                (
+                    "version_annotations",
+                    r"/rest/v2/versions/([^/]+)/annotations",
+                    self._version_annotations,
+                ),
+                ("build", r"/rest/v2/builds/([^/]+)", self._build),
+                ("build_tasks", r"/rest/v2/builds/([^/]+)/tasks", self._build_tasks),
+                ("task_annotations", r"/rest/v2/tasks/([^/]+)/annotations", self._task_annotations),
+                ("manifest", r"/plugin/manifest/get/([^/]+)/([^/]+)", self._manifest),
+            ]
+        ]
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "MockEvergreenServer":
+        """Start serving requests."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop serving requests."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                server._handle(self)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        url = urlparse(request.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        name = "unknown"
+        status, body, headers = 404, {"error": f"{url.path} not found"}, {}
+
+        if self.scenario.latency_secs:
+            sleep(self.scenario.latency_secs)
+
+        for route_name, pattern, handler in self._routes:
+            match = pattern.match(url.path)
+            if match:
+                name = route_name
+                result = handler(*match.groups(), **query)
+                if result is not None:
+                    status, body, headers = 200, result[0], result[1]
+                break
+
+        payload = json.dumps(body).encode()
+        with self._lock:
+            self.request_counts[name] += 1
+            self.bytes_sent += len(payload)
+
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(payload)))
+        for key, value in headers.items():
+            request.send_header(key, value)
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def _projects(self, **_: str) -> Tuple[Any, Dict[str, str]]:
+        project = {"identifier": self.data.project_id, "remote_path": "etc/evergreen.yml"}
+        return [project], {}
+
+    def _versions(self, project_id: str, start: str = "0", **_: str) -> Any:
+        if project_id != self.data.project_id:
+            return None
+        offset = int(start)
+        page = self.data.versions[offset : offset + PAGE_SIZE]
+        headers = {}
+        if offset + PAGE_SIZE < len(self.data.versions):
+            next_url = (
+                f"{self.url}/rest/v2/projects/{project_id}/versions?start={offset + PAGE_SIZE}"
+            )
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return page, headers
+
+    def _version(self, version_id: str, **_: str) -> Any:
+        version = self._versions_by_id.get(version_id)
+        return None if version is None else (version, {})
+
+    def _version_builds(self, version_id: str, **_: str) -> Any:
+        version = self._versions_by_id.get(version_id)
+        if version is None:
+            return None
+        return [self.data.builds[bvs["build_id"]] for bvs in version["build_variants_status"]], {}
+
+    def _version_annotations(self, version_id: str, **_: str) -> Any:
+        if version_id not in self._versions_by_id:
+            return None
+        return self.data.annotations.get(version_id, []), {}
+
+    def _build(self, build_id: str, **_: str) -> Any:
+        build = self.data.builds.get(build_id)
+        return None if build is None else (build, {})
+
+    def _build_tasks(self, build_id: str, **_: str) -> Any:
+        tasks = self.data.tasks.get(build_id)
+        return None if tasks is None else (tasks, {})
+
+    def _task_annotations(self, task_id: str, **_: str) -> Any:
+        version_id = task_id.split("_build_")[0]
+        annotations = self.data.annotations.get(version_id, [])
+        return [a for a in annotations if a["task_id"] == task_id], {}
+
+    def _manifest(self, project_id: str, revision: str, **_: str) -> Any:
+        return {
+            "id": f"{project_id}_{revision}",
+            "revision": revision,
+            "project": project_id,
+            "modules": {"enterprise": {"revision": revision[::-1], "repo": "enterprise"}},
+        }, {}
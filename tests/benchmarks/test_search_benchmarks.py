@@ -0,0 +1,89 @@
+"""End to end benchmarks of searching against a mock Evergreen server."""
+import pytest
+
+from goodbase.goodbase_options import GoodBaseOptions, OutputFormat
+from goodbase.services.git_service import GitAction
+from tests.benchmarks.harness import run_search
+from tests.benchmarks.mock_evergreen import Scenario
+
+# Roughly the round trip to a remote Evergreen server, so time spent waiting on requests dominates.
+LATENCY_SECS = 0.03
+
+
+@pytest.mark.benchmark
+class TestSearchBenchmarks:
+    @pytest.mark.parametrize(
+        "scenario",
+        [
+            Scenario("green at version 1", first_green=1, latency_secs=LATENCY_SECS),
+            Scenario("green at version 180", first_green=180, latency_secs=LATENCY_SECS),
+        ],
+        ids=lambda scenario: scenario.name,
+    )
+    def test_first_green_version_should_be_found(self, scenario, benchmark_results):
+        result = run_search(scenario)
+        benchmark_results.append(result)
+
+        assert result.revision_info.revision == f"{scenario.first_green:040x}"
+        assert result.revision_info.module_revisions == {
+            "enterprise": f"{scenario.first_green:040x}"[::-1]
+        }
+        # Each red version should only need to look at builds until one fails.
+        n_versions = scenario.first_green + 1
+        assert result.request_counts["build"] <= n_versions * scenario.n_builds
+        assert "build_tasks" not in result.request_counts
+
+    @pytest.mark.parametrize(
+        "search_window,async_fetch",
+        [(8, False), (8, True)],
+        ids=["search window", "async fetch"],
+    )
+    def test_concurrent_search_should_find_first_green_version(
+        self, search_window, async_fetch, benchmark_results
+    ):
+        name = f"window {search_window}" + (" async" if async_fetch else "")
+        scenario = Scenario(name, first_green=180, latency_secs=LATENCY_SECS)
+        options = GoodBaseOptions(
+            max_lookback=scenario.n_versions,
+            commit_limit=None,
+            operation=GitAction.NONE,
+            override_criteria=False,
+            output_format=OutputFormat.JSON,
+            search_window=search_window,
+            async_fetch=async_fetch,
+        )
+
+        result = run_search(scenario, options=options)
+        benchmark_results.append(result)
+
+        assert result.revision_info.revision == f"{scenario.first_green:040x}"
+        # Versions past the first green one may be evaluated while the window is full.
+        n_versions = scenario.first_green + search_window
+        assert result.request_counts["build"] <= n_versions * scenario.n_builds
+        assert "build_tasks" not in result.request_counts
+
+    def test_all_red_should_find_nothing(self, benchmark_results):
+        scenario = Scenario("all red", n_versions=100, latency_secs=LATENCY_SECS)
+
+        result = run_search(scenario)
+        benchmark_results.append(result)
+
+        assert result.revision_info is None
+        assert "manifest" not in result.request_counts
+
+    def test_known_failures_should_be_allowed(self, benchmark_results):
+        scenario = Scenario(
+            "known failures",
+            n_versions=50,
+            first_green=20,
+            known_failures=True,
+            latency_secs=LATENCY_SECS,
+        )
+
+        result = run_search(scenario, allow_known_failures=True)
+        benchmark_results.append(result)
+
+        assert result.revision_info.revision == f"{scenario.first_green:040x}"
+        # Annotations should be fetched once per version instead of once per failed task.
+        assert result.request_counts["version_annotations"] <= scenario.first_green + 1
+        assert "task_annotations" not in result.request_counts
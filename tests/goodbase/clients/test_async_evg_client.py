@@ -0,0 +1,57 @@
+"""Unit tests for async_evg_client.py."""
+import asyncio
+from threading import Lock
+from time import sleep
+from unittest.mock import MagicMock
+
+from evergreen import Version
+
+import goodbase.clients.async_evg_client as under_test
+from goodbase.worker_pool import WorkerPool
+
+
+class TestAsyncEvergreenClient:
+    def test_requests_in_flight_should_be_bounded(self):
+        lock = Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def request(i):
+            with lock:
+                in_flight.append(i)
+                max_in_flight.append(len(in_flight))
+            sleep(0.01)
+            with lock:
+                in_flight.remove(i)
+            return i
+
+        async def run_requests():
+            client = under_test.AsyncEvergreenClient(MagicMock(), WorkerPool(max_workers=3))
+            return await asyncio.gather(*[client.run(request, i) for i in range(12)])
+
+        results = asyncio.run(run_requests())
+
+        assert results == list(range(12))
+        assert max(max_in_flight) <= 3
+
+    def test_next_item_should_return_none_when_exhausted(self):
+        async def read_items():
+            items = []
+            iterator = iter(["a", "b"])
+            client = under_test.AsyncEvergreenClient(MagicMock(), WorkerPool())
+            while (item := await client.next_item(iterator)) is not None:
+                items.append(item)
+            return items
+
+        assert asyncio.run(read_items()) == ["a", "b"]
+
+    def test_builds_for_version_should_query_evergreen(self):
+        evg_version = MagicMock(spec_set=Version)
+        evg_version.get_builds.return_value = ["build"]
+
+        async def get_builds():
+            client = under_test.AsyncEvergreenClient(MagicMock(), WorkerPool())
+            return await client.builds_for_version(evg_version)
+
+        assert asyncio.run(get_builds()) == ["build"]
+        evg_version.get_builds.assert_called_once_with()
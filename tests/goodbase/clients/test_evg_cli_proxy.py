@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 import pytest
 
 import goodbase.clients.evg_cli_proxy as under_test
+from goodbase.tracing import Tracer
 
 
 @pytest.fixture()
@@ -15,7 +16,7 @@ def evg_cli():
 
 @pytest.fixture()
 def evg_cli_proxy(evg_cli):
-    evg_cli_proxy = under_test.EvgCliProxy(evg_cli)
+    evg_cli_proxy = under_test.EvgCliProxy(evg_cli, Tracer())
     return evg_cli_proxy
 
 
@@ -26,3 +27,15 @@ class TestEvaluate:
         evg_cli_proxy.evaluate(project_location)
 
         evg_cli.__getitem__.assert_called_with(["evaluate", "--path", project_location])
+
+    def test_evg_cli_should_not_be_looked_up_until_needed(self, monkeypatch):
+        evg_cli = MagicMock()
+        local = MagicMock()
+        local.cmd.evergreen = evg_cli
+        monkeypatch.setattr(under_test, "local", local)
+        evg_cli_proxy = under_test.EvgCliProxy(None, Tracer())
+        project_location = Path("project_location")
+
+        evg_cli_proxy.evaluate(project_location)
+
+        evg_cli.__getitem__.assert_called_with(["evaluate", "--path", project_location])
@@ -0,0 +1,85 @@
+"""Unit tests for http_limiter.py."""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import List
+
+import pytest
+from evergreen import RetryingEvergreenApi
+from urllib3 import Retry
+from urllib3.util.retry import RequestHistory
+
+import goodbase.clients.http_limiter as under_test
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
+
+
+@pytest.fixture()
+def evg_server():
+    statuses: List[int] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = statuses.pop(0) if statuses else 200
+            body = json.dumps({"_id": "build_1"}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", statuses
+    server.shutdown()
+    server.server_close()
+
+
+def build_evg_api(url: str) -> RetryingEvergreenApi:
+    retry = Retry(total=5, backoff_factor=0, status_forcelist=[429, 500], allowed_methods=None)
+    return RetryingEvergreenApi(api_server=url, use_default_logger_factory=False, http_retry=retry)
+
+
+class TestOverloadReason:
+    @pytest.mark.parametrize(
+        "history,expected",
+        [
+            ([], None),
+            ([RequestHistory("GET", "/", None, 429, None)], "HTTP 429 retried"),
+            ([RequestHistory("GET", "/", None, 503, None)], "HTTP 503 retried"),
+            ([RequestHistory("GET", "/", None, 301, "/other")], None),
+            (
+                [RequestHistory("GET", "/", ConnectionError(), None, None)],
+                "request retried after ConnectionError",
+            ),
+        ],
+    )
+    def test_reason_should_be_found_in_retries(self, history, expected):
+        assert under_test.overload_reason(history) == expected
+
+
+class TestLimiterAdapter:
+    def test_throttled_requests_that_succeed_on_retry_should_cut_limit(self, evg_server):
+        url, statuses = evg_server
+        statuses.extend([429, 429, 429])
+        evg_api = build_evg_api(url)
+        limiter = AdaptiveConcurrencyLimiter(max_limit=16)
+        under_test.LimiterAdapter.install(evg_api.session, limiter)
+
+        build = limiter.call(evg_api.build_by_id, "build_1")
+
+        assert build.id == "build_1"
+        assert not statuses
+        assert limiter.limit == 8
+
+    def test_requests_that_succeed_first_time_should_not_cut_limit(self, evg_server):
+        url, _ = evg_server
+        evg_api = build_evg_api(url)
+        limiter = AdaptiveConcurrencyLimiter(max_limit=16)
+        under_test.LimiterAdapter.install(evg_api.session, limiter)
+
+        limiter.call(evg_api.build_by_id, "build_1")
+
+        assert limiter.limit == 16
@@ -0,0 +1,91 @@
+"""Unit tests for http_recording.py."""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from requests import Response, Session
+from requests.adapters import BaseAdapter
+
+import goodbase.clients.http_recording as under_test
+
+
+def build_response(status_code: int, body: dict, link: str = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+    response.headers["Content-Type"] = "application/json"
+    response.headers["Date"] = "Sun, 18 Oct 2026 00:00:00 GMT"
+    if link:
+        response.headers["Link"] = link
+    return response
+
+
+@pytest.fixture()
+def server_adapter():
+    adapter = MagicMock(spec_set=BaseAdapter)
+    adapter.send.side_effect = [
+        build_response(200, {"version_id": "v1"}),
+        build_response(200, {"version_id": "v1", "status": "success"}),
+        build_response(404, {"error": "not found"}),
+        build_response(
+            200, [{"_id": "b1"}], link='<https://evg/rest/v2/builds?page=2>; rel="next"'
+        ),
+    ]
+    return adapter
+
+
+def record(tmp_path, server_adapter):
+    session = Session()
+    session.mount("https://", server_adapter)
+    under_test.RecordingAdapter.install(session, tmp_path)
+    return [
+        session.get("https://evg.example.com/rest/v2/versions/v1"),
+        session.get("https://evg.example.com/rest/v2/versions/v1"),
+        session.get("https://evg.example.com/rest/v2/versions/v2"),
+        session.get("https://evg.example.com/rest/v2/builds", params={"limit": 1}),
+    ]
+
+
+class TestRecordAndReplay:
+    def test_recorded_responses_should_be_returned_while_recording(self, tmp_path, server_adapter):
+        responses = record(tmp_path, server_adapter)
+
+        assert [r.status_code for r in responses] == [200, 200, 404, 200]
+        assert server_adapter.send.call_count == 4
+
+    def test_replayed_responses_should_match_recorded_ones(self, tmp_path, server_adapter):
+        recorded = record(tmp_path, server_adapter)
+        session = Session()
+        under_test.ReplayAdapter.install(session, tmp_path)
+
+        replayed = [
+            session.get("http://localhost/rest/v2/versions/v1"),
+            session.get("http://localhost/rest/v2/versions/v1"),
+            session.get("http://localhost/rest/v2/versions/v2"),
+            session.get("http://localhost/rest/v2/builds", params={"limit": 1}),
+        ]
+
+        assert [r.status_code for r in replayed] == [r.status_code for r in recorded]
+        assert [r.json() for r in replayed] == [r.json() for r in recorded]
+        assert replayed[3].links["next"]["url"] == "https://evg/rest/v2/builds?page=2"
+        assert "Date" not in replayed[0].headers
+
+    def test_last_response_should_be_repeated_when_replaying_more_requests(
+        self, tmp_path, server_adapter
+    ):
+        record(tmp_path, server_adapter)
+        session = Session()
+        under_test.ReplayAdapter.install(session, tmp_path)
+
+        responses = [session.get("https://evg/rest/v2/versions/v1").json() for _ in range(3)]
+
+        assert responses[2] == {"version_id": "v1", "status": "success"}
+
+    def test_requests_that_were_not_recorded_should_not_be_found(self, tmp_path):
+        session = Session()
+        under_test.ReplayAdapter.install(session, tmp_path)
+
+        response = session.get("https://evg/rest/v2/versions/v3")
+
+        assert response.status_code == 404
+        assert "error" in response.json()
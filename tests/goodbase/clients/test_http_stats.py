@@ -0,0 +1,64 @@
+"""Unit tests for http_stats.py."""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+
+import goodbase.clients.http_stats as under_test
+from goodbase.search_stats import SearchStats
+
+
+def build_request(url: str) -> PreparedRequest:
+    request = PreparedRequest()
+    request.prepare(method="GET", url=url)
+    return request
+
+
+def build_response(status_code: int, body: dict) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+    return response
+
+
+class TestEndpointName:
+    @pytest.mark.parametrize(
+        "url,expected",
+        [
+            ("https://evg/rest/v2/projects", "projects"),
+            ("https://evg/rest/v2/projects/mongodb-mongo-master/versions?start=20", "versions"),
+            ("https://evg/rest/v2/versions/version_1", "version"),
+            ("https://evg/rest/v2/versions/version_1/builds", "version_builds"),
+            ("https://evg/rest/v2/versions/version_1/annotations", "version_annotations"),
+            ("https://evg/rest/v2/builds/build_1", "build"),
+            ("https://evg/rest/v2/builds/build_1/tasks", "build_tasks"),
+            ("https://evg/rest/v2/tasks/task_1/annotations", "task_annotations"),
+            ("https://evg/api/2/plugin/manifest/get/mongodb-mongo-master/abc123", "manifest"),
+            ("https://evg/rest/v2/users/me", "other"),
+        ],
+    )
+    def test_endpoint_should_be_named_without_ids(self, url, expected):
+        assert under_test.endpoint_name(build_request(url)) == expected
+
+
+class TestStatsAdapter:
+    def test_requests_should_be_recorded(self):
+        server_adapter = MagicMock(spec_set=BaseAdapter)
+        server_adapter.send.side_effect = [
+            build_response(200, {"_id": "build_1"}),
+            build_response(404, {"error": "not found"}),
+        ]
+        session = Session()
+        session.mount("https://", server_adapter)
+        stats = SearchStats()
+        under_test.StatsAdapter.install(session, stats)
+
+        session.get("https://evg/rest/v2/builds/build_1")
+        session.get("https://evg/rest/v2/builds/build_2")
+        report = stats.report()["requests"]
+
+        assert report["count"] == 2
+        assert report["bytes_received"] == len('{"_id": "build_1"}') + len('{"error": "not found"}')
+        assert report["endpoints"]["build"]["errors"] == 1
@@ -0,0 +1,28 @@
+"""Unit tests for http_tracing.py."""
+from unittest.mock import MagicMock
+
+from requests import Response, Session
+from requests.adapters import BaseAdapter
+
+import goodbase.clients.http_tracing as under_test
+from goodbase.tracing import Tracer
+
+
+class TestTracingAdapter:
+    def test_a_span_should_be_recorded_for_each_request(self):
+        server_adapter = MagicMock(spec_set=BaseAdapter)
+        response = Response()
+        response.status_code = 200
+        response._content = b"[]"
+        server_adapter.send.return_value = response
+        session = Session()
+        session.mount("https://", server_adapter)
+        tracer = Tracer(enabled=True)
+        under_test.TracingAdapter.install(session, tracer)
+
+        session.get("https://evg/rest/v2/builds/build_1/tasks")
+
+        [span] = [event for event in tracer._events if event["ph"] == "X"]
+        assert span["name"] == "build_tasks"
+        assert span["cat"] == "http"
+        assert span["args"] == {"method": "GET", "path": "/rest/v2/builds/build_1/tasks"}
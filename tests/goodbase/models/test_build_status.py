@@ -36,3 +36,64 @@ class TestBuildStatus:
         )
 
         assert build_status.active_pct() == 0.7
+
+    def test_percentages_should_use_task_counts_without_task_details(self):
+        build_status = under_test.BuildStatus.from_task_counts(
+            build_name="build name",
+            build_variant="build_name",
+            n_successful_tasks=6,
+            n_inactive_tasks=3,
+            n_tasks=10,
+        )
+
+        assert build_status.success_pct() == 0.6
+        assert build_status.failure_pct() == 0.4
+        assert build_status.active_pct() == 0.7
+
+    def test_tasks_should_be_stored_as_bitsets_of_interned_names(self):
+        build_status = under_test.BuildStatus(
+            build_name="build name",
+            build_variant="build_name",
+            successful_tasks={"task 0", "task 1"},
+            inactive_tasks={"task 2"},
+            all_tasks={"task 0", "task 1", "task 2", "task 3"},
+        )
+
+        assert build_status.successful_mask == under_test.TASK_NAMES.mask(["task 0", "task 1"])
+        assert build_status.successful_tasks == {"task 0", "task 1"}
+        assert build_status.inactive_tasks == {"task 2"}
+        assert build_status.all_tasks == {"task 0", "task 1", "task 2", "task 3"}
+        assert build_status.n_tasks == 4
+        assert not hasattr(build_status, "__dict__")
+
+
+class TestTaskNameTable:
+    def test_each_name_should_get_its_own_bit(self):
+        table = under_test.TaskNameTable()
+
+        assert table.mask(["a", "b", "c"]) == 0b111
+        assert table.mask(["c", "d"]) == 0b1100
+        assert table.mask(["b"]) == 0b10
+        assert table.mask([]) == 0
+
+    def test_masks_should_convert_back_to_names(self):
+        table = under_test.TaskNameTable()
+        mask = table.mask(["a", "b", "c", "d"]) & ~table.mask(["b"])
+
+        assert table.names(mask) == {"a", "c", "d"}
+        assert table.names(0) == set()
+
+    def test_bits_should_only_be_published_once_their_names_can_be_found(self):
+        table = under_test.TaskNameTable()
+        published_before_name = []
+
+        class CheckedBits(dict):
+            def __setitem__(self, name, bit):
+                published_before_name.append(name not in table.names(bit))
+                super().__setitem__(name, bit)
+
+        table._bits = CheckedBits()
+
+        table.mask(["a", "b", "c"])
+
+        assert published_before_name == [False, False, False]
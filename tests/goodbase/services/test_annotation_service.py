@@ -0,0 +1,105 @@
+"""Unit tests for annotation_service.py."""
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from evergreen import EvergreenApi, Task
+from evergreen.task_annotations import TaskAnnotation
+from requests.exceptions import HTTPError
+
+import goodbase.services.annotation_service as under_test
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
+from goodbase.search_stats import SearchStats
+from goodbase.services.build_cache_service import BuildCacheService
+
+
+def build_mock_task(task_id: str, version_id: str = "version_id") -> Task:
+    return MagicMock(spec_set=Task, task_id=task_id, version_id=version_id)
+
+
+def build_mock_response(annotations):
+    mock_response = MagicMock(text="[]")
+    mock_response.json.return_value = annotations
+    return mock_response
+
+
+@pytest.fixture()
+def evergreen_api():
+    mock_evg_api = MagicMock(spec_set=EvergreenApi)
+    mock_evg_api._call_api.return_value = build_mock_response(
+        [
+            {"task_id": "task_0", "issues": [{"issue_key": "BF-1234"}]},
+            {"task_id": "task_1", "issues": None, "note": {"message": "a note"}},
+        ]
+    )
+    return mock_evg_api
+
+
+@pytest.fixture()
+def build_cache():
+    mock_build_cache = MagicMock(spec=BuildCacheService, annotation_ttl_secs=60)
+    mock_build_cache.get_known_failures.return_value = None
+    return mock_build_cache
+
+
+@pytest.fixture()
+def annotation_service(evergreen_api, build_cache):
+    return under_test.AnnotationService(
+        evergreen_api, build_cache, AdaptiveConcurrencyLimiter(max_limit=8), SearchStats()
+    )
+
+
+class TestIsKnownFailure:
+    @pytest.mark.parametrize(
+        "task_id,expected", [("task_0", True), ("task_1", False), ("task_2", False)]
+    )
+    def test_task_should_be_checked_for_issues(self, annotation_service, task_id, expected):
+        assert annotation_service.is_known_failure(build_mock_task(task_id)) == expected
+
+    def test_annotations_should_be_fetched_once_per_version(
+        self, annotation_service, evergreen_api
+    ):
+        tasks = [build_mock_task(f"task_{i}") for i in range(20)]
+
+        with ThreadPoolExecutor(max_workers=8) as exe:
+            results = list(exe.map(annotation_service.is_known_failure, tasks))
+
+        assert results == [True] + [False] * 19
+        evergreen_api._call_api.assert_called_once()
+        evergreen_api.get_task_annotation.assert_not_called()
+
+    def test_cached_known_failures_should_not_be_fetched(
+        self, annotation_service, evergreen_api, build_cache
+    ):
+        build_cache.get_known_failures.return_value = {"task_5"}
+
+        assert annotation_service.is_known_failure(build_mock_task("task_5"))
+        evergreen_api._call_api.assert_not_called()
+
+    def test_fetched_known_failures_should_be_cached(self, annotation_service, build_cache):
+        annotation_service.is_known_failure(build_mock_task("task_0"))
+
+        build_cache.put_known_failures.assert_called_once_with("version_id", {"task_0"})
+
+    def test_expired_known_failures_should_be_fetched_again(
+        self, annotation_service, evergreen_api, build_cache
+    ):
+        build_cache.annotation_ttl_secs = -1
+
+        annotation_service.is_known_failure(build_mock_task("task_0"))
+        annotation_service.is_known_failure(build_mock_task("task_0"))
+
+        assert evergreen_api._call_api.call_count == 2
+
+    def test_tasks_should_be_looked_up_individually_if_version_fetch_fails(
+        self, annotation_service, evergreen_api, build_cache
+    ):
+        evergreen_api._call_api.side_effect = HTTPError(response=MagicMock(status_code=404))
+        annotation = MagicMock(spec_set=TaskAnnotation, issues=[MagicMock()])
+        evergreen_api.get_task_annotation.return_value = [annotation]
+
+        assert annotation_service.is_known_failure(build_mock_task("task_0"))
+        assert annotation_service.is_known_failure(build_mock_task("task_1"))
+        evergreen_api._call_api.assert_called_once()
+        assert evergreen_api.get_task_annotation.call_count == 2
+        build_cache.put_known_failures.assert_not_called()
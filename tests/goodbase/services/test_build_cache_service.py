@@ -0,0 +1,158 @@
+"""Unit tests for build_cache_service.py."""
+import pytest
+
+import goodbase.services.build_cache_service as under_test
+from goodbase.models.build_status import BuildStatus
+
+
+def build_status(name: str = "my build") -> BuildStatus:
+    return BuildStatus(
+        build_name=name,
+        build_variant="my_build",
+        successful_tasks={"task_0", "task_1"},
+        inactive_tasks={"task_2"},
+        all_tasks={"task_0", "task_1", "task_2"},
+    )
+
+
+@pytest.fixture()
+def cache_service(tmp_path):
+    return under_test.BuildCacheService(tmp_path / "cache.db")
+
+
+class TestBuildCacheService:
+    def test_missing_build_should_return_none(self, cache_service):
+        assert cache_service.get("build_id", False) is None
+
+    def test_finished_build_should_be_returned(self, cache_service):
+        status = build_status()
+
+        cache_service.put("build_id", False, status, finished=True)
+
+        assert cache_service.get("build_id", False) == status
+
+    def test_cache_should_persist_between_instances(self, tmp_path):
+        status = build_status()
+        under_test.BuildCacheService(tmp_path / "cache.db").put("build_id", False, status, True)
+
+        assert under_test.BuildCacheService(tmp_path / "cache.db").get("build_id", False) == status
+
+    def test_known_failure_mode_should_be_cached_separately(self, cache_service):
+        cache_service.put("build_id", False, build_status(), finished=True)
+
+        assert cache_service.get("build_id", True) is None
+
+    def test_expired_in_progress_build_should_not_be_returned(self, tmp_path):
+        cache_service = under_test.BuildCacheService(tmp_path / "cache.db", in_progress_ttl_secs=-1)
+
+        cache_service.put("build_id", False, build_status(), finished=False)
+
+        assert cache_service.get("build_id", False) is None
+
+    def test_fresh_in_progress_build_should_be_returned(self, cache_service):
+        status = build_status()
+
+        cache_service.put("build_id", False, status, finished=False)
+
+        assert cache_service.get("build_id", False) == status
+
+    def test_least_recently_used_build_should_be_evicted(self, tmp_path):
+        cache_service = under_test.BuildCacheService(
+            tmp_path / "cache.db", max_entries=2, access_refresh_secs=0
+        )
+
+        cache_service.put("build_0", False, build_status("build 0"), finished=True)
+        cache_service.put("build_1", False, build_status("build 1"), finished=True)
+        cache_service.get("build_0", False)
+        cache_service.put("build_2", False, build_status("build 2"), finished=True)
+
+        assert cache_service.get("build_0", False) is not None
+        assert cache_service.get("build_1", False) is None
+        assert cache_service.get("build_2", False) is not None
+
+    def test_recently_accessed_build_should_not_be_updated(self, tmp_path):
+        cache_service = under_test.BuildCacheService(tmp_path / "cache.db", max_entries=2)
+        cache_service.put("build_0", False, build_status("build 0"), finished=True)
+        cache_service.put("build_1", False, build_status("build 1"), finished=True)
+        # Accessing build 0 again so soon should not record it as more recently used.
+        cache_service.get("build_0", False)
+        cache_service.put("build_2", False, build_status("build 2"), finished=True)
+
+        assert cache_service.get("build_0", False) is None
+        assert cache_service.get("build_1", False) is not None
+
+    def test_builds_should_be_evicted_in_batches_once_over_limit(self, tmp_path):
+        cache_service = under_test.BuildCacheService(tmp_path / "cache.db", max_entries=10)
+
+        for i in range(11):
+            cache_service.put(f"build_{i}", False, build_status(), finished=True)
+
+        evicted = [i for i in range(11) if cache_service.get(f"build_{i}", False) is None]
+        assert evicted == [0, 1]
+
+    def test_replaced_builds_should_not_cause_eviction(self, tmp_path):
+        cache_service = under_test.BuildCacheService(tmp_path / "cache.db", max_entries=2)
+
+        cache_service.put("build_0", False, build_status(), finished=True)
+        for _ in range(5):
+            cache_service.put("build_1", False, build_status(), finished=True)
+
+        assert cache_service.get("build_0", False) is not None
+        assert cache_service.get("build_1", False) is not None
+
+    def test_disabled_cache_should_not_store_anything(self):
+        cache_service = under_test.BuildCacheService(None)
+
+        cache_service.put("build_id", False, build_status(), finished=True)
+
+        assert cache_service.get("build_id", False) is None
+
+    def test_build_without_task_details_should_be_returned(self, cache_service):
+        status = BuildStatus.from_task_counts(
+            build_name="my build",
+            build_variant="my_build",
+            n_successful_tasks=6,
+            n_inactive_tasks=3,
+            n_tasks=10,
+        )
+
+        cache_service.put("build_id", False, status, finished=True)
+
+        assert cache_service.get("build_id", False) == status
+
+
+class TestKnownFailures:
+    def test_missing_version_should_return_none(self, cache_service):
+        assert cache_service.get_known_failures("version_id") is None
+
+    def test_known_failures_should_be_returned(self, cache_service):
+        cache_service.put_known_failures("version_id", {"task_0", "task_1"})
+
+        assert cache_service.get_known_failures("version_id") == {"task_0", "task_1"}
+
+    def test_expired_known_failures_should_not_be_returned(self, tmp_path):
+        cache_service = under_test.BuildCacheService(tmp_path / "cache.db", annotation_ttl_secs=-1)
+
+        cache_service.put_known_failures("version_id", {"task_0"})
+
+        assert cache_service.get_known_failures("version_id") is None
+
+
+class TestModuleLocations:
+    def test_missing_module_locations_should_return_none(self, cache_service):
+        assert cache_service.get_module_locations("project", "hash") is None
+
+    def test_module_locations_should_be_returned_for_same_config_hash(self, cache_service):
+        cache_service.put_module_locations("project", "hash", {"enterprise": "src/enterprise"})
+
+        assert cache_service.get_module_locations("project", "hash") == {
+            "enterprise": "src/enterprise"
+        }
+        assert cache_service.get_module_locations("project", "other hash") is None
+
+    def test_disabled_cache_should_not_store_module_locations(self):
+        cache_service = under_test.BuildCacheService(None)
+
+        cache_service.put_module_locations("project", "hash", {"enterprise": "src/enterprise"})
+
+        assert cache_service.get_module_locations("project", "hash") is None
@@ -1,18 +1,36 @@
 """Unit tests for evg_service.py."""
+import asyncio
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from threading import Barrier, Event
+from typing import Any, Callable, Dict, List, Optional
 from unittest.mock import MagicMock
 
 import pytest
 import yaml
 from evergreen import Build, EvergreenApi, Manifest, Project, Task, Version
+from evergreen.build import StatusCounts
 from evergreen.manifest import ManifestModule
-from evergreen.task_annotations import IssueLink, TaskAnnotation
 from requests.exceptions import HTTPError
 
 import goodbase.services.evg_service as under_test
 from goodbase.build_checker import BuildChecks
+from goodbase.clients.async_evg_client import AsyncEvergreenClient
 from goodbase.clients.evg_cli_proxy import EvgCliProxy
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
+from goodbase.models.build_status import BuildStatus
+from goodbase.search_stats import SearchStats
+from goodbase.services.annotation_service import AnnotationService
+from goodbase.services.build_cache_service import BuildCacheService
+from goodbase.tracing import Tracer
+from goodbase.worker_pool import WorkerPool
+
+THRESHOLD_CHECKS = BuildChecks(
+    build_variant_regex=[".*"], display_name_regex=[], success_threshold=0.5
+)
+TASK_CHECKS = BuildChecks(
+    build_variant_regex=[".*"], display_name_regex=[], successful_tasks={"task_0"}
+)
 
 
 class TaskStatus(int, Enum):
@@ -25,16 +43,36 @@ def build_mock_task(name: str, status: TaskStatus) -> Task:
     mock_task = MagicMock(spec_set=Task, display_name=name)
     if status == TaskStatus.SUCCESS or status == TaskStatus.FAILED:
         mock_task.is_undispatched.return_value = False
+        mock_task.is_completed.return_value = True
         mock_task.is_success.return_value = status == TaskStatus.SUCCESS
     else:
         mock_task.is_undispatched.return_value = True
+        mock_task.is_completed.return_value = False
         mock_task.is_success.return_value = False
     return mock_task
 
 
+def build_status_counts(**counts: int) -> Dict[str, int]:
+    status_counts = dict.fromkeys(
+        ["succeeded", "failed", "started", "undispatched", "inactive", "dispatched", "timed_out"], 0
+    )
+    status_counts.update(counts)
+    return status_counts
+
+
 def build_mock_build(build_variant: str, display_name: str, task_list: List[Task]) -> Build:
     mock_build = MagicMock(spec_set=Build, build_variant=build_variant, display_name=display_name)
     mock_build.get_tasks.return_value = task_list
+    n_succeeded = len([task for task in task_list if task.is_success()])
+    n_undispatched = len([task for task in task_list if task.is_undispatched()])
+    mock_build.status_counts = StatusCounts(
+        build_status_counts(
+            succeeded=n_succeeded,
+            failed=len(task_list) - n_succeeded - n_undispatched,
+            undispatched=n_undispatched,
+        ),
+        MagicMock(),
+    )
     return mock_build
 
 
@@ -43,7 +81,12 @@ def build_mock_version(builds: Dict[str, Build]) -> Version:
     mock_version.build_variants_status = [
         {"build_variant": build.build_variant, "build_id": _id} for _id, build in builds.items()
     ]
+    mock_version.build_variants_map = {build.build_variant: _id for _id, build in builds.items()}
     mock_version.get_builds.return_value = builds.values()
+    builds_by_variant = {build.build_variant: build for build in builds.values()}
+    mock_version.build_by_variant.side_effect = lambda build_variant: builds_by_variant[
+        build_variant
+    ]
     return mock_version
 
 
@@ -86,18 +129,47 @@ def evergreen_api():
     mock_evg_api.all_projects = lambda project_filter_fn: [
         p for p in project_list if project_filter_fn(p)
     ]
-
-    mocked_annotation = MagicMock(spec_set=IssueLink, issue_key="BF-1234")
-    mocked_annotations = MagicMock(spec_set=TaskAnnotation)
-    mocked_annotations.issues = [mocked_annotation]
-    mocked_annotations.suspected_issues = {}
-    mock_evg_api.get_task_annotation = MagicMock(return_value=[mocked_annotations])
     return mock_evg_api
 
 
 @pytest.fixture()
-def evg_service(evergreen_api, evg_cli_proxy):
-    evg_service = under_test.EvergreenService(evergreen_api, evg_cli_proxy)
+def build_cache():
+    mock_build_cache = MagicMock(spec_set=BuildCacheService)
+    mock_build_cache.get.return_value = None
+    return mock_build_cache
+
+
+@pytest.fixture()
+def annotation_service():
+    mock_annotation_service = MagicMock(spec_set=AnnotationService)
+    mock_annotation_service.is_known_failure.return_value = True
+    return mock_annotation_service
+
+
+@pytest.fixture()
+def worker_pool():
+    return WorkerPool(max_workers=16)
+
+
+@pytest.fixture()
+def limiter():
+    return AdaptiveConcurrencyLimiter(max_limit=16, initial_limit=16)
+
+
+@pytest.fixture()
+def evg_service(
+    evergreen_api, evg_cli_proxy, build_cache, annotation_service, worker_pool, limiter
+):
+    evg_service = under_test.EvergreenService(
+        evergreen_api,
+        evg_cli_proxy,
+        build_cache,
+        annotation_service,
+        worker_pool,
+        limiter,
+        SearchStats(),
+        Tracer(),
+    )
     return evg_service
 
 
@@ -127,6 +199,7 @@ class TestAnalyzeBuild:
         assert build_status.successful_tasks == {task.display_name for task in mock_task_list}
         assert build_status.inactive_tasks == set()
         assert build_status.all_tasks == {task.display_name for task in mock_task_list}
+        assert evg_service.stats.report()["counters"] == {"tasks_downloaded": n_tasks}
 
     def test_build_with_no_tasks_run(self, evg_service):
         n_tasks = 10
@@ -184,6 +257,331 @@ class TestAnalyzeBuild:
         assert build_status.inactive_tasks == {"task_2", "task_5", "task_8"}
         assert build_status.all_tasks == {task.display_name for task in mock_task_list}
 
+    def test_cached_build_should_not_query_tasks(self, evg_service, build_cache):
+        cached_status = BuildStatus(
+            build_name="my build",
+            build_variant="my_build",
+            successful_tasks={"task_0"},
+            inactive_tasks=set(),
+            all_tasks={"task_0"},
+        )
+        build_cache.get.return_value = cached_status
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=[]
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False)
+
+        assert build_status == cached_status
+        mock_build.get_tasks.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "completed,allow_known_failures,finished",
+        [
+            (True, False, True),
+            (False, False, False),
+            (True, True, False),
+        ],
+    )
+    def test_analyzed_build_should_be_cached(
+        self, evg_service, build_cache, completed, allow_known_failures, finished
+    ):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.SUCCESS) for i in range(3)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        mock_build.is_completed.return_value = completed
+
+        build_status = evg_service.analyze_build(mock_build, allow_known_failures)
+
+        build_cache.put.assert_called_once_with(
+            mock_build.id, allow_known_failures, build_status, finished
+        )
+
+    def test_build_without_task_details_should_use_status_counts(self, evg_service):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus(i % 3)) for i in range(9)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False, [THRESHOLD_CHECKS])
+
+        assert not build_status.has_task_details
+        assert build_status.n_successful_tasks == 3
+        assert build_status.n_inactive_tasks == 3
+        assert build_status.n_tasks == 9
+        mock_build.get_tasks.assert_not_called()
+
+    def test_status_counts_should_count_each_task_once(self, evg_service):
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=[]
+        )
+        # Evergreen reports 12 tasks: timed out tasks are also failed and dispatched tasks are
+        # also started.
+        mock_build.status_counts = StatusCounts(
+            build_status_counts(
+                succeeded=5,
+                failed=3,
+                started=2,
+                undispatched=1,
+                inactive=1,
+                dispatched=1,
+                timed_out=2,
+            ),
+            MagicMock(),
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False, [THRESHOLD_CHECKS])
+
+        assert build_status.n_tasks == 12
+        assert build_status.n_successful_tasks == 5
+        assert build_status.n_inactive_tasks == 2
+        mock_build.get_tasks.assert_not_called()
+
+    def test_known_failures_should_always_query_tasks(self, evg_service):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.FAILED) for i in range(3)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+
+        build_status = evg_service.analyze_build(mock_build, True, [THRESHOLD_CHECKS])
+
+        assert build_status.has_task_details
+        mock_build.get_tasks.assert_called_once()
+
+    def test_cached_build_without_task_details_should_not_be_used_when_needed(
+        self, evg_service, build_cache
+    ):
+        build_cache.get.return_value = under_test.BuildStatus.from_task_counts(
+            build_name="my build",
+            build_variant="my_build",
+            n_successful_tasks=1,
+            n_inactive_tasks=0,
+            n_tasks=1,
+        )
+        mock_task_list = [build_mock_task("task_0", TaskStatus.SUCCESS)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False, [TASK_CHECKS])
+
+        assert build_status.has_task_details
+        mock_build.get_tasks.assert_called_once()
+
+
+def set_task_ids(
+    mock_build: Build, task_list: List[Task], listed_tasks: List[Task]
+) -> Callable[[str], Task]:
+    mock_build.id = "my_project_my_build_abc123_24_01_01_00_00_00"
+    mock_build.git_hash = "abc123"
+    mock_build.tasks = [
+        f"my_project_my_build_{task.display_name}_abc123_24_01_01_00_00_00" for task in listed_tasks
+    ]
+    tasks_by_id = dict(zip(mock_build.tasks, task_list))
+    return tasks_by_id.__getitem__
+
+
+class TestAnalyzeBuildNamedTasks:
+    def test_only_tasks_named_by_checks_should_be_queried(self, evg_service, build_cache):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.SUCCESS) for i in range(10)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        evg_service.evg_api.task_by_id.side_effect = set_task_ids(
+            mock_build, mock_task_list, mock_task_list
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False, [TASK_CHECKS])
+
+        assert build_status.successful_tasks == {"task_0"}
+        assert TASK_CHECKS.check(build_status)
+        evg_service.evg_api.task_by_id.assert_called_once_with(
+            "my_project_my_build_task_0_abc123_24_01_01_00_00_00"
+        )
+        mock_build.get_tasks.assert_not_called()
+        build_cache.put.assert_not_called()
+
+    def test_all_tasks_should_be_queried_if_a_named_task_is_not_listed(self, evg_service):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.SUCCESS) for i in range(10)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        set_task_ids(mock_build, mock_task_list[1:], mock_task_list[1:])
+
+        build_status = evg_service.analyze_build(mock_build, False, [TASK_CHECKS])
+
+        assert build_status.n_tasks == 10
+        evg_service.evg_api.task_by_id.assert_not_called()
+        mock_build.get_tasks.assert_called_once()
+
+    def test_named_display_tasks_should_be_queried_by_their_display_id(self, evg_service):
+        display_task = build_mock_task("my_display", TaskStatus.FAILED)
+        mock_task_list = [build_mock_task("task_0", TaskStatus.SUCCESS), display_task]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        set_task_ids(mock_build, mock_task_list, mock_task_list[:1])
+        display_task_id = "my_project_my_build_display_my_display_abc123_24_01_01_00_00_00"
+        mock_build.tasks.append(display_task_id)
+        evg_service.evg_api.task_by_id.side_effect = {display_task_id: display_task}.__getitem__
+        build_checks = BuildChecks(
+            build_variant_regex=[".*"], display_name_regex=[], successful_tasks={"my_display"}
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False, [build_checks])
+
+        assert build_status.all_tasks == {"my_display"}
+        assert not build_checks.check(build_status)
+        evg_service.evg_api.task_by_id.assert_called_once_with(display_task_id)
+        mock_build.get_tasks.assert_not_called()
+
+    def test_named_tasks_should_be_queried_concurrently(self, evg_service):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.SUCCESS) for i in range(10)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        tasks_by_id = set_task_ids(mock_build, mock_task_list, mock_task_list)
+        barrier = Barrier(3, timeout=10)
+
+        def task_by_id(task_id):
+            barrier.wait()
+            return tasks_by_id(task_id)
+
+        evg_service.evg_api.task_by_id.side_effect = task_by_id
+        build_checks = BuildChecks(
+            build_variant_regex=[".*"],
+            display_name_regex=[],
+            successful_tasks={"task_0", "task_1", "task_2"},
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False, [build_checks])
+
+        assert build_status.successful_tasks == {"task_0", "task_1", "task_2"}
+        mock_build.get_tasks.assert_not_called()
+
+    def test_all_tasks_should_be_queried_if_thresholds_apply(self, evg_service):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.SUCCESS) for i in range(10)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        set_task_ids(mock_build, mock_task_list, mock_task_list)
+
+        build_status = evg_service.analyze_build(mock_build, False, [TASK_CHECKS, THRESHOLD_CHECKS])
+
+        assert build_status.n_tasks == 10
+        evg_service.evg_api.task_by_id.assert_not_called()
+        mock_build.get_tasks.assert_called_once()
+
+    def test_all_tasks_should_be_queried_if_a_queried_task_has_another_name(self, evg_service):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.SUCCESS) for i in range(10)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        evg_service.evg_api.task_by_id.side_effect = set_task_ids(
+            mock_build, list(reversed(mock_task_list)), mock_task_list
+        )
+
+        build_status = evg_service.analyze_build(mock_build, False, [TASK_CHECKS])
+
+        assert build_status.n_tasks == 10
+        mock_build.get_tasks.assert_called_once()
+
+    def test_only_tasks_named_by_checks_should_be_queried_async(self, evg_service):
+        mock_task_list = [build_mock_task(f"task_{i}", TaskStatus.FAILED) for i in range(10)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+        evg_service.evg_api.task_by_id.side_effect = set_task_ids(
+            mock_build, mock_task_list, mock_task_list
+        )
+
+        build_status = analyze_build_async(evg_service, mock_build, False, [TASK_CHECKS])
+
+        assert build_status.all_tasks == {"task_0"}
+        assert not TASK_CHECKS.check(build_status)
+        mock_build.get_tasks.assert_not_called()
+
+
+def analyze_build_async(evg_service, build, allow_known_failures, build_checks):
+    async def analyze():
+        evg_client = AsyncEvergreenClient(evg_service.evg_api, WorkerPool(4))
+        return await evg_service.analyze_build_async(
+            build, evg_client, allow_known_failures, build_checks
+        )
+
+    return asyncio.run(analyze())
+
+
+class TestKnownFailureLookups:
+    @pytest.mark.parametrize(
+        "build_checks,statuses,n_lookups",
+        [
+            # Threshold met without known failures.
+            (
+                BuildChecks(
+                    build_variant_regex=[".*"], display_name_regex=[], success_threshold=0.5
+                ),
+                [TaskStatus.SUCCESS] * 9 + [TaskStatus.FAILED],
+                0,
+            ),
+            # Threshold cannot be met even with known failures.
+            (
+                BuildChecks(
+                    build_variant_regex=[".*"], display_name_regex=[], success_threshold=0.95
+                ),
+                [TaskStatus.SUCCESS] + [TaskStatus.FAILED] * 5 + [TaskStatus.INACTIVE] * 4,
+                0,
+            ),
+            # Threshold can only be met with known failures.
+            (
+                BuildChecks(
+                    build_variant_regex=[".*"], display_name_regex=[], success_threshold=0.95
+                ),
+                [TaskStatus.SUCCESS] * 5 + [TaskStatus.FAILED] * 5,
+                5,
+            ),
+            # Only named failed tasks need to be checked.
+            (
+                BuildChecks(
+                    build_variant_regex=[".*"],
+                    display_name_regex=[],
+                    successful_tasks={"task_1", "task_2"},
+                ),
+                [TaskStatus.SUCCESS, TaskStatus.FAILED, TaskStatus.SUCCESS, TaskStatus.FAILED],
+                1,
+            ),
+        ],
+    )
+    @pytest.mark.parametrize("use_async", [False, True])
+    def test_only_lookups_that_can_change_the_outcome_should_be_made(
+        self, evg_service, build_checks, statuses, n_lookups, use_async
+    ):
+        mock_task_list = [build_mock_task(f"task_{i}", status) for i, status in enumerate(statuses)]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+
+        if use_async:
+            analyze_build_async(evg_service, mock_build, True, [build_checks])
+        else:
+            evg_service.analyze_build(mock_build, True, [build_checks])
+
+        assert evg_service.annotation_service.is_known_failure.call_count == n_lookups
+
+    def test_build_with_skipped_lookups_should_not_be_cached(self, evg_service, build_cache):
+        mock_task_list = [build_mock_task("task_0", TaskStatus.SUCCESS)] + [
+            build_mock_task(f"task_{i}", TaskStatus.FAILED) for i in range(1, 3)
+        ]
+        mock_build = build_mock_build(
+            build_variant="my_build", display_name="my build", task_list=mock_task_list
+        )
+
+        build_status = evg_service.analyze_build(mock_build, True, [TASK_CHECKS])
+
+        assert build_status.successful_tasks == {"task_0"}
+        build_cache.put.assert_not_called()
+
 
 class TestGetBuildStatusesForVersion:
     def test_all_builds_meet_predicate(self, evg_service):
@@ -241,6 +639,107 @@ class TestGetBuildStatusesForVersion:
 
         assert len(build_status_list) == 11
 
+    def test_builds_should_be_filtered_from_version_by_build_variant(self, evg_service):
+        n_builds = 20
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.SUCCESS) for j in range(10)],
+            )
+            for i in range(n_builds)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = [BuildChecks(build_variant_regex=["^build_1$"], display_name_regex=[])]
+
+        build_status_list = evg_service.get_build_statuses_for_version(mock_version, build_checks)
+
+        assert len(build_status_list) == 1
+        mock_version.get_builds.assert_not_called()
+        mock_version.build_by_variant.assert_called_once_with("build_1")
+
+    def test_cached_builds_filtered_by_build_variant_should_not_be_queried(
+        self, evg_service, build_cache
+    ):
+        build_cache.get.return_value = under_test.BuildStatus.from_task_counts(
+            build_name="build 1",
+            build_variant="build_1",
+            n_successful_tasks=10,
+            n_inactive_tasks=0,
+            n_tasks=10,
+        )
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.SUCCESS) for j in range(10)],
+            )
+            for i in range(5)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = [BuildChecks(build_variant_regex=["^build_1$"], display_name_regex=[])]
+
+        build_status_list = evg_service.get_build_statuses_for_version(mock_version, build_checks)
+
+        assert len(build_status_list) == 1
+        mock_version.get_builds.assert_not_called()
+        mock_version.build_by_variant.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "build_checks",
+        [
+            [BuildChecks(build_variant_regex=[], display_name_regex=["^build 1$"])],
+            [BuildChecks(build_variant_regex=[".*"], display_name_regex=[])],
+        ],
+    )
+    def test_builds_should_be_queried_if_variants_cannot_be_filtered(
+        self, evg_service, build_checks
+    ):
+        n_builds = 20
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.SUCCESS) for j in range(10)],
+            )
+            for i in range(n_builds)
+        }
+        mock_version = build_mock_version(mock_build_map)
+
+        evg_service.get_build_statuses_for_version(mock_version, build_checks)
+
+        mock_version.get_builds.assert_called_once()
+        mock_version.build_by_variant.assert_not_called()
+
+    def test_builds_should_be_queried_for_display_names_of_each_version(self, evg_service):
+        def build_mock_project_version(display_names, failing):
+            mock_build_map = {
+                f"id_{variant}": build_mock_build(
+                    build_variant=variant,
+                    display_name=display_name,
+                    task_list=[
+                        build_mock_task(
+                            "task_0",
+                            TaskStatus.FAILED if variant in failing else TaskStatus.SUCCESS,
+                        )
+                    ],
+                )
+                for variant, display_name in display_names.items()
+            }
+            mock_version = build_mock_version(mock_build_map)
+            mock_version.project = "my-project"
+            return mock_version
+
+        build_checks = [
+            BuildChecks(build_variant_regex=[], display_name_regex=["^! .*"], success_threshold=1)
+        ]
+        newest_version = build_mock_project_version({"r": "! r", "a": "a"}, failing={"a"})
+        older_version = build_mock_project_version({"r": "! r", "a": "! a"}, failing={"a"})
+
+        assert evg_service.check_version(newest_version, build_checks)
+        assert not evg_service.check_version(older_version, build_checks)
+        older_version.get_builds.assert_called_once()
+
     @pytest.mark.parametrize(
         "builds",
         [
@@ -261,6 +760,54 @@ class TestGetBuildStatusesForVersion:
 
 
 class TestCheckVersion:
+    def test_cancelled_check_should_not_fetch_builds(self, evg_service):
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.SUCCESS) for j in range(10)],
+            )
+            for i in range(20)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = BuildChecks(build_variant_regex=[".*"], display_name_regex=[])
+        cancelled = Event()
+        cancelled.set()
+
+        result = evg_service.check_version(mock_version, [build_checks], False, cancelled)
+
+        assert not result
+        mock_version.get_builds.assert_not_called()
+
+    def test_builds_waiting_in_pool_should_be_skipped_once_cancelled(self, evg_service):
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.SUCCESS) for j in range(10)],
+            )
+            for i in range(20)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = BuildChecks(build_variant_regex=[".*"], display_name_regex=[])
+        cancelled = Event()
+        analyze_build = evg_service.analyze_build
+        analyzed = []
+
+        def analyze_then_cancel(build, *args):
+            analyzed.append(build)
+            cancelled.set()
+            return analyze_build(build, *args)
+
+        evg_service.worker_pool = WorkerPool(max_workers=1)
+        evg_service.analyze_build = analyze_then_cancel
+
+        result = evg_service.check_version(mock_version, [build_checks], False, cancelled)
+        evg_service.worker_pool.executor.shutdown(wait=True)
+
+        assert not result
+        assert len(analyzed) == 1
+
     def test_no_build_meet_checks(self, evg_service):
         n_builds = 20
         mock_build_map = {
@@ -386,6 +933,209 @@ class TestCheckVersion:
 
         assert result
 
+    def test_remaining_builds_should_be_skipped_after_a_failing_build(self, evg_service):
+        evg_service.worker_pool = WorkerPool(max_workers=1)
+        n_builds = 20
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.FAILED) for j in range(10)],
+            )
+            for i in range(n_builds)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = BuildChecks(
+            build_variant_regex=[".*"], display_name_regex=[], successful_tasks={"task_0"}
+        )
+
+        result = evg_service.check_version(mock_version, [build_checks], False)
+
+        assert not result
+        n_analyzed = sum(build.get_tasks.call_count for build in mock_build_map.values())
+        assert n_analyzed < n_builds
+
+    @pytest.mark.parametrize(
+        "build_checks,tasks_queried",
+        [
+            (
+                BuildChecks(build_variant_regex=[".*"], display_name_regex=[], run_threshold=0.9),
+                False,
+            ),
+            (
+                BuildChecks(
+                    build_variant_regex=[".*"],
+                    display_name_regex=[],
+                    run_threshold=0.9,
+                    active_tasks={"task_1"},
+                ),
+                True,
+            ),
+        ],
+    )
+    def test_tasks_should_only_be_queried_when_criteria_need_them(
+        self, evg_service, build_checks, tasks_queried
+    ):
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.SUCCESS) for j in range(10)],
+            )
+            for i in range(5)
+        }
+        mock_version = build_mock_version(mock_build_map)
+
+        result = evg_service.check_version(mock_version, [build_checks], False)
+
+        assert result
+        assert mock_build_map["id_0"].get_tasks.called == tasks_queried
+
+
+def check_version_async(
+    evg_service, evg_version, build_checks, allow_known_failures, max_in_flight=16
+):
+    async def run_check():
+        evg_client = AsyncEvergreenClient(
+            evg_service.evg_api, WorkerPool(max_in_flight), evg_service.limiter
+        )
+        return await evg_service.check_version_async(
+            evg_version, build_checks, evg_client, allow_known_failures
+        )
+
+    return asyncio.run(run_check())
+
+
+class TestCheckVersionForGroups:
+    @staticmethod
+    def build_version():
+        mock_build_map = {
+            "id_passing": build_mock_build(
+                build_variant="passing",
+                display_name="passing build",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.SUCCESS) for j in range(10)],
+            ),
+            "id_failing": build_mock_build(
+                build_variant="failing",
+                display_name="failing build",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.FAILED) for j in range(10)],
+            ),
+        }
+        return build_mock_version(mock_build_map)
+
+    def test_each_group_should_only_see_the_builds_it_applies_to(self, evg_service):
+        criteria_groups = {
+            "passing": [
+                BuildChecks(
+                    build_variant_regex=["^passing$"], display_name_regex=[], success_threshold=0.9
+                )
+            ],
+            "all": [
+                BuildChecks(build_variant_regex=[".*"], display_name_regex=[], run_threshold=0.9)
+            ],
+            "all-green": [
+                BuildChecks(
+                    build_variant_regex=[".*"], display_name_regex=[], success_threshold=0.9
+                )
+            ],
+        }
+
+        result = evg_service.check_version_for_groups(self.build_version(), criteria_groups)
+
+        assert result == {"passing", "all"}
+
+    def test_builds_should_be_fetched_once_for_all_groups(self, evg_service):
+        mock_version = self.build_version()
+        criteria_groups = {
+            name: [
+                BuildChecks(build_variant_regex=[".*"], display_name_regex=[], run_threshold=0.9)
+            ]
+            for name in ["first", "second"]
+        }
+
+        evg_service.check_version_for_groups(mock_version, criteria_groups)
+
+        assert mock_version.build_by_variant.call_count == 2
+
+    def test_version_without_builds_should_not_match_any_group(self, evg_service):
+        mock_version = build_mock_version({})
+        criteria_groups = {"all": [BuildChecks(build_variant_regex=[".*"], display_name_regex=[])]}
+
+        assert evg_service.check_version_for_groups(mock_version, criteria_groups) == set()
+
+
+class TestCheckVersionAsync:
+    @pytest.mark.parametrize(
+        "status,allow_known_failures,expected",
+        [
+            (TaskStatus.SUCCESS, False, True),
+            (TaskStatus.FAILED, False, False),
+            (TaskStatus.FAILED, True, True),
+            (TaskStatus.INACTIVE, False, False),
+        ],
+    )
+    def test_version_should_be_checked(self, evg_service, status, allow_known_failures, expected):
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", status) for j in range(10)],
+            )
+            for i in range(5)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = BuildChecks(
+            build_variant_regex=[".*"], display_name_regex=[], success_threshold=0.9
+        )
+
+        result = check_version_async(
+            evg_service, mock_version, [build_checks], allow_known_failures
+        )
+
+        assert result == expected
+
+    def test_builds_that_are_filtered_out_should_not_be_analyzed(self, evg_service):
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus(i % 3)) for j in range(10)],
+            )
+            for i in range(20)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = BuildChecks(
+            build_variant_regex=["^build_0$"], display_name_regex=[], run_threshold=0.9
+        )
+
+        result = check_version_async(evg_service, mock_version, [build_checks], False)
+
+        assert result
+        mock_build_map["id_1"].get_tasks.assert_not_called()
+
+    def test_remaining_builds_should_be_skipped_after_a_failing_build(self, evg_service):
+        n_builds = 20
+        mock_build_map = {
+            f"id_{i}": build_mock_build(
+                build_variant=f"build_{i}",
+                display_name=f"build {i}",
+                task_list=[build_mock_task(f"task_{j}", TaskStatus.FAILED) for j in range(10)],
+            )
+            for i in range(n_builds)
+        }
+        mock_version = build_mock_version(mock_build_map)
+        build_checks = BuildChecks(
+            build_variant_regex=[".*"], display_name_regex=[], successful_tasks={"task_0"}
+        )
+
+        result = check_version_async(
+            evg_service, mock_version, [build_checks], False, max_in_flight=1
+        )
+
+        assert not result
+        n_analyzed = sum(build.get_tasks.call_count for build in mock_build_map.values())
+        assert n_analyzed < n_builds
+
 
 class TestGetModulesRevisions:
     def test_empty_modules_returned(self, evg_service):
@@ -450,3 +1200,69 @@ class TestGetModuleLocations:
         project_locations = evg_service.get_module_locations("project 2")
 
         assert project_locations == {}
+
+    def test_module_locations_should_be_cached_by_config_hash(
+        self, evg_service, evg_cli_proxy, build_cache, tmp_path, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "remote" / "path").mkdir(parents=True)
+        (tmp_path / "remote" / "path" / "2").write_text("modules: []\n")
+        build_cache.get_module_locations.return_value = None
+
+        project_locations = evg_service.get_module_locations("project 2")
+
+        config_hash = under_test.hash_project_config(Path("remote/path/2"))
+        build_cache.get_module_locations.assert_called_once_with("project 2", config_hash)
+        build_cache.put_module_locations.assert_called_once_with(
+            "project 2", config_hash, project_locations
+        )
+
+    def test_cached_module_locations_should_not_evaluate_config(
+        self, evg_service, evg_cli_proxy, build_cache, tmp_path, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "remote" / "path").mkdir(parents=True)
+        (tmp_path / "remote" / "path" / "2").write_text("modules: []\n")
+        build_cache.get_module_locations.return_value = {"module": "path/to/module"}
+
+        project_locations = evg_service.get_module_locations("project 2")
+
+        assert project_locations == {"module": "path/to/module"}
+        evg_cli_proxy.evaluate.assert_not_called()
+
+    def test_unreadable_config_should_not_be_cached(self, evg_service, build_cache):
+        evg_service.get_module_locations("project 2")
+
+        build_cache.get_module_locations.assert_not_called()
+        build_cache.put_module_locations.assert_not_called()
+
+    def test_module_locations_should_be_extracted_without_evaluating_config(
+        self, evg_service, evg_cli_proxy, build_cache, tmp_path, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "remote" / "path").mkdir(parents=True)
+        (tmp_path / "remote" / "path" / "2").write_text(
+            "modules:\n- name: enterprise\n  prefix: src/mongo/db/modules\n"
+        )
+        build_cache.get_module_locations.return_value = None
+
+        project_locations = evg_service.get_module_locations("project 2")
+
+        assert project_locations == {"enterprise": "src/mongo/db/modules"}
+        evg_cli_proxy.evaluate.assert_not_called()
+
+    def test_config_should_be_evaluated_if_modules_cannot_be_extracted(
+        self, evg_service, evg_cli_proxy, build_cache, tmp_path, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "remote" / "path").mkdir(parents=True)
+        (tmp_path / "remote" / "path" / "2").write_text(
+            "prefixes:\n  enterprise: &prefix src/mongo/db/modules\n"
+            "modules:\n- name: enterprise\n  prefix: *prefix\n"
+        )
+        build_cache.get_module_locations.return_value = None
+
+        project_locations = evg_service.get_module_locations("project 2")
+
+        assert project_locations == {f"module {i}": f"path/to/{i}" for i in range(4)}
+        evg_cli_proxy.evaluate.assert_called_once_with(Path("remote/path/2"))
@@ -3,8 +3,10 @@ from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
+from plumbum import ProcessExecutionError
 
 import goodbase.services.git_service as under_test
+from goodbase.tracing import Tracer
 
 
 @pytest.fixture()
@@ -14,9 +16,15 @@ def mock_git():
     return git_mock
 
 
+def set_cat_file_output(mock_git, output):
+    mock_git.__getitem__.return_value.with_cwd.return_value.__lshift__.return_value.return_value = (
+        output
+    )
+
+
 @pytest.fixture()
 def evg_service(mock_git):
-    git_service = under_test.GitService()
+    git_service = under_test.GitService(Tracer())
     git_service.git = mock_git
     return git_service
 
@@ -31,8 +39,7 @@ class TestPerformAction:
         revision = "revision123"
         evg_service.perform_action(under_test.GitAction.CHECKOUT, revision)
 
-        mock_git.assert_git_call(("fetch", "origin"))
-        mock_git.assert_git_call(["checkout", revision])
+        mock_git.__getitem__.assert_called_once_with(["checkout", revision])
 
     def test_checkout_action_with_branch_should_call_git_checkout_with_branch(
         self, evg_service, mock_git
@@ -40,22 +47,71 @@ class TestPerformAction:
         revision = "revision123"
         evg_service.perform_action(under_test.GitAction.CHECKOUT, revision, branch_name="my-branch")
 
-        mock_git.assert_git_call(("fetch", "origin"))
-        mock_git.assert_git_call(["checkout", "-b", "my-branch", revision])
+        mock_git.__getitem__.assert_called_once_with(["checkout", "-b", "my-branch", revision])
 
     def test_rebase_action_should_call_git_rebase(self, evg_service, mock_git):
         revision = "revision123"
         evg_service.perform_action(under_test.GitAction.REBASE, revision)
 
-        mock_git.assert_git_call(("fetch", "origin"))
-        mock_git.assert_git_call(("rebase", revision))
+        mock_git.__getitem__.assert_called_once_with(("rebase", revision))
 
     def test_merge_action_should_call_git_merge(self, evg_service, mock_git):
         revision = "revision123"
         evg_service.perform_action(under_test.GitAction.MERGE, revision)
 
+        mock_git.__getitem__.assert_called_once_with(("merge", revision))
+
+
+class TestFetchMissing:
+    def test_missing_revisions_should_be_fetched(self, evg_service, mock_git):
+        revision = "revision123"
+        set_cat_file_output(mock_git, f"{revision}^{{commit}} missing\n")
+
+        evg_service.fetch_missing([revision])
+
+        mock_git.assert_git_call(("cat-file", "--batch-check"))
+        mock_git.assert_git_call(("fetch", "origin", revision))
+
+    def test_fetch_should_be_skipped_if_revision_is_available_locally(self, evg_service, mock_git):
+        revision = "revision123"
+        set_cat_file_output(mock_git, f"{revision} commit 250\n")
+
+        evg_service.fetch_missing([revision])
+
+        mock_git.__getitem__.assert_called_once_with(("cat-file", "--batch-check"))
+
+    def test_everything_should_be_fetched_if_revision_cannot_be_fetched(
+        self, evg_service, mock_git
+    ):
+        revision = "revision123"
+        set_cat_file_output(mock_git, f"{revision}^{{commit}} missing\n")
+        mock_git.__getitem__.return_value.with_cwd.return_value.side_effect = [
+            ProcessExecutionError(["git", "fetch"], 128, "", "not our ref"),
+            "",
+        ]
+
+        evg_service.fetch_missing([revision])
+
+        mock_git.assert_git_call(("fetch", "origin", revision))
         mock_git.assert_git_call(("fetch", "origin"))
-        mock_git.assert_git_call(("merge", revision))
+
+
+class TestMissingRevisions:
+    def test_revisions_that_are_not_commits_should_be_missing(self, evg_service, mock_git):
+        set_cat_file_output(
+            mock_git, "abc123 commit 250\ndef456^{commit} missing\nghi789 tree 100\n"
+        )
+
+        missing = evg_service.missing_revisions(["abc123", "def456", "ghi789"])
+
+        assert missing == ["def456", "ghi789"]
+        mock_git.__getitem__.return_value.with_cwd.return_value.__lshift__.assert_called_once_with(
+            "abc123^{commit}\ndef456^{commit}\nghi789^{commit}\n"
+        )
+
+    def test_no_revisions_should_not_run_git(self, evg_service, mock_git):
+        assert evg_service.missing_revisions([]) == []
+        mock_git.__getitem__.assert_not_called()
 
 
 class TestDetermineDirectory:
@@ -1,5 +1,7 @@
 """Unit tests for search_service.py."""
-from unittest.mock import MagicMock
+from threading import Event, Lock
+from time import sleep
+from unittest.mock import ANY, AsyncMock, MagicMock
 
 import pytest
 from click._termui_impl import ProgressBar
@@ -7,9 +9,13 @@ from evergreen import EvergreenApi, Version
 
 import goodbase.services.search_service as under_test
 from goodbase.build_checker import BuildChecks
+from goodbase.concurrency_limiter import AdaptiveConcurrencyLimiter
 from goodbase.goodbase_options import OutputFormat
+from goodbase.search_stats import SearchStats
 from goodbase.services.evg_service import EvergreenService
 from goodbase.services.git_service import GitAction
+from goodbase.tracing import Tracer
+from goodbase.worker_pool import WorkerPool
 
 
 @pytest.fixture()
@@ -34,6 +40,8 @@ def options():
         timeout_secs=None,
         branch_name=None,
         output_format=OutputFormat.PLAINTEXT,
+        search_window=1,
+        async_fetch=False,
     )
     mock_options.lookback_limit_hit.return_value = False
     return mock_options
@@ -41,7 +49,15 @@ def options():
 
 @pytest.fixture()
 def search_service(evg_api, evg_service, options):
-    service = under_test.SearchService(evg_api, evg_service, options)
+    service = under_test.SearchService(
+        evg_api,
+        evg_service,
+        options,
+        WorkerPool(max_workers=4),
+        AdaptiveConcurrencyLimiter(max_limit=4),
+        SearchStats(),
+        Tracer(),
+    )
     return service
 
 
@@ -100,3 +116,216 @@ class TestFindStableRevision:
 
         assert revision is None
         evg_service.check_version.assert_any_call(version_list[0], checks, False)
+
+
+class TestFindStableRevisionPipelined:
+    def test_the_newest_good_revision_should_be_returned(
+        self, search_service, evg_service, options
+    ):
+        options.search_window = 4
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        checks = [MagicMock(spec=BuildChecks)]
+        good_revisions = {"abc_3", "abc_4", "abc_9"}
+        evg_service.check_version.side_effect = (
+            lambda version, _checks, _allow, _cancelled: version.revision in good_revisions
+        )
+
+        revision = search_service._find_stable_revision(version_list, checks)
+
+        assert version_list[3].revision == revision
+        evg_service.check_version.assert_any_call(version_list[0], checks, False, ANY)
+
+    def test_no_good_revision_should_be_return_none(self, search_service, evg_service, options):
+        options.search_window = 4
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        checks = [MagicMock(spec=BuildChecks)]
+        evg_service.check_version.return_value = False
+
+        revision = search_service._find_stable_revision(version_list, checks, False)
+
+        assert revision is None
+        assert evg_service.check_version.call_count == len(version_list)
+
+    def test_versions_past_the_limit_should_not_be_checked(
+        self, search_service, evg_service, options
+    ):
+        options.search_window = 4
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        checks = [MagicMock(spec=BuildChecks)]
+        evg_service.check_version.return_value = False
+        options.lookback_limit_hit.side_effect = lambda idx, _rev, _elapsed: idx >= 5
+
+        revision = search_service._find_stable_revision(version_list, checks)
+
+        assert revision is None
+        assert evg_service.check_version.call_count == 5
+
+    def test_older_versions_should_not_be_checked_past_the_window(
+        self, search_service, evg_service, options
+    ):
+        options.search_window = 2
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        checks = [MagicMock(spec=BuildChecks)]
+        evg_service.check_version.return_value = True
+
+        revision = search_service._find_stable_revision(version_list, checks)
+
+        assert version_list[0].revision == revision
+        assert evg_service.check_version.call_count <= 2
+
+    def test_running_checks_should_stop_making_requests_once_a_revision_is_found(
+        self, search_service, evg_service, options
+    ):
+        options.search_window = 8
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        checks = [MagicMock(spec=BuildChecks)]
+        lock = Lock()
+        requests_after_hit = []
+        search_done = Event()
+
+        def check_version(version, _checks, _allow, cancelled):
+            if version.revision in {"abc_0", "abc_1"}:
+                sleep(0.02)
+                return version.revision == "abc_1"
+            for _ in range(50):
+                if cancelled.is_set():
+                    break
+                if search_done.is_set():
+                    with lock:
+                        requests_after_hit.append(version.revision)
+                sleep(0.01)
+            return False
+
+        evg_service.check_version.side_effect = check_version
+
+        revision = search_service._find_stable_revision(version_list, checks)
+        search_done.set()
+        sleep(0.1)
+
+        assert revision == "abc_1"
+        assert len(requests_after_hit) <= 8
+
+
+class TestFindStableRevisions:
+    @pytest.mark.parametrize("search_window", [1, 4])
+    def test_the_newest_good_revision_of_each_group_should_be_returned(
+        self, search_service, evg_service, options, search_window
+    ):
+        options.search_window = search_window
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        criteria_groups = {
+            "required": [MagicMock(spec=BuildChecks)],
+            "all-green": [MagicMock(spec=BuildChecks)],
+        }
+        good_revisions = {"required": {"abc_1", "abc_2", "abc_7"}, "all-green": {"abc_7"}}
+        evg_service.check_version_for_groups.side_effect = (
+            lambda version, groups, _allow, _cancelled: {
+                name for name in groups if version.revision in good_revisions[name]
+            }
+        )
+
+        revisions = search_service._find_stable_revisions(version_list, criteria_groups)
+
+        assert revisions == {"required": ["abc_1"], "all-green": ["abc_7"]}
+
+    def test_groups_should_not_be_checked_once_they_have_a_revision(
+        self, search_service, evg_service
+    ):
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        criteria_groups = {
+            "required": [MagicMock(spec=BuildChecks)],
+            "all-green": [MagicMock(spec=BuildChecks)],
+        }
+        evg_service.check_version_for_groups.side_effect = [{"required"}, set(), {"all-green"}]
+
+        revisions = search_service._find_stable_revisions(version_list, criteria_groups)
+
+        assert revisions == {"required": ["abc_0"], "all-green": ["abc_2"]}
+        assert evg_service.check_version_for_groups.call_count == 3
+        assert list(evg_service.check_version_for_groups.call_args_list[1].args[1]) == ["all-green"]
+
+    def test_groups_without_a_match_before_the_limit_should_have_no_revision(
+        self, search_service, evg_service, options
+    ):
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        criteria_groups = {"required": [MagicMock(spec=BuildChecks)]}
+        evg_service.check_version_for_groups.return_value = set()
+        options.lookback_limit_hit.side_effect = lambda idx, _rev, _elapsed: idx >= 5
+
+        revisions = search_service._find_stable_revisions(version_list, criteria_groups)
+
+        assert revisions == {"required": []}
+        assert evg_service.check_version_for_groups.call_count == 5
+
+    @pytest.mark.parametrize("search_window", [1, 4])
+    def test_the_newest_good_revisions_up_to_max_results_should_be_returned(
+        self, search_service, evg_service, options, search_window
+    ):
+        options.search_window = search_window
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        criteria_groups = {
+            "required": [MagicMock(spec=BuildChecks)],
+            "all-green": [MagicMock(spec=BuildChecks)],
+        }
+        good_revisions = {"required": {"abc_1", "abc_2", "abc_7", "abc_9"}, "all-green": {"abc_7"}}
+        evg_service.check_version_for_groups.side_effect = (
+            lambda version, groups, _allow, _cancelled: {
+                name for name in groups if version.revision in good_revisions[name]
+            }
+        )
+        options.lookback_limit_hit.side_effect = lambda idx, _rev, _elapsed: idx >= 12
+
+        revisions = search_service._find_stable_revisions(
+            version_list, criteria_groups, max_results=2
+        )
+
+        assert revisions == {"required": ["abc_1", "abc_2"], "all-green": ["abc_7"]}
+
+
+class TestFindStableRevisionAsync:
+    @pytest.mark.parametrize("window", [1, 4])
+    def test_the_newest_good_revision_should_be_returned(
+        self, search_service, evg_service, options, window
+    ):
+        options.async_fetch = True
+        options.search_window = window
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        checks = [MagicMock(spec=BuildChecks)]
+        good_revisions = {"abc_3", "abc_4", "abc_9"}
+        evg_service.check_version_async = AsyncMock(
+            side_effect=lambda version, _checks, _client, _allow: version.revision in good_revisions
+        )
+
+        revision = search_service._find_stable_revision(version_list, checks)
+
+        assert version_list[3].revision == revision
+        evg_service.check_version.assert_not_called()
+
+    def test_no_good_revision_before_limit_should_be_return_none(
+        self, search_service, evg_service, options
+    ):
+        options.async_fetch = True
+        options.search_window = 4
+        version_list = [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(20)]
+        checks = [MagicMock(spec=BuildChecks)]
+        evg_service.check_version_async = AsyncMock(return_value=False)
+        options.lookback_limit_hit.side_effect = lambda idx, _rev, _elapsed: idx >= 5
+
+        revision = search_service._find_stable_revision(version_list, checks)
+
+        assert revision is None
+        assert evg_service.check_version_async.call_count == 5
+
+
+class TestNewestRevision:
+    def test_revision_of_the_newest_version_should_be_returned(self, search_service, evg_api):
+        evg_api.versions_by_project.return_value = iter(
+            [MagicMock(spec=Version, revision=f"abc_{i}") for i in range(3)]
+        )
+
+        assert search_service.newest_revision("project", None) == "abc_0"
+
+    def test_project_without_versions_should_have_no_revision(self, search_service, evg_api):
+        evg_api.versions_by_project.return_value = iter([])
+
+        assert search_service.newest_revision("project", None) is None
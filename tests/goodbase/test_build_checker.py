@@ -1,4 +1,6 @@
 """Unit tests for build_checker.py."""
+from unittest.mock import MagicMock
+
 import pytest
 
 import goodbase.build_checker as under_test
@@ -53,6 +55,168 @@ class TestShouldApply:
         assert not checker.should_apply(build_variant="not-match", display_name="not match")
 
 
+class TestPatternSet:
+    @pytest.mark.parametrize(
+        "patterns,name,expected",
+        [
+            ((".*-required$", "^linux"), "linux-64", True),
+            ((".*-required$", "^linux"), "windows-required", True),
+            ((".*-required$", "^linux"), "windows", False),
+            (("a|b", "^c$"), "b", True),
+            (("^(re)quired-\\1$",), "required-re", True),
+            (("(?i)^LINUX", "^mac"), "linux", True),
+            (("(?i)^LINUX", "^mac"), "MAC", False),
+            ((), "anything", False),
+        ],
+    )
+    def test_names_should_match_if_any_pattern_matches(self, patterns, name, expected):
+        pattern_set = under_test.PatternSet(patterns)
+
+        assert pattern_set.matches(name) == expected
+
+    def test_the_same_patterns_should_only_be_compiled_once(self):
+        patterns = ("^compile-once$", "^compile-twice$")
+
+        assert under_test.compile_patterns(patterns) is under_test.compile_patterns(patterns)
+
+
+class TestCriteriaPlan:
+    def test_checks_should_be_found_once_per_build(self):
+        build_checks = [
+            under_test.BuildChecks(build_variant_regex=["^linux"], display_name_regex=[]),
+            under_test.BuildChecks(build_variant_regex=[], display_name_regex=["^! "]),
+        ]
+        plan = under_test.CriteriaPlan(build_checks)
+
+        assert plan.checks_for("linux-64", "Linux") == [build_checks[0]]
+        assert plan.checks_for("windows", "! Windows") == [build_checks[1]]
+        assert plan.checks_for("mac", "Mac") == []
+
+    def test_checks_should_be_reused_for_builds_already_seen(self):
+        build_check = MagicMock(spec=under_test.BuildChecks)
+        plan = under_test.CriteriaPlan([build_check])
+
+        for _ in range(3):
+            assert plan.checks_for("linux-64", "Linux") == [build_check]
+
+        build_check.should_apply.assert_called_once_with("linux-64", "Linux")
+
+    def test_checks_for_build_variant_should_be_found_without_display_names(self):
+        build_checks = [
+            under_test.BuildChecks(build_variant_regex=["^linux"], display_name_regex=[]),
+            under_test.BuildChecks(build_variant_regex=["^windows"], display_name_regex=[]),
+        ]
+        plan = under_test.CriteriaPlan(build_checks)
+
+        assert plan.checks_for_build_variant("linux-64") == [build_checks[0]]
+        assert plan.checks_for_build_variant("mac") == []
+
+    def test_checks_for_build_variant_should_be_unknown_if_they_depend_on_display_names(self):
+        build_checks = [
+            under_test.BuildChecks(build_variant_regex=["^linux"], display_name_regex=[]),
+            under_test.BuildChecks(build_variant_regex=[], display_name_regex=["^! "]),
+        ]
+        plan = under_test.CriteriaPlan(build_checks)
+
+        assert plan.checks_for_build_variant("linux-64") is None
+
+    @pytest.mark.parametrize(
+        "extra_checks,expected",
+        [
+            ({"active_tasks": {"task_2"}}, {"task_0", "task_1", "task_2"}),
+            ({"run_threshold": 0.9}, None),
+        ],
+    )
+    def test_task_names_should_only_be_known_without_thresholds(self, extra_checks, expected):
+        build_checks = [
+            under_test.BuildChecks(
+                build_variant_regex=[".*"],
+                display_name_regex=[],
+                successful_tasks={"task_0", "task_1"},
+            ),
+            under_test.BuildChecks(
+                build_variant_regex=[".*"], display_name_regex=[], **extra_checks
+            ),
+        ]
+        plan = under_test.CriteriaPlan(build_checks)
+
+        assert plan.task_names() == expected
+
+
+class TestShouldApplyToBuildVariant:
+    @pytest.mark.parametrize(
+        "build_variant_regex,display_name_regex,expected",
+        [
+            (["^match$"], [], True),
+            (["^match$"], ["^! .*"], True),
+            (["^other$"], [], False),
+            ([], [], False),
+            (["^other$"], ["^! .*"], None),
+        ],
+    )
+    def test_display_name_is_only_needed_if_build_variant_does_not_match(
+        self, build_variant_regex, display_name_regex, expected
+    ):
+        checker = under_test.BuildChecks(
+            build_variant_regex=build_variant_regex, display_name_regex=display_name_regex
+        )
+
+        assert checker.should_apply_to_build_variant("match") == expected
+
+
+class TestRequiresTaskDetails:
+    @pytest.mark.parametrize(
+        "successful_tasks,active_tasks,expected",
+        [
+            (None, None, False),
+            (set(), set(), False),
+            ({"task"}, None, True),
+            (None, {"task"}, True),
+        ],
+    )
+    def test_task_details_are_only_required_for_task_checks(
+        self, successful_tasks, active_tasks, expected
+    ):
+        checker = under_test.BuildChecks(
+            build_variant_regex=[".*"],
+            display_name_regex=[],
+            success_threshold=0.9,
+            run_threshold=0.9,
+            successful_tasks=successful_tasks,
+            active_tasks=active_tasks,
+        )
+
+        assert checker.requires_task_details() == expected
+
+
+class TestThresholdsDependOnSuccessfulCount:
+    @pytest.mark.parametrize(
+        "success_threshold,failure_threshold,min_successful,max_successful,expected",
+        [
+            (0.5, None, 6, 10, False),
+            (0.9, None, 1, 5, False),
+            (0.9, None, 5, 10, True),
+            (None, 0.5, 0, 3, False),
+            (None, 0.5, 3, 8, True),
+            (None, None, 0, 10, False),
+        ],
+    )
+    def test_thresholds_depend_on_successful_count(
+        self, success_threshold, failure_threshold, min_successful, max_successful, expected
+    ):
+        checker = under_test.BuildChecks(
+            build_variant_regex=[".*"],
+            display_name_regex=[],
+            success_threshold=success_threshold,
+            failure_threshold=failure_threshold,
+        )
+
+        assert (
+            checker.thresholds_depend_on_successful_count(min_successful, max_successful, 10)
+            == expected
+        )
+
+
 class TestSuccessThreshold:
     def test_success_threshold_is_met(self):
         build_status = BuildStatus(
@@ -0,0 +1,117 @@
+"""Unit tests for concurrency_limiter.py."""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import sleep
+from unittest.mock import MagicMock
+
+import pytest
+from requests.exceptions import HTTPError, ReadTimeout
+
+import goodbase.concurrency_limiter as under_test
+
+
+def http_error(status_code: int) -> HTTPError:
+    return HTTPError(response=MagicMock(status_code=status_code))
+
+
+def fail_with(err: Exception):
+    def request():
+        raise err
+
+    return request
+
+
+class TestAdaptiveConcurrencyLimiter:
+    def test_limit_should_grow_as_requests_succeed(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=2)
+
+        for _ in range(10):
+            limiter.call(int)
+
+        assert limiter.limit > 2
+
+    def test_limit_should_not_grow_past_max(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=3, initial_limit=2)
+
+        for _ in range(50):
+            limiter.call(int)
+
+        assert limiter.limit == 3
+
+    @pytest.mark.parametrize("status_code,backs_off", [(429, True), (503, True), (404, False)])
+    def test_limit_should_be_cut_when_requests_are_throttled(self, status_code, backs_off):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=8)
+
+        with pytest.raises(HTTPError):
+            limiter.call(fail_with(http_error(status_code)))
+
+        assert (limiter.limit < 8) == backs_off
+
+    def test_limit_should_only_be_cut_once_per_round(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=8)
+
+        with ThreadPoolExecutor(max_workers=8) as exe:
+            jobs = [
+                exe.submit(limiter.call, lambda: sleep(0.05) or fail_with(http_error(429))())
+                for _ in range(8)
+            ]
+            for job in jobs:
+                with pytest.raises(HTTPError):
+                    job.result()
+
+        assert limiter.limit == 4
+
+    def test_limit_should_start_at_max(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=16)
+
+        assert limiter.limit == 16
+
+    def test_limit_should_be_cut_when_requests_time_out(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=8)
+
+        with pytest.raises(ReadTimeout):
+            limiter.call(fail_with(ReadTimeout()))
+
+        assert limiter.limit == 4
+
+    def test_limit_should_be_cut_when_overload_is_reported_during_a_request(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=16)
+
+        limiter.call(limiter.report_overload, "HTTP 429 retried")
+        limiter.call(int)
+
+        assert limiter.limit == 8
+
+    def test_limit_should_not_collapse_with_steady_but_varied_latencies(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=8)
+        limits = []
+
+        def get_tasks(delay):
+            sleep(delay)
+            limits.append(limiter.limit)
+
+        with ThreadPoolExecutor(max_workers=8) as exe:
+            delays = [0.001, 0.03, 0.002, 0.05, 0.001, 0.02, 0.004, 0.04] * 8
+            list(exe.map(lambda delay: limiter.call(get_tasks, delay), delays))
+
+        assert min(limits) == 8
+        assert limiter.limit == 8
+
+    def test_requests_in_flight_should_not_exceed_limit(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(max_limit=2, initial_limit=2)
+        lock = Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def request(i):
+            with lock:
+                in_flight.append(i)
+                max_in_flight.append(len(in_flight))
+            sleep(0.01)
+            with lock:
+                in_flight.remove(i)
+
+        with ThreadPoolExecutor(max_workers=8) as exe:
+            list(exe.map(lambda i: limiter.call(request, i), range(16)))
+
+        assert max(max_in_flight) <= 2
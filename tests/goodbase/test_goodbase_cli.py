@@ -1,8 +1,18 @@
 """Unit tests for goodbase_cli.py."""
+from threading import Barrier, Event, Timer
+from unittest.mock import MagicMock
+
+import inject
 import pytest
+from click.testing import CliRunner
+from plumbum import ProcessExecutionError
 
 import goodbase.goodbase_cli as under_test
-from goodbase.services.git_service import GitAction
+from goodbase.search_stats import SearchStats
+from goodbase.services.evg_service import EvergreenService
+from goodbase.services.git_service import GitAction, GitService
+from goodbase.services.search_service import SearchService
+from goodbase.worker_pool import WorkerPool
 
 
 class TestLookbackLimitHit:
@@ -49,3 +59,286 @@ class TestLookbackLimitHit:
         )
 
         assert options.lookback_limit_hit(index, revision, seconds)
+
+
+@pytest.fixture()
+def orchestrator(tmp_path):
+    options = under_test.GoodBaseOptions(
+        max_lookback=50,
+        commit_limit=None,
+        operation=GitAction.CHECKOUT,
+        override_criteria=False,
+        timeout_secs=None,
+        branch_name=None,
+    )
+    (tmp_path / "enterprise").mkdir()
+    evg_service = MagicMock(spec_set=EvergreenService)
+    evg_service.get_module_locations.return_value = {
+        "enterprise": str(tmp_path),
+        "missing": str(tmp_path),
+    }
+    evg_service.get_modules_revisions.return_value = {"enterprise": "def456", "missing": "ghi789"}
+    return under_test.GoodBaseOrchestrator(
+        evg_service,
+        MagicMock(spec_set=GitService),
+        MagicMock(),
+        MagicMock(spec_set=SearchService),
+        options,
+        MagicMock(),
+        WorkerPool(4),
+        SearchStats(),
+    )
+
+
+class TestCheckoutGoodBase:
+    def test_newest_revisions_should_be_fetched_while_searching(self, orchestrator, tmp_path):
+        fetched = Event()
+        orchestrator.search_service.newest_revision.return_value = "abc999"
+        orchestrator.git_service.fetch_missing.side_effect = lambda revisions, directory=None: (
+            fetched.set() if revisions == ["abc999"] else None
+        )
+        orchestrator.search_service.find_revision.side_effect = lambda *_: (
+            "abc123" if fetched.wait(timeout=10) else None
+        )
+
+        revision_info = orchestrator.checkout_good_base("project", [])
+
+        assert revision_info.revision == "abc123"
+        assert revision_info.errors == {}
+        orchestrator.git_service.fetch_missing.assert_any_call(["abc999"], None)
+        orchestrator.git_service.fetch_missing.assert_any_call(["def456"], tmp_path / "enterprise")
+        orchestrator.git_service.fetch_missing.assert_any_call(["abc123"], None)
+        assert orchestrator.git_service.perform_action.call_count == 2
+
+    def test_each_revision_should_be_checked_once_before_its_operation(
+        self, orchestrator, tmp_path
+    ):
+        orchestrator.search_service.newest_revision.return_value = "abc123"
+        orchestrator.search_service.find_revision.return_value = "abc123"
+
+        orchestrator.checkout_good_base("project", [])
+
+        # Once by the background fetch of the newest revision and once before the operation.
+        assert orchestrator.git_service.fetch_missing.call_count == 4
+        orchestrator.git_service.missing_revisions.assert_not_called()
+
+    def test_git_operations_should_not_overlap_the_background_fetch(self, orchestrator):
+        fetching = Event()
+        release_fetch = Event()
+        fetch_done = Event()
+        orchestrator.search_service.newest_revision.return_value = "abc999"
+
+        def fetch_missing(revisions, directory=None):
+            if revisions == ["abc999"]:
+                fetching.set()
+                release_fetch.wait(timeout=10)
+                fetch_done.set()
+
+        def find_revision(*_):
+            fetching.wait(timeout=10)
+            Timer(0.05, release_fetch.set).start()
+            return "abc123"
+
+        operations_during_fetch = []
+        orchestrator.git_service.fetch_missing.side_effect = fetch_missing
+        orchestrator.search_service.find_revision.side_effect = find_revision
+        orchestrator.git_service.perform_action.side_effect = (
+            lambda *_: operations_during_fetch.append(not fetch_done.is_set())
+        )
+
+        orchestrator.checkout_good_base("project", [])
+
+        assert operations_during_fetch == [False, False]
+
+    def test_module_operations_should_not_overlap_their_background_fetch(self, orchestrator):
+        fetching = Event()
+        release_fetch = Event()
+        fetch_done = Event()
+        orchestrator.search_service.newest_revision.return_value = "abc999"
+        orchestrator.evg_service.get_modules_revisions.side_effect = lambda _project, revision: {
+            "enterprise": f"module_{revision}"
+        }
+
+        def fetch_missing(revisions, directory=None):
+            if revisions == ["module_abc999"]:
+                fetching.set()
+                release_fetch.wait(timeout=10)
+                fetch_done.set()
+
+        def find_revision(*_):
+            fetching.wait(timeout=10)
+            Timer(0.05, release_fetch.set).start()
+            return "abc123"
+
+        module_operations_during_fetch = []
+        orchestrator.git_service.fetch_missing.side_effect = fetch_missing
+        orchestrator.search_service.find_revision.side_effect = find_revision
+        orchestrator.git_service.perform_action.side_effect = lambda _op, revision, *_: (
+            module_operations_during_fetch.append(not fetch_done.is_set())
+            if revision == "module_abc123"
+            else None
+        )
+
+        orchestrator.checkout_good_base("project", [])
+
+        assert module_operations_during_fetch == [False]
+
+    def test_module_locations_should_be_looked_up_while_searching(self, orchestrator):
+        searching = Event()
+        looked_up = Event()
+        lookups_during_search = []
+        orchestrator.search_service.newest_revision.return_value = "abc999"
+        module_locations = orchestrator.evg_service.get_module_locations.return_value
+
+        def get_module_locations(_project):
+            lookups_during_search.append(searching.wait(timeout=1))
+            looked_up.set()
+            return module_locations
+
+        def find_revision(*_):
+            searching.set()
+            looked_up.wait(timeout=10)
+            return "abc123"
+
+        orchestrator.evg_service.get_module_locations.side_effect = get_module_locations
+        orchestrator.search_service.find_revision.side_effect = find_revision
+
+        revision_info = orchestrator.checkout_good_base("project", [])
+
+        assert revision_info.errors == {}
+        assert lookups_during_search == [True]
+
+    def test_fetches_should_be_skipped_when_no_revision_is_found(self, orchestrator):
+        orchestrator.worker_pool = WorkerPool(1)
+        search_done = Event()
+        orchestrator.search_service.newest_revision.return_value = "abc999"
+        orchestrator.evg_service.get_modules_revisions.side_effect = lambda *_: (
+            search_done.wait(timeout=10) and {"enterprise": "def999"}
+        )
+
+        def find_revision(*_):
+            Timer(0.05, search_done.set).start()
+            return None
+
+        orchestrator.search_service.find_revision.side_effect = find_revision
+
+        revision_info = orchestrator.checkout_good_base("project", [])
+        orchestrator.worker_pool.executor.shutdown(wait=True)
+
+        assert revision_info is None
+        orchestrator.git_service.fetch_missing.assert_not_called()
+
+    def test_module_locations_should_be_looked_up_once(self, orchestrator):
+        orchestrator.search_service.newest_revision.return_value = "abc999"
+        orchestrator.search_service.find_revision.return_value = "abc123"
+
+        orchestrator.checkout_good_base("project", [])
+
+        orchestrator.evg_service.get_module_locations.assert_called_once_with("project")
+
+    def test_fetch_errors_should_be_reported(self, orchestrator, tmp_path):
+        orchestrator.git_service.fetch_missing.side_effect = ProcessExecutionError(
+            ["git"], 1, "", ""
+        )
+        orchestrator.search_service.find_revision.return_value = "abc123"
+
+        revision_info = orchestrator.checkout_good_base("project", [])
+
+        assert set(revision_info.errors) == {"BASE", "enterprise"}
+        orchestrator.git_service.perform_action.assert_not_called()
+
+    def test_nothing_should_be_fetched_without_a_git_operation(self, orchestrator):
+        orchestrator.options = orchestrator.options._replace(operation=GitAction.NONE)
+        orchestrator.search_service.find_revision.return_value = "abc123"
+
+        orchestrator.checkout_good_base("project", [])
+
+        orchestrator.search_service.newest_revision.assert_not_called()
+        orchestrator.git_service.fetch_missing.assert_not_called()
+        orchestrator.git_service.perform_action.assert_not_called()
+
+
+class TestCheckoutModules:
+    def test_modules_should_be_checked_out_concurrently(self, orchestrator, tmp_path):
+        modules = ["enterprise", "extra", "other"]
+        barrier = Barrier(len(modules), timeout=10)
+        orchestrator.git_service.perform_action.side_effect = lambda *_: barrier.wait()
+
+        errors = orchestrator.checkout_modules(
+            {module: f"rev_{module}" for module in modules},
+            {module: tmp_path / module for module in modules},
+        )
+
+        assert errors == {}
+        assert orchestrator.git_service.perform_action.call_count == len(modules)
+
+    def test_errors_should_be_collected_per_module(self, orchestrator, tmp_path):
+        modules = ["enterprise", "extra", "other"]
+
+        def perform_action(_operation, revision, *_):
+            if revision != "rev_extra":
+                raise ProcessExecutionError(["git"], 1, "", "")
+
+        orchestrator.git_service.perform_action.side_effect = perform_action
+
+        errors = orchestrator.checkout_modules(
+            {module: f"rev_{module}" for module in modules},
+            {module: tmp_path / module for module in modules},
+        )
+
+        assert list(errors) == ["enterprise", "other"]
+        assert "rev_other" in errors["other"]
+
+    def test_modules_not_checked_out_locally_should_be_skipped(self, orchestrator, tmp_path):
+        errors = orchestrator.checkout_modules(
+            {"enterprise": "def456", "missing": "ghi789"},
+            {"enterprise": tmp_path / "enterprise"},
+        )
+
+        assert errors == {}
+        orchestrator.git_service.perform_action.assert_called_once_with(
+            GitAction.CHECKOUT, "def456", tmp_path / "enterprise", None
+        )
+
+    def test_module_operations_should_wait_for_their_own_fetch(self, orchestrator, tmp_path):
+        release_fetch = Event()
+        fetch_done = Event()
+
+        def fetch():
+            release_fetch.wait(timeout=10)
+            fetch_done.set()
+
+        fetch_job = orchestrator.worker_pool.submit(fetch)
+        operations_during_fetch = []
+        orchestrator.git_service.perform_action.side_effect = (
+            lambda *_: operations_during_fetch.append(not fetch_done.is_set())
+        )
+        Timer(0.05, release_fetch.set).start()
+
+        orchestrator.checkout_modules(
+            {"enterprise": "def456"},
+            {"enterprise": tmp_path / "enterprise"},
+            {"enterprise": fetch_job},
+        )
+
+        assert operations_during_fetch == [False]
+
+
+class TestMain:
+    @pytest.mark.parametrize(
+        "search_args", [["--max-results", "2"], ["--use-criteria", "a", "--use-criteria", "b"]]
+    )
+    def test_async_fetch_should_be_rejected_when_searching_for_several_revisions(
+        self, tmp_path, search_args
+    ):
+        evg_config = tmp_path / "evergreen.yml"
+        evg_config.write_text("api_server_host: http://127.0.0.1:1\n")
+        args = ["--evg-project", "project", "--evg-config-file", str(evg_config), "--no-cache"]
+
+        try:
+            result = CliRunner().invoke(under_test.main, args + search_args + ["--async-fetch"])
+        finally:
+            inject.clear()
+
+        assert result.exit_code == 1
+        assert "`--async-fetch` cannot be used" in result.output
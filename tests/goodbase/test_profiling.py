@@ -0,0 +1,34 @@
+"""Unit tests for profiling.py."""
+import pstats
+from threading import Thread
+
+import goodbase.profiling as under_test
+
+
+def allocate_on_thread():
+    return [str(idx) for idx in range(1000)]
+
+
+class TestRunProfiler:
+    def test_profile_should_cover_threads_started_while_profiling(self, tmp_path):
+        profiler = under_test.RunProfiler(tmp_path / "run.prof")
+
+        profiler.start()
+        thread = Thread(target=allocate_on_thread)
+        thread.start()
+        thread.join()
+        profiler.stop()
+
+        stats = pstats.Stats(str(tmp_path / "run.prof"))
+        assert any(func[2] == "allocate_on_thread" for func in stats.stats)
+
+    def test_allocation_summary_should_be_written_next_to_profile(self, tmp_path):
+        profiler = under_test.RunProfiler(tmp_path / "run.prof")
+
+        profiler.start()
+        allocate_on_thread()
+        profiler.stop()
+
+        summary = (tmp_path / "run.prof.allocations.txt").read_text()
+        assert summary.startswith("Current memory:")
+        assert "Top 25 allocations by line:" in summary
@@ -0,0 +1,117 @@
+"""Unit tests for project_config.py."""
+import pytest
+
+import goodbase.project_config as under_test
+
+
+def write_config(path, contents):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(contents)
+    return path
+
+
+class TestHashProjectConfig:
+    def test_missing_config_should_have_no_hash(self, tmp_path):
+        assert under_test.hash_project_config(tmp_path / "missing.yml") is None
+
+    def test_hash_should_change_with_config(self, tmp_path):
+        config = tmp_path / "evergreen.yml"
+        config.write_text("modules: []\n")
+        original_hash = under_test.hash_project_config(config)
+
+        config.write_text("modules:\n- name: enterprise\n")
+
+        assert under_test.hash_project_config(config) != original_hash
+
+    def test_hash_should_change_with_included_files(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config = tmp_path / "evergreen.yml"
+        config.write_text("include:\n  - filename: etc/modules.yml\n")
+        (tmp_path / "etc").mkdir()
+        (tmp_path / "etc" / "modules.yml").write_text("modules: []\n")
+        original_hash = under_test.hash_project_config(config)
+
+        (tmp_path / "etc" / "modules.yml").write_text("modules:\n- name: enterprise\n")
+
+        assert under_test.hash_project_config(config) != original_hash
+
+
+class TestExtractModuleLocations:
+    def test_modules_should_be_extracted(self, tmp_path):
+        config = write_config(
+            tmp_path / "evergreen.yml",
+            "functions:\n"
+            "  run tests:\n"
+            "    - command: shell.exec\n"
+            "      params: {script: [a, b]}\n"
+            "modules:\n"
+            "- name: enterprise\n"
+            "  repo: git@github.com:10gen/mongo-enterprise-modules.git\n"
+            "  prefix: src/mongo/db/modules\n"
+            "- name: wtdevelop\n"
+            "  prefix: src/third_party\n"
+            "buildvariants: []\n",
+        )
+
+        assert under_test.extract_module_locations(config) == {
+            "enterprise": "src/mongo/db/modules",
+            "wtdevelop": "src/third_party",
+        }
+
+    def test_parsing_should_stop_once_modules_and_includes_are_read(self, tmp_path):
+        config = write_config(
+            tmp_path / "evergreen.yml",
+            "include: []\nmodules:\n- name: enterprise\n  prefix: src/mongo/db/modules\n"
+            "tasks: [\n  : : not yaml\n",
+        )
+
+        assert under_test.extract_module_locations(config) == {"enterprise": "src/mongo/db/modules"}
+
+    def test_config_without_modules_should_have_none(self, tmp_path):
+        config = write_config(tmp_path / "evergreen.yml", "tasks:\n- name: compile\n")
+
+        assert under_test.extract_module_locations(config) == {}
+
+    def test_empty_config_should_have_no_modules(self, tmp_path):
+        config = write_config(tmp_path / "evergreen.yml", "")
+
+        assert under_test.extract_module_locations(config) == {}
+
+    def test_modules_of_included_files_should_be_combined(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config = write_config(
+            tmp_path / "evergreen.yml",
+            "modules:\n- name: enterprise\n  prefix: src/mongo/db/modules\n"
+            "include:\n- filename: etc/modules.yml\n",
+        )
+        write_config(
+            tmp_path / "etc" / "modules.yml",
+            "modules:\n- name: wtdevelop\n  prefix: src/third_party\n",
+        )
+
+        assert under_test.extract_module_locations(config) == {
+            "enterprise": "src/mongo/db/modules",
+            "wtdevelop": "src/third_party",
+        }
+
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            "modules:\n- name: enterprise\n  prefix: *prefix\n",
+            "modules:\n- <<: *module\n",
+            "include:\n- filename: etc/modules.yml\n  module: enterprise\n",
+            "include:\n- filename: etc/missing.yml\n",
+            "modules:\n- name: enterprise\n",
+            "modules: [\n",
+        ],
+    )
+    def test_configs_that_need_evaluating_should_not_be_extracted(
+        self, tmp_path, monkeypatch, contents
+    ):
+        monkeypatch.chdir(tmp_path)
+        config = write_config(tmp_path / "evergreen.yml", contents)
+
+        assert under_test.extract_module_locations(config) is None
+
+    def test_missing_config_should_not_be_extracted(self, tmp_path):
+        assert under_test.extract_module_locations(tmp_path / "missing.yml") is None
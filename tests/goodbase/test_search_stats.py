@@ -0,0 +1,61 @@
+"""Unit tests for search_stats.py."""
+import pytest
+
+import goodbase.search_stats as under_test
+
+
+class TestPercentile:
+    @pytest.mark.parametrize(
+        "pct,expected", [(0, 1.0), (50, 5.0), (95, 10.0), (99, 10.0), (100, 10.0)]
+    )
+    def test_percentile_should_use_nearest_rank(self, pct, expected):
+        values = [float(value) for value in range(10, 0, -1)]
+
+        assert under_test.percentile(values, pct) == expected
+
+    def test_percentile_of_no_values_should_be_zero(self):
+        assert under_test.percentile([], 50) == 0.0
+
+
+class TestSearchStats:
+    def test_counters_should_be_reported(self):
+        stats = under_test.SearchStats()
+
+        stats.increment("versions_scanned")
+        stats.increment("versions_scanned")
+        stats.increment("tasks_downloaded", 20)
+
+        assert stats.report()["counters"] == {"tasks_downloaded": 20, "versions_scanned": 2}
+
+    def test_requests_should_be_reported_by_endpoint(self):
+        stats = under_test.SearchStats()
+
+        stats.record_request("build_tasks", 0.1, 100, 0, failed=False)
+        stats.record_request("build_tasks", 0.3, 200, 2, failed=True)
+        stats.record_request("version", 0.2, 50, 0, failed=False)
+        report = stats.report()["requests"]
+
+        assert report["count"] == 3
+        assert report["bytes_received"] == 350
+        assert report["retries"] == 2
+        assert report["endpoints"]["build_tasks"] == {
+            "count": 2,
+            "bytes": 300,
+            "retries": 2,
+            "errors": 1,
+            "total_secs": 0.4,
+            "p50_secs": 0.1,
+            "p95_secs": 0.3,
+            "p99_secs": 0.3,
+        }
+
+    def test_timed_operations_should_be_reported(self):
+        stats = under_test.SearchStats()
+
+        with stats.timer("git checkout"):
+            pass
+        with pytest.raises(ValueError):
+            with stats.timer("git checkout"):
+                raise ValueError("failed")
+
+        assert stats.report()["operations"]["git checkout"]["count"] == 2
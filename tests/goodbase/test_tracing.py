@@ -0,0 +1,90 @@
+"""Unit tests for tracing.py."""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import goodbase.tracing as under_test
+
+
+def spans(tracer):
+    return [event for event in tracer._events if event["ph"] == "X"]
+
+
+class TestTracer:
+    def test_disabled_tracer_should_not_record_spans(self):
+        tracer = under_test.Tracer()
+
+        with tracer.span("check_version", "search"):
+            pass
+
+        assert tracer._events == []
+
+    def test_spans_should_be_recorded_when_operation_fails(self):
+        tracer = under_test.Tracer(enabled=True)
+
+        with pytest.raises(ValueError):
+            with tracer.span("check_version", "search", revision="abc123"):
+                raise ValueError("failed")
+
+        [span] = spans(tracer)
+        assert span["name"] == "check_version"
+        assert span["cat"] == "search"
+        assert span["args"] == {"revision": "abc123"}
+        assert span["dur"] >= 0
+
+    def test_nested_spans_should_share_a_track(self):
+        tracer = under_test.Tracer(enabled=True)
+
+        with tracer.span("check_version", "search"):
+            with tracer.span("analyze_build", "evergreen"):
+                pass
+
+        inner, outer = spans(tracer)
+        assert inner["tid"] == outer["tid"]
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+    def test_spans_on_different_threads_should_be_on_different_tracks(self):
+        tracer = under_test.Tracer(enabled=True)
+
+        def record_span(_):
+            with tracer.span("analyze_build", "evergreen"):
+                pass
+
+        with tracer.span("check_version", "search"):
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="worker") as exe:
+                list(exe.map(record_span, range(2)))
+
+        tracks = {
+            event["tid"]: event["args"]["name"] for event in tracer._events if event["ph"] == "M"
+        }
+        assert len(tracks) == 2
+        assert {span["tid"] for span in spans(tracer)} == set(tracks)
+
+    def test_spans_in_different_asyncio_tasks_should_be_on_different_tracks(self):
+        tracer = under_test.Tracer(enabled=True)
+
+        async def record_span():
+            with tracer.span("analyze_build", "evergreen"):
+                await asyncio.sleep(0)
+
+        async def record_spans():
+            await asyncio.gather(record_span(), record_span())
+
+        asyncio.run(record_spans())
+
+        assert len({span["tid"] for span in spans(tracer)}) == 2
+
+    def test_trace_should_be_written_in_chrome_trace_format(self, tmp_path):
+        tracer = under_test.Tracer(enabled=True)
+        trace_file = tmp_path / "trace.json"
+        with tracer.span("find_revision", "search"):
+            pass
+
+        tracer.write(trace_file)
+
+        trace = json.loads(trace_file.read_text())
+        assert [event["ph"] for event in trace["traceEvents"]] == ["M", "X"]
+        assert trace["displayTimeUnit"] == "ms"
@@ -0,0 +1,42 @@
+"""Unit tests for worker_pool.py."""
+from threading import Event
+
+import goodbase.worker_pool as under_test
+
+
+class TestWorkerPool:
+    def test_submitted_work_should_be_run(self):
+        pool = under_test.WorkerPool(max_workers=2)
+
+        assert pool.submit(pow, 2, 3).result() == 8
+
+    def test_run_all_should_return_results_in_order(self):
+        pool = under_test.WorkerPool(max_workers=2)
+
+        assert pool.run_all(pow, [(2, i) for i in range(10)]) == [2**i for i in range(10)]
+
+    def test_run_all_should_not_wait_on_work_without_a_worker(self):
+        pool = under_test.WorkerPool(max_workers=1)
+
+        # The only worker runs the caller, so every call has to be run by the caller itself.
+        results = pool.submit(pool.run_all, pow, [(2, i) for i in range(3)]).result(timeout=10)
+
+        assert results == [1, 2, 4]
+
+    def test_shutdown_should_cancel_work_that_has_not_started(self):
+        pool = under_test.WorkerPool(max_workers=1)
+        started = Event()
+        release = Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        running = pool.submit(block)
+        started.wait()
+        waiting = pool.submit(pow, 2, 3)
+        pool.shutdown()
+        release.set()
+
+        assert waiting.cancelled()
+        assert running.result() is None